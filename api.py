@@ -0,0 +1,193 @@
+## -- STD LIB IMPORTS --
+import os
+import gzip
+import atexit
+import shutil
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+## -- LOCAL IMPORTS --
+# The render core is a set of flat modules, its directory must be on sys.path and its module names are reserved
+import config       # constants
+import utils        # utility functions
+import index        # local metadata index
+import providers    # metadata providers
+import main         # render core
+from main import RenderError
+
+# Fail on import if a host module of the same name shadows a core module, instead of mixing modules silently
+_CORE_DIR_PATH = os.path.dirname(os.path.abspath(__file__))
+for _module in (config, utils, index, providers, main):
+    if os.path.dirname(os.path.abspath(getattr(_module, "__file__", None) or "")) != _CORE_DIR_PATH:
+        raise ImportError(f"Module '{_module.__name__}' of the host program shadows the render core module of the same name, rename it to embed the render core")
+
+## -- FUNCTIONS --
+# Resources shared by all calls of the process, guarded by the lock
+_lock = threading.Lock()
+_executor = None
+_index_local = threading.local()
+_index_conns = []                       # Tuples of owning thread and index connection
+_index_generation = 0                   # Bumped on close, so every thread reopens its connection
+
+def _get_provider(provider_url: str) -> providers.MetadataProvider:
+    """
+    Gets the shared metadata provider of a URL, opening it on first use.
+
+    Args:
+    provider_url (str): Provider URL.
+
+    Returns:
+    provider (providers.MetadataProvider): Metadata provider.
+    """
+    # Open each provider once, even if first used by concurrent calls
+    with _lock:
+        provider = main.open_metadata_provider(provider_url)
+    return provider
+
+def _get_index_conn():
+    """
+    Gets the local metadata index connection of the calling thread, opening it on first use.
+    Connections of threads that ended meanwhile are closed. Failures only disable the index for the thread.
+
+    Returns:
+    index_conn (sqlite3.Connection | None): Index database connection, None if disabled or unavailable.
+    """
+    if getattr(_index_local, "generation", None) != _index_generation:
+        _index_local.conn, _index_local.generation = None, _index_generation
+        if config.USE_LOCAL_INDEX:
+            try:
+                _index_local.conn = index.open_index(config.INDEX_DB_PATH)
+            except Exception:
+                pass
+        # Evict connections of ended threads, e.g. of request threads of the host program
+        with _lock:
+            ended = [(thread, index_conn) for thread, index_conn in _index_conns if not thread.is_alive()]
+            _index_conns[:] = [(thread, index_conn) for thread, index_conn in _index_conns if thread.is_alive()]
+            if _index_local.conn is not None:
+                _index_conns.append((threading.current_thread(), _index_local.conn))
+        for _, index_conn in ended:
+            index_conn.close()
+    return _index_local.conn
+
+@functools.lru_cache(maxsize=None)
+def _load_template(template: str, preview: bool) -> dict:
+    """
+    Loads a template once per process, by template option name or template file path.
+    Templates are shared by all calls and never modified.
+
+    Args:
+    template (str): Template option name, e.g. "Classic", or path to a template JSON file.
+    preview (bool): Downscale the document for previews.
+
+    Returns:
+    template_dict (dict): Template dictionary.
+    """
+    template_path = config.TEMPLATE_OPTIONS.get(template, template)
+    # Resolve relative template paths against the package directory when not found in the working directory
+    if not os.path.isabs(template_path) and not os.path.exists(template_path):
+        template_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), template_path)
+    if not os.path.exists(template_path):
+        raise ValueError(f"Unknown template '{template}', use one of: {', '.join(config.TEMPLATE_OPTIONS)} or a template file path")
+    template_dict = main.read_template_from_path(template_path)
+    if preview:
+        template_dict['svg_placeholders']['file_wrapper_open'] = utils.scale_svg_dimensions(template_dict['svg_placeholders']['file_wrapper_open'], config.PREVIEW_SCALE)
+    return template_dict
+
+def render_poster(album_id: str, template: str = next(iter(config.TEMPLATE_OPTIONS)), country: str = config.ISO_3166_1_ALPHA_2_CC["United States of America"], *,
+                  out_folder: str | None = None, provider: str = config.METADATA_PROVIDER_URL, preview: bool = False,
+                  palette: str = config.PALETTE_COLOR_SPACE, saliency: bool = config.PALETTE_SALIENCY_WEIGHTING,
+                  minify: bool = config.OUTPUT_MINIFY, svgz: bool = config.OUTPUT_COMPRESS, embed_fonts: bool = config.FONT_EMBEDDING,
+                  fallback_countries: list = config.STOREFRONT_FALLBACK_COUNTRY_CODES) -> bytes | str:
+    """
+    Renders the poster of an album, for embedding the render core into other Python programs.
+    Nothing is printed or prompted and the process never exits, failures raise RenderError (ValueError for invalid palette or template arguments).
+    Calls are thread-safe; providers, templates, index connections, catalogue and the artwork, text and font caches are shared across calls.
+
+    Args:
+    album_id (str): Album ID.
+    template (str): Template option name or path to a template JSON file.
+    country (str): ISO 3166-1 alpha-2 country code.
+    out_folder (str | None): Output folder to write the poster to, None to return the poster content instead.
+    provider (str): Metadata provider URL, "itunes://" or "fixture://<directory path>".
+    preview (bool): Render a low-resolution draft.
+    palette (str): Palette clustering color space, "srgb" or "oklab".
+    saliency (bool): Weight pixels by visual saliency when clustering in OKLab.
+    minify (bool): Minify the SVG content.
+    svgz (bool): Gzip compress the SVG content, written as .svgz file.
+    embed_fonts (bool): Embed subsets of the used fonts.
+    fallback_countries (list): Ordered list of fallback storefront country codes, empty to disable fallback.
+
+    Returns:
+    poster (bytes | str): SVG (or gzipped SVGZ) content if no output folder is given, written file path otherwise.
+    """
+    if palette not in config.PALETTE_COLOR_SPACES:
+        raise ValueError(f"Unknown palette color space '{palette}', use one of: {', '.join(config.PALETTE_COLOR_SPACES)}")
+    template_dict = _load_template(template, preview)
+    metadata_provider = _get_provider(provider)
+    # Records are appended to the catalogue by the writer shared by all calls, in few large chunks
+    catalogue_writer = main.get_shared_catalogue_writer()
+    album, tracks, cached_palette = main.get_album_tracks_and_palette(metadata_provider, _get_index_conn(), catalogue_writer, str(album_id), country.lower(), preview, palette, saliency, fallback_countries)
+    svg_file_content = main.render_album_svg(metadata_provider, album, tracks, template_dict, preview, palette, saliency, interactive = False, cached_palette = cached_palette)
+    main.record_album_palette(catalogue_writer, album, cached_palette)
+    if embed_fonts:
+        svg_file_content = main.embed_font_subsets(svg_file_content, template_dict)
+    if out_folder is not None:
+        poster = main.write_album_svg(album, svg_file_content, out_folder, minify, svgz)
+    else:
+        poster = (utils.minify_svg(svg_file_content) if minify else svg_file_content).encode("utf-8")
+        if svgz:
+            poster = gzip.compress(poster, compresslevel=config.OUTPUT_COMPRESS_LEVEL, mtime=0)
+    return poster
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Gets the shared render thread pool, creating it on first use.
+
+    Returns:
+    executor (ThreadPoolExecutor): Render thread pool.
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=config.API_RENDER_WORKERS, thread_name_prefix="render")
+        executor = _executor
+    return executor
+
+async def render_poster_async(album_id: str, *args, **kwargs) -> bytes | str:
+    """
+    Renders the poster of an album without blocking the event loop, on the shared render thread pool.
+    Takes the same arguments and raises the same exceptions as render_poster.
+
+    Args:
+    album_id (str): Album ID.
+
+    Returns:
+    poster (bytes | str): SVG (or gzipped SVGZ) content if no output folder is given, written file path otherwise.
+    """
+    loop = asyncio.get_running_loop()
+    poster = await loop.run_in_executor(_get_executor(), functools.partial(render_poster, album_id, *args, **kwargs))
+    return poster
+
+def close() -> None:
+    """
+    Releases shared resources: waits for running renders, closes index connections, appends buffered catalogue records and removes temporary files.
+    Called at interpreter exit, later calls reopen resources as needed.
+
+    Returns:
+    None
+    """
+    global _executor, _index_generation
+    with _lock:
+        executor, _executor = _executor, None
+        index_conns = _index_conns[:]
+        _index_conns.clear()
+        _index_generation += 1
+    if executor is not None:
+        executor.shutdown(wait=True)
+    for _, index_conn in index_conns:
+        index_conn.close()
+    main.close_shared_catalogue()
+    shutil.rmtree(config.TEMP_RUN_DIR_PATH, ignore_errors=True)
+
+atexit.register(close)
@@ -0,0 +1,174 @@
+## -- STD LIB IMPORTS --
+import os
+import json
+import hashlib
+import threading
+## -- LOCAL IMPORTS --
+import config   # constants
+import utils    # utility functions
+
+## -- FUNCTIONS --
+def read_batch_items(batch_file_path: str, default_country_code: str) -> list:
+    """
+    Reads batch items from a batch file with one album ID per line, optionally followed by a comma and a store country code.
+    Blank lines and lines starting with '#' are ignored, duplicate items are only rendered once.
+
+    Args:
+    batch_file_path (str): Path to the batch file.
+    default_country_code (str): ISO 3166-1 alpha-2 country code for items without one.
+
+    Returns:
+    items (list): List of (album ID, country code) tuples in file order.
+    """
+    items = []
+    seen = set()
+    with open(batch_file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line == "" or line.startswith("#"):
+                continue
+            album_id, _, country_code = (part.strip() for part in line.partition(","))
+            item = (album_id, country_code.lower() or default_country_code)
+            if item not in seen:
+                seen.add(item)
+                items.append(item)
+    return items
+
+def get_journal_path(batch_file_path: str, options: dict) -> str:
+    """
+    Derives the journal path of a batch from its file path and render options.
+    Rerunning the same batch file with the same options resumes the same journal, changed options start a fresh one.
+
+    Args:
+    batch_file_path (str): Path to the batch file.
+    options (dict): Render options affecting the output.
+
+    Returns:
+    journal_path (str): Journal file path.
+    """
+    key = json.dumps({"batch": os.path.abspath(batch_file_path), "options": options}, sort_keys=True)
+    journal_name = f"{utils.slug(os.path.splitext(os.path.basename(batch_file_path))[0])}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}.jsonl"
+    journal_path = os.path.join(config.BATCH_JOURNAL_DIR_PATH, journal_name)
+    return journal_path
+
+## -- CLASSES --
+class BatchJournal:
+    """
+    Append-only checkpoint journal of a batch run.
+    Every completed stage of an item (metadata, palette, done, failed) is appended as one JSON line and synced to disk,
+    so a restarted run knows exactly which items are finished and which intermediate results can be reused.
+    Checkpoints may be recorded from several threads.
+    """
+    STAGES = ("metadata", "palette", "done", "failed")
+
+    def __init__(self, journal_path: str):
+        self.journal_path = journal_path
+        self.items = {}
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(journal_path) or ".", exist_ok=True)
+        if os.path.exists(journal_path):
+            # Size of the journal up to its last complete line
+            complete_size = 0
+            with open(journal_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    complete_size += len(line)
+                    try:
+                        entry = json.loads(line)
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        # Skip a line torn by a crash mid-write of an older journal
+                        continue
+                    self._apply(entry)
+            # Cut off a line torn by a crash mid-write, so the next checkpoint starts on a line of its own
+            if complete_size < os.path.getsize(journal_path):
+                os.truncate(journal_path, complete_size)
+        self.file = open(journal_path, "a", encoding="utf-8")
+
+    @staticmethod
+    def item_key(album_id: str, country_code: str) -> str:
+        """
+        Composes the journal key of a batch item.
+
+        Args:
+        album_id (str): Album ID.
+        country_code (str): ISO 3166-1 alpha-2 country code.
+
+        Returns:
+        key (str): Journal item key.
+        """
+        key = f"{country_code}:{album_id}"
+        return key
+
+    def _apply(self, entry: dict) -> None:
+        """
+        Applies a journal entry to the in-memory item states.
+
+        Args:
+        entry (dict): Journal entry.
+
+        Returns:
+        None
+        """
+        state = self.items.setdefault(entry['item'], {})
+        state[entry['stage']] = entry['data']
+        # A completed item supersedes earlier failures and vice versa
+        if entry['stage'] == "done":
+            state.pop("failed", None)
+        elif entry['stage'] == "failed":
+            state.pop("done", None)
+
+    def record(self, key: str, stage: str, data: dict) -> None:
+        """
+        Appends a stage checkpoint of an item and syncs it to disk.
+
+        Args:
+        key (str): Journal item key.
+        stage (str): Stage name, one of metadata, palette, done or failed.
+        data (dict): Stage data.
+
+        Returns:
+        None
+        """
+        entry = {"item": key, "stage": stage, "data": data}
+        line = json.dumps(entry) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self._apply(entry)
+
+    def state(self, key: str) -> dict:
+        """
+        Gets the checkpointed stages of an item.
+
+        Args:
+        key (str): Journal item key.
+
+        Returns:
+        state (dict): Mapping of completed stage names to stage data.
+        """
+        state = self.items.get(key, {})
+        return state
+
+    def is_done(self, key: str) -> bool:
+        """
+        Checks whether an item has been rendered successfully.
+
+        Args:
+        key (str): Journal item key.
+
+        Returns:
+        done (bool): True if the item is done.
+        """
+        done = "done" in self.state(key)
+        return done
+
+    def close(self) -> None:
+        """
+        Closes the journal file.
+
+        Returns:
+        None
+        """
+        self.file.close()
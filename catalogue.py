@@ -0,0 +1,405 @@
+## -- STD LIB IMPORTS --
+import io
+import os
+import sys
+import glob
+import time
+import uuid
+import argparse
+import threading
+## -- EXT LIB IMPORTS --
+import numpy as np
+## -- LOCAL IMPORTS --
+import config   # constants
+import utils    # utility functions
+
+## -- CONSTANTS --
+# Table layouts, fixed-width columns are stored as one NumPy structured array per chunk,
+# variable-length string columns as concatenated UTF-8 bytes plus row offsets
+TABLES = {
+    "albums": {
+        "fixed": [("id", "<i8"), ("artist_id", "<i8"), ("country", "S2"), ("track_count", "<i2"), ("release_date", "S20"), ("fetched_at", "<f8")],
+        "strings": ["artist", "name", "copyright", "artwork_url"],
+    },
+    "tracks": {
+        "fixed": [("album_id", "<i8"), ("country", "S2"), ("id", "<i8"), ("number", "<i2"), ("time_millis", "<i4"), ("fetched_at", "<f8")],
+        "strings": ["name"],
+    },
+    "palettes": {
+        "fixed": [("album_id", "<i8"), ("artwork_hash", "u1", (32,)), ("artwork_size", "<i2"), ("colors", "u1", (config.PALETTE_SIZE, 3)), ("color_count", "u1"), ("method", "S16"), ("computed_at", "<f8")],
+        "strings": [],
+    },
+}
+
+## -- FUNCTIONS --
+def _encode_strings(values: list) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Encodes strings to a concatenated UTF-8 byte buffer and row offsets.
+
+    Args:
+    values (list): List of strings.
+
+    Returns:
+    encoded (tuple[np.ndarray, np.ndarray]): Byte buffer and offsets, row i spans data[offsets[i]:offsets[i + 1]].
+    """
+    encoded_values = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded_values) + 1, dtype="<i8")
+    np.cumsum([len(value) for value in encoded_values], out=offsets[1:])
+    data = np.frombuffer(b"".join(encoded_values), dtype=np.uint8)
+    return data, offsets
+
+def _decode_strings(data: np.ndarray, offsets: np.ndarray) -> list:
+    """
+    Decodes strings from a concatenated UTF-8 byte buffer and row offsets.
+
+    Args:
+    data (np.ndarray): Byte buffer.
+    offsets (np.ndarray): Row offsets.
+
+    Returns:
+    values (list): List of strings.
+    """
+    buffer = data.tobytes()
+    values = [buffer[start:end].decode("utf-8") for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+    return values
+
+def write_chunk(catalogue_dir: str, table: str, rows: np.ndarray, strings: dict) -> str:
+    """
+    Writes one immutable chunk of a table. Chunks are uniquely named and written atomically,
+    so concurrent runs can append to the same catalogue without coordination.
+
+    Args:
+    catalogue_dir (str): Path to the catalogue directory.
+    table (str): Table name.
+    rows (np.ndarray): Structured array of fixed-width columns.
+    strings (dict): Mapping of string column names to lists of strings.
+
+    Returns:
+    chunk_path (str): Path to the written chunk file.
+    """
+    os.makedirs(catalogue_dir, exist_ok=True)
+    arrays = {"rows": rows}
+    for column in TABLES[table]['strings']:
+        arrays[f"{column}_data"], arrays[f"{column}_offsets"] = _encode_strings(strings[column])
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    chunk_path = os.path.join(catalogue_dir, f"{table}-{time.time_ns()}-{uuid.uuid4().hex[:8]}.npz")
+    utils.atomic_write(chunk_path, buffer.getvalue())
+    return chunk_path
+
+def _read_chunks(chunk_paths: list, table: str) -> tuple[np.ndarray, dict]:
+    """
+    Reads and concatenates chunks of a table.
+
+    Args:
+    chunk_paths (list): List of chunk file paths.
+    table (str): Table name.
+
+    Returns:
+    table_data (tuple[np.ndarray, dict]): Structured array of fixed-width columns and mapping of string column names to lists of strings.
+    """
+    dtype = np.dtype(TABLES[table]['fixed'])
+    rows = [np.zeros(0, dtype=dtype)]
+    strings = {column: [] for column in TABLES[table]['strings']}
+    for chunk_path in chunk_paths:
+        with np.load(chunk_path, allow_pickle=False) as chunk:
+            chunk_rows = chunk['rows']
+            if chunk_rows.dtype.names != dtype.names:
+                # Columns are matched by name, columns missing in chunks of older layouts are zero
+                converted_rows = np.zeros(len(chunk_rows), dtype=dtype)
+                for column in set(chunk_rows.dtype.names) & set(dtype.names):
+                    converted_rows[column] = chunk_rows[column]
+                chunk_rows = converted_rows
+            rows.append(chunk_rows.astype(dtype))
+            for column in strings:
+                strings[column].extend(_decode_strings(chunk[f"{column}_data"], chunk[f"{column}_offsets"]))
+    table_data = (np.concatenate(rows), strings)
+    return table_data
+
+def _list_chunks(catalogue_dir: str, table: str) -> list:
+    """
+    Lists the chunk files of a table in append order.
+
+    Args:
+    catalogue_dir (str): Path to the catalogue directory.
+    table (str): Table name.
+
+    Returns:
+    chunk_paths (list): List of chunk file paths.
+    """
+    chunk_paths = sorted(glob.glob(os.path.join(catalogue_dir, f"{table}-*.npz")))
+    return chunk_paths
+
+def load_table(catalogue_dir: str, table: str) -> tuple[np.ndarray, dict]:
+    """
+    Loads all chunks of a table in bulk.
+    Holds the compaction lock shared, so compaction never swaps chunks while they are listed and read.
+
+    Args:
+    catalogue_dir (str): Path to the catalogue directory.
+    table (str): Table name.
+
+    Returns:
+    table_data (tuple[np.ndarray, dict]): Structured array of fixed-width columns and mapping of string column names to lists of strings.
+    """
+    if not os.path.isdir(catalogue_dir):
+        return _read_chunks([], table)
+    with utils.file_lock(os.path.join(catalogue_dir, "compact"), shared=True):
+        while True:
+            try:
+                table_data = _read_chunks(_list_chunks(catalogue_dir, table), table)
+                break
+            except FileNotFoundError:
+                # A chunk vanished after listing, e.g. merged by a compaction not honouring the lock, list again
+                continue
+    return table_data
+
+def compact(catalogue_dir: str) -> None:
+    """
+    Merges all chunks of each table into a single chunk to keep bulk loads fast.
+    Holds the compaction lock exclusively, so loads never see both the merged chunk and the chunks it replaces.
+    Chunks appended while compacting are left untouched and picked up by the next compaction.
+
+    Args:
+    catalogue_dir (str): Path to the catalogue directory.
+
+    Returns:
+    None
+    """
+    os.makedirs(catalogue_dir, exist_ok=True)
+    with utils.file_lock(os.path.join(catalogue_dir, "compact")):
+        for table in TABLES:
+            chunk_paths = _list_chunks(catalogue_dir, table)
+            if len(chunk_paths) < 2:
+                continue
+            rows, strings = _read_chunks(chunk_paths, table)
+            write_chunk(catalogue_dir, table, rows, strings)
+            for chunk_path in chunk_paths:
+                os.remove(chunk_path)
+
+def load_render_inputs(catalogue_dir: str, country_code: str | None, artwork_size: int = config.ARTWORK_SIZE, palette_method: str | None = None) -> list:
+    """
+    Loads everything needed to re-render posters in bulk, without API calls or JSON parsing.
+    For every album and storefront, the most recently fetched record, track list and palette are used.
+
+    Args:
+    catalogue_dir (str): Path to the catalogue directory.
+    country_code (str | None): ISO 3166-1 alpha-2 country code, None for all storefronts.
+    artwork_size (int): Artwork edge length the palettes must have been computed from.
+    palette_method (str | None): Method the palettes must have been computed with, None for any method.
+
+    Returns:
+    render_inputs (list): List of dictionaries holding storefront country code, album, tracks, artwork hash and colors (both None if no palette is stored).
+    """
+    # Latest album record per album ID and storefront
+    album_rows, album_strings = load_table(catalogue_dir, "albums")
+    album_idx = np.arange(len(album_rows)) if country_code is None else np.flatnonzero(album_rows['country'] == country_code.encode("ascii"))
+    albums = {}
+    for idx in album_idx[np.argsort(album_rows['fetched_at'][album_idx], kind="stable")].tolist():
+        row = album_rows[idx]
+        albums[(int(row['id']), row['country'].decode("ascii"))] = {
+            "artist": album_strings['artist'][idx],
+            "artist_id": int(row['artist_id']),
+            "id": int(row['id']),
+            "name": album_strings['name'][idx],
+            "artwork_url": album_strings['artwork_url'][idx],
+            "track_count": int(row['track_count']),
+            "copyright": album_strings['copyright'][idx],
+            "release_date": row['release_date'].decode("ascii"),
+        }
+    # Track list of the latest fetch per album ID and storefront
+    track_rows, track_strings = load_table(catalogue_dir, "tracks")
+    track_idx = np.arange(len(track_rows)) if country_code is None else np.flatnonzero(track_rows['country'] == country_code.encode("ascii"))
+    track_keys = list(zip(track_rows['album_id'][track_idx].tolist(), [country.decode("ascii") for country in track_rows['country'][track_idx].tolist()]))
+    latest_fetch = {}
+    for key, fetched_at in zip(track_keys, track_rows['fetched_at'][track_idx].tolist()):
+        latest_fetch[key] = max(fetched_at, latest_fetch.get(key, fetched_at))
+    tracks = {}
+    for idx, key in zip(track_idx.tolist(), track_keys):
+        row = track_rows[idx]
+        if float(row['fetched_at']) == latest_fetch[key]:
+            tracks.setdefault(key, []).append({
+                "id": int(row['id']),
+                "name": track_strings['name'][idx],
+                "number": int(row['number']),
+                "time_millis": int(row['time_millis']),
+                "time_parts": utils.millis_to_minutes_and_seconds(int(row['time_millis'])),
+            })
+    # Latest palette per album ID
+    palette_rows, _ = load_table(catalogue_dir, "palettes")
+    palette_rows = palette_rows[palette_rows['artwork_size'] == artwork_size]
+    if palette_method is not None:
+        palette_rows = palette_rows[palette_rows['method'] == palette_method.encode("ascii")]
+    palette_rows = palette_rows[np.argsort(palette_rows['computed_at'], kind="stable")]
+    palettes = {
+        int(row['album_id']): {"artwork_hash": row['artwork_hash'].tobytes().hex(), "colors": [utils.rgb_to_hex(color) for color in row['colors'][:row['color_count']]]}
+        for row in palette_rows
+    }
+    render_inputs = [
+        {"country": key[1], "album": album, "tracks": tracks[key], **palettes.get(key[0], {"artwork_hash": None, "colors": None})}
+        for key, album in albums.items() if key in tracks
+    ]
+    return render_inputs
+
+## -- CLASSES --
+class CatalogueWriter:
+    """
+    Buffers fetched albums, tracks and palettes and appends them to the catalogue as one chunk per table.
+    Buffers are flushed once they hold flush_rows rows or their oldest row is flush_seconds old,
+    so a writer shared by all renders of a process writes few large chunks instead of one per render.
+    Writers may be shared by threads.
+    """
+    def __init__(self, catalogue_dir: str = config.CATALOGUE_DIR_PATH, flush_rows: int = config.CATALOGUE_FLUSH_ROWS, flush_seconds: float = config.CATALOGUE_FLUSH_SECONDS):
+        self.catalogue_dir = catalogue_dir
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.buffers = self._empty_buffers()
+        self.buffered_since = None          # Time the oldest buffered row was added
+        self.retry_at = 0.0                 # Time automatic flushes are retried after a failure
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()  # Serializes chunk writes
+
+    @staticmethod
+    def _empty_buffers() -> dict:
+        """
+        Creates empty row and string buffers for all tables.
+
+        Returns:
+        buffers (dict): Mapping of table names to (rows, strings) tuples.
+        """
+        buffers = {table: ([], {column: [] for column in TABLES[table]['strings']}) for table in TABLES}
+        return buffers
+
+    def _append(self, table: str, row: tuple, strings: dict) -> None:
+        """
+        Buffers one row of a table.
+
+        Args:
+        table (str): Table name.
+        row (tuple): Fixed-width column values in table layout order.
+        strings (dict): Mapping of string column names to values.
+
+        Returns:
+        None
+        """
+        with self.lock:
+            rows, string_buffers = self.buffers[table]
+            rows.append(row)
+            for column, value in strings.items():
+                string_buffers[column].append(value)
+            if self.buffered_since is None:
+                self.buffered_since = time.monotonic()
+            now = time.monotonic()
+            full = now >= self.retry_at and (sum(len(rows) for rows, _ in self.buffers.values()) >= self.flush_rows or now - self.buffered_since >= self.flush_seconds)
+        if full:
+            try:
+                self.flush()
+            except Exception:
+                # Rows stay buffered, failures are retried later and reported by the final flush
+                self.retry_at = time.monotonic() + self.flush_seconds
+
+    def add_albums(self, albums: list, country_code: str) -> None:
+        """
+        Buffers fetched album records.
+
+        Args:
+        albums (list): List of album dictionaries.
+        country_code (str): ISO 3166-1 alpha-2 country code.
+
+        Returns:
+        None
+        """
+        fetched_at = time.time()
+        for album in albums:
+            self._append(
+                "albums",
+                (album['id'], album['artist_id'], country_code.encode("ascii"), album['track_count'], album['release_date'].encode("ascii"), fetched_at),
+                {"artist": album['artist'], "name": album['name'], "copyright": album['copyright'], "artwork_url": album['artwork_url']}
+            )
+
+    def add_tracks(self, album_id: int, country_code: str, tracks: list) -> None:
+        """
+        Buffers a fetched album track list.
+
+        Args:
+        album_id (int): Album ID.
+        country_code (str): ISO 3166-1 alpha-2 country code.
+        tracks (list): List of track dictionaries.
+
+        Returns:
+        None
+        """
+        fetched_at = time.time()
+        for track in tracks:
+            self._append(
+                "tracks",
+                (album_id, country_code.encode("ascii"), track['id'], track['number'], track['time_millis'], fetched_at),
+                {"name": track['name']}
+            )
+
+    def add_palette(self, album_id: int, digest: str, artwork_size: int, colors: list, method: str) -> None:
+        """
+        Buffers an album color palette.
+
+        Args:
+        album_id (int): Album ID.
+        digest (str): Hex encoded SHA-256 digest of the artwork the palette was computed from.
+        artwork_size (int): Artwork edge length in pixels.
+        colors (list): List of hex color strings.
+        method (str): Palette extraction method, e.g. "oklab-saliency".
+
+        Returns:
+        None
+        """
+        rgb = np.zeros((config.PALETTE_SIZE, 3), dtype=np.uint8)
+        colors = colors[:config.PALETTE_SIZE]
+        if len(colors) > 0:
+            rgb[:len(colors)] = [utils.hex_to_rgb(color) for color in colors]
+        self._append("palettes", (album_id, np.frombuffer(bytes.fromhex(digest), dtype=np.uint8), artwork_size, rgb, len(colors), method.encode("ascii"), time.time()), {})
+
+    def flush(self) -> None:
+        """
+        Appends all buffered records to the catalogue and clears the buffers.
+        Records of tables that failed to be written stay buffered for the next flush.
+
+        Returns:
+        None
+        """
+        with self.flush_lock:
+            with self.lock:
+                buffers, self.buffers, self.buffered_since = self.buffers, self._empty_buffers(), None
+            written_tables = []
+            try:
+                for table, (rows, strings) in buffers.items():
+                    if len(rows) > 0:
+                        write_chunk(self.catalogue_dir, table, np.array(rows, dtype=np.dtype(TABLES[table]['fixed'])), strings)
+                    written_tables.append(table)
+            except Exception:
+                # Put unwritten records back in front of records buffered meanwhile
+                with self.lock:
+                    for table, (rows, strings) in buffers.items():
+                        if table not in written_tables:
+                            self.buffers[table][0][:0] = rows
+                            for column, values in strings.items():
+                                self.buffers[table][1][column][:0] = values
+                    self.buffered_since = time.monotonic() if any(len(rows) > 0 for rows, _ in self.buffers.values()) else None
+                raise
+
+def main() -> None:
+    """Maintains the harvested metadata catalogue."""
+    parser = argparse.ArgumentParser(description="Maintain the columnar catalogue of harvested album metadata.")
+    parser.add_argument("command", choices=["compact", "stats"], help="compact: merge chunks, stats: print row counts")
+    parser.add_argument("--dir", default=config.CATALOGUE_DIR_PATH, help="Path to the catalogue directory")
+    args = parser.parse_args()
+    try:
+        if args.command == "compact":
+            compact(args.dir)
+        for table in TABLES:
+            rows, _ = load_table(args.dir, table)
+            print(f"  {table}: {len(rows)} rows")
+    except Exception as e:
+        print(f"{config.ANSI_FORMATS['FONT_RED']}✗{config.ANSI_FORMATS['END']} {e}")
+        sys.exit(1)
+
+if (__name__ == "__main__"):
+    main()
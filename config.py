@@ -1,5 +1,7 @@
 ## -- STD LIB IMPORTS --
 import os
+import socket
+import uuid
 
 ## -- CONSTANTS --
 # ISO 3166-1 alpha-2 country codes for UN 193 countries + 2 observer states
@@ -208,22 +210,168 @@ LUMINANCE_WEIGHTS = [0.2126, 0.7152, 0.0722]
 # iTunes API base URLs
 SEARCH_API_BASE_URL = "https://itunes.apple.com/search"
 LOOKUP_API_BASE_URL = 'https://itunes.apple.com/lookup'
+# Seconds iTunes API and artwork requests may wait for the server, so stalled requests never hold a thread forever
+ITUNES_REQUEST_TIMEOUT_SECONDS = 30
+
+# Metadata provider URL, "itunes://" for the iTunes store or "fixture://<directory path>" for recorded metadata and artwork on disk
+METADATA_PROVIDER_URL = "itunes://"
 
 # API album entity return limit
 ALBUM_RESULT_LIMIT = 5
 
 # Temporary artwork file path
 TEMP_ARTWORK_DIR_PATH = os.path.join(".", ".temp") 
-TEMP_ARTWORK_FILE_NAME = "artwork.jpg"
+
+# Per-run scratch directory path, unique per host, process and run so parallel runs on a shared volume never collide
+TEMP_RUN_DIR_PATH = os.path.join(TEMP_ARTWORK_DIR_PATH, f"run-{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}")
+
+# Lock file suffix used to guard shared files against concurrent writers
+LOCK_FILE_SUFFIX = ".lock"
+
+# Shared cache directory path, reused across runs and processes
+CACHE_DIR_PATH = os.path.join(".", ".cache")
+
+# Local metadata index database path and settings
+INDEX_DB_PATH = os.path.join(CACHE_DIR_PATH, "index.sqlite3")
+USE_LOCAL_INDEX = True
+INDEX_FUZZY_MIN_SIMILARITY = 0.5    # Minimum trigram similarity for typo-tolerant matches
+
+# Artwork cache directory path and full quality artwork edge length in pixels
+ARTWORK_CACHE_DIR_PATH = os.path.join(CACHE_DIR_PATH, "artwork")
+ARTWORK_SIZE = 1500
+
+# Artwork cache eviction, least recently used artworks are evicted beyond the size budget or after the maximum age,
+# checked after downloads at most once per interval
+ARTWORK_CACHE_MAX_MB = 2048
+ARTWORK_CACHE_MAX_AGE_DAYS = 90
+ARTWORK_CACHE_EVICT_INTERVAL_SECONDS = 60
+
+# Number of prepared and measured text strings cached per process, repeated artist and label strings are prepared once
+TEXT_CACHE_SIZE = 4096
+
+# Storefront fallback settings, albums unavailable in the requested storefront are looked up in these storefronts concurrently
+# (empty list to disable), the storefront an album was found in is cached so later runs go straight to it
+STOREFRONT_FALLBACK_COUNTRY_CODES = [ISO_3166_1_ALPHA_2_CC[country] for country in ("United States of America", "United Kingdom of Great Britain and Northern Ireland", "Canada", "Australia", "Germany", "France", "Japan")]
+STOREFRONT_LOOKUP_WORKERS = 4
+STOREFRONT_CACHE_PATH = os.path.join(CACHE_DIR_PATH, "storefronts.json")
+STOREFRONT_CACHE_FLUSH_SECONDS = 60      # Availability records are written at least this often, and at the end of every run
+STOREFRONT_TRACK_COUNT_TOLERANCE = 1     # Tracks a complete lookup may miss, album track counts include e.g. digital booklets
+
+# Embedded font subset cache directory path, subsets are keyed by font file and glyph set
+FONT_SUBSET_CACHE_DIR_PATH = os.path.join(CACHE_DIR_PATH, "fonts")
+# Embed WOFF2 subsets of the used fonts into outputs, so they render identically without the fonts installed
+FONT_EMBEDDING = False
+
+# Columnar catalogue directory path, every fetched album, track list and palette is appended here
+CATALOGUE_DIR_PATH = os.path.join(CACHE_DIR_PATH, "catalogue")
+# Catalogue writers append a chunk once this many rows are buffered or the oldest buffered row is this old
+CATALOGUE_FLUSH_ROWS = 10000
+CATALOGUE_FLUSH_SECONDS = 300
+
+# Preview mode settings
+PREVIEW_ARTWORK_SIZE = 100                                      # Smallest artwork edge length served by the iTunes CDN
+PREVIEW_SCALE = 0.25                                            # Document downscale factor
+PREVIEW_PALETTE_SAMPLE_SIZE = 32                                # Edge length of the thumbnail sampled for the approximate palette
+PREVIEW_OUTPUT_FOLDER = os.path.join(".", "out", "preview")
+CONTACT_SHEET_COLUMNS = 5
+CONTACT_SHEET_GAP = 20                                          # Gap between contact sheet cells in pixels
+
+# Number of palette colors extracted from album artwork
+PALETTE_SIZE = 5
+
+# Palette color space, "srgb" clusters raw pixel values, "oklab" clusters in the perceptually uniform OKLab space
+PALETTE_COLOR_SPACE = "srgb"
+PALETTE_COLOR_SPACES = ["srgb", "oklab"]
+# Weight pixels by visual saliency when clustering in OKLab
+PALETTE_SALIENCY_WEIGHTING = False
+# Cluster oversampling factor and minimum OKLab distance between palette colors, closer colors count as visually identical
+PALETTE_OVERSAMPLING = 2
+PALETTE_MIN_DISTANCE = 0.06
+# Number of pixels sampled for OKLab clustering, of the 256x256 pixels of the resized artwork
+PALETTE_SAMPLE_PIXELS = 4096
+
+# Linear sRGB to LMS and LMS to OKLab conversion matrices
+# Reference: https://bottosson.github.io/posts/oklab/
+OKLAB_M1 = [
+    [0.4122214708, 0.5363325363, 0.0514459929],
+    [0.2119034982, 0.6806995451, 0.1073969566],
+    [0.0883024619, 0.2817188376, 0.6299787005],
+]
+OKLAB_M2 = [
+    [0.2104542553, 0.7936177850, -0.0040720468],
+    [1.9779984951, -2.4285922050, 0.4505937099],
+    [0.0259040371, 0.7827717662, -0.8086757660],
+]
+
+# Render job queue settings, queue URLs are "sqlite://<database path>" or "spool://<directory path>"
+JOB_QUEUE_URL = "sqlite://" + os.path.join(".", ".queue", "jobs.sqlite3")
+JOB_LEASE_SECONDS = 300
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_BACKOFF_SECONDS = 10      # Doubled on every further attempt
+JOB_POLL_INTERVAL_SECONDS = 2
+
+# Batch pipeline resource budgets, bounding the memory of concurrently rendered items
+PIPELINE_MAX_INFLIGHT_ARTWORKS = 8                                  # Artworks between download and written output
+PIPELINE_MAX_DECODED_PIXEL_MB = 256                                 # Decoded artwork pixels held for palette extraction
+PIPELINE_QUEUE_DEPTH = 4                                            # Items waiting in front of each stage
+PIPELINE_STAGE_WORKERS = {"metadata": 4, "artwork": 4, "palette": 2, "template": 2, "write": 2}
+PIPELINE_TRACE_MEMORY = False                                       # Trace Python heap allocations, slows rendering down noticeably
+PIPELINE_STOP_POLL_SECONDS = 0.1                                    # Interval blocked workers check whether the pipeline was stopped
+
+# Library API render thread pool size, serving asynchronous render calls
+API_RENDER_WORKERS = 4
+
+# Progress reporting settings, status lines are redrawn on terminals and summaries logged otherwise
+PROGRESS_REFRESH_SECONDS = 0.1
+PROGRESS_LOG_SECONDS = 10
+PROGRESS_LATENCY_SAMPLES = 1024     # Most recent stage latencies percentiles are computed from
+PROGRESS_PERCENTILES = [50, 95]
+
+# Batch checkpoint journal directory path
+BATCH_JOURNAL_DIR_PATH = os.path.join(".", ".batches")
 
 # Template option file paths
 TEMPLATE_OPTIONS = {
     "Classic": os.path.join(".", "templates", "classic", "classic.json")
 }
 
+# Template elements in document order, each mapped to the template settings it is populated with besides its SVG placeholder
+TEMPLATE_ELEMENTS = {
+    "file_wrapper_open": [],
+    "background": [],
+    "album_artwork": [],
+    "album_title": ["calc_values", "overflow_compensation"],
+    "album_artist": ["calc_values", "overflow_compensation"],
+    "album_copyright": ["calc_values", "overflow_compensation"],
+    "header_separator": [],
+    "tracklist_item": ["tracklist_item_coordinates", "limits"],
+    "album_release_label": [],
+    "album_release_year": [],
+    "album_length_label": [],
+    "album_length": [],
+    "color_blob_item": ["color_blob_item_coordinates", "limits"],
+    "file_wrapper_close": []
+}
+
 # Output folder directory path
 OUTPUT_FOLDER = os.path.join(".", "out")
 
+# Template development mode settings, re-rendered posters, diffs and a comparison page are written to the dev output folder
+TEMPLATE_DEV_OUTPUT_FOLDER = os.path.join(".", "out", "dev")
+TEMPLATE_DEV_POLL_SECONDS = 0.1                                 # Template file modification polling interval
+TEMPLATE_DEV_DIFF_LINE_LENGTH = 160                             # Longer diff lines, e.g. embedded artwork, are shortened
+TEMPLATE_DEV_PAGE_REFRESH_SECONDS = 2                           # Comparison page reload interval
+
+# Output optimization settings, minified output hoists repeated presentation attributes into CSS classes,
+# compressed output is written as gzipped .svgz
+OUTPUT_MINIFY = False
+OUTPUT_COMPRESS = False
+OUTPUT_COMPRESS_LEVEL = 6           # gzip level, higher levels barely shrink the embedded artwork further
+SVG_HOISTABLE_ATTRIBUTES = ["font-family", "font-size", "font-weight", "text-anchor", "fill"]
+
+# Output slug claims directory name, holds one marker file per file name slug naming the album ID that owns it
+OUTPUT_SLUG_CLAIMS_DIR_NAME = ".slugs"
+
 # Terminal color formatting ANSI escape codes
 # Reference: https://en.wikipedia.org/wiki/ANSI_escape_code
 ANSI_FORMATS = {
@@ -0,0 +1,292 @@
+## -- STD LIB IMPORTS --
+import os
+import sys
+import json
+import sqlite3
+import argparse
+## -- LOCAL IMPORTS --
+import config   # constants
+import utils    # utility functions
+
+## -- CONSTANTS --
+# Index schema, album and track records are stored as rendered-ready JSON keyed by album ID and storefront
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS albums (album_id INTEGER NOT NULL, country TEXT NOT NULL, record TEXT NOT NULL, PRIMARY KEY (album_id, country));
+CREATE TABLE IF NOT EXISTS tracks (album_id INTEGER NOT NULL, country TEXT NOT NULL, records TEXT NOT NULL, PRIMARY KEY (album_id, country));
+CREATE VIRTUAL TABLE IF NOT EXISTS album_tokens USING fts5(artist, name, tracks, album_id UNINDEXED, country UNINDEXED);
+CREATE VIRTUAL TABLE IF NOT EXISTS album_trigrams USING fts5(title, album_id UNINDEXED, country UNINDEXED, tokenize='trigram');
+"""
+# BM25 column weights for artist, name and track tokens, artist and album name matches rank above track name matches
+TOKEN_COLUMN_WEIGHTS = (10.0, 10.0, 1.0)
+
+## -- FUNCTIONS --
+def normalize(text: str) -> str:
+    """
+    Normalizes text to space separated lowercase ASCII tokens, reusing the file name slug normalization.
+
+    Args:
+    text (str): Raw text.
+
+    Returns:
+    normalized (str): Normalized text.
+    """
+    normalized = utils.slug(text).replace("-", " ").strip()
+    return normalized
+
+def trigrams(text: str) -> set:
+    """
+    Computes the set of character trigrams of a normalized text.
+
+    Args:
+    text (str): Normalized text.
+
+    Returns:
+    text_trigrams (set): Set of character trigrams.
+    """
+    text_trigrams = {text[i:i + 3] for i in range(len(text) - 2)}
+    return text_trigrams
+
+def open_index(db_path: str = config.INDEX_DB_PATH) -> sqlite3.Connection:
+    """
+    Opens the local metadata index, creating database and schema if they do not exist.
+    The database runs in WAL mode so concurrent runs can read while another run writes.
+
+    Args:
+    db_path (str): Path to the index database file.
+
+    Returns:
+    conn (sqlite3.Connection): Index database connection.
+    """
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def _refresh_search_rows(conn: sqlite3.Connection, album: dict, country_code: str, track_names: list) -> None:
+    """
+    Replaces the full-text search rows of an album.
+
+    Args:
+    conn (sqlite3.Connection): Index database connection.
+    album (dict): Album dictionary.
+    country_code (str): ISO 3166-1 alpha-2 country code.
+    track_names (list): List of track names.
+
+    Returns:
+    None
+    """
+    key = (album['id'], country_code)
+    conn.execute("DELETE FROM album_tokens WHERE album_id = ? AND country = ?", key)
+    conn.execute("DELETE FROM album_trigrams WHERE album_id = ? AND country = ?", key)
+    conn.execute(
+        "INSERT INTO album_tokens (artist, name, tracks, album_id, country) VALUES (?, ?, ?, ?, ?)",
+        (normalize(album['artist']), normalize(album['name']), " ".join(normalize(name) for name in track_names), *key)
+    )
+    conn.execute(
+        "INSERT INTO album_trigrams (title, album_id, country) VALUES (?, ?, ?)",
+        (normalize(f"{album['artist']} {album['name']}"), *key)
+    )
+
+def add_albums(conn: sqlite3.Connection, albums: list, country_code: str) -> None:
+    """
+    Adds or updates album records in the index.
+
+    Args:
+    conn (sqlite3.Connection): Index database connection.
+    albums (list): List of album dictionaries.
+    country_code (str): ISO 3166-1 alpha-2 country code.
+
+    Returns:
+    None
+    """
+    with conn:
+        for album in albums:
+            conn.execute("INSERT OR REPLACE INTO albums (album_id, country, record) VALUES (?, ?, ?)", (album['id'], country_code, json.dumps(album)))
+            tracks = get_tracks(conn, album['id'], country_code)
+            _refresh_search_rows(conn, album, country_code, [track['name'] for track in tracks])
+
+def add_tracks(conn: sqlite3.Connection, album: dict, country_code: str, tracks: list) -> None:
+    """
+    Adds or updates the track list of an album in the index and makes track names searchable.
+
+    Args:
+    conn (sqlite3.Connection): Index database connection.
+    album (dict): Album dictionary.
+    country_code (str): ISO 3166-1 alpha-2 country code.
+    tracks (list): List of track dictionaries.
+
+    Returns:
+    None
+    """
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO tracks (album_id, country, records) VALUES (?, ?, ?)", (album['id'], country_code, json.dumps(tracks)))
+        _refresh_search_rows(conn, album, country_code, [track['name'] for track in tracks])
+
+def get_tracks(conn: sqlite3.Connection, album_id: int, country_code: str) -> list:
+    """
+    Gets the indexed track list of an album.
+
+    Args:
+    conn (sqlite3.Connection): Index database connection.
+    album_id (int): Album ID.
+    country_code (str): ISO 3166-1 alpha-2 country code.
+
+    Returns:
+    tracks (list): List of track dictionaries, empty if not indexed.
+    """
+    row = conn.execute("SELECT records FROM tracks WHERE album_id = ? AND country = ?", (album_id, country_code)).fetchone()
+    tracks = json.loads(row[0]) if row else []
+    return tracks
+
+def get_album(conn: sqlite3.Connection, album_id: int, country_code: str) -> dict | None:
+    """
+    Gets an indexed album record.
+
+    Args:
+    conn (sqlite3.Connection): Index database connection.
+    album_id (int): Album ID.
+    country_code (str): ISO 3166-1 alpha-2 country code.
+
+    Returns:
+    album (dict | None): Album dictionary, None if not indexed.
+    """
+    row = conn.execute("SELECT record FROM albums WHERE album_id = ? AND country = ?", (album_id, country_code)).fetchone()
+    album = json.loads(row[0]) if row else None
+    return album
+
+def _get_albums_by_ids(conn: sqlite3.Connection, album_ids: list, country_code: str) -> list:
+    """
+    Gets indexed album records in the given order.
+
+    Args:
+    conn (sqlite3.Connection): Index database connection.
+    album_ids (list): Ordered list of album IDs.
+    country_code (str): ISO 3166-1 alpha-2 country code.
+
+    Returns:
+    albums (list): List of album dictionaries.
+    """
+    albums = [album for album in (get_album(conn, album_id, country_code) for album_id in album_ids) if album is not None]
+    return albums
+
+def search(conn: sqlite3.Connection, user_search: str, country_code: str, limit: int = config.ALBUM_RESULT_LIMIT) -> list:
+    """
+    Searches the index for albums matching a user search.
+    All search tokens must prefix-match the artist, album or track names.
+
+    Args:
+    conn (sqlite3.Connection): Index database connection.
+    user_search (str): Raw user search input.
+    country_code (str): ISO 3166-1 alpha-2 country code.
+    limit (int): Maximum number of results.
+
+    Returns:
+    albums (list): List of matching album dictionaries, best match first, empty on a miss.
+    """
+    query = normalize(user_search)
+    if query == "":
+        return []
+    # Exact token prefix search
+    match = " AND ".join(f'"{token}"*' for token in query.split())
+    rows = conn.execute(
+        f"SELECT album_id FROM album_tokens WHERE album_tokens MATCH ? AND country = ? ORDER BY bm25(album_tokens, {', '.join(str(w) for w in TOKEN_COLUMN_WEIGHTS)}) LIMIT ?",
+        (match, country_code, limit)
+    ).fetchall()
+    albums = _get_albums_by_ids(conn, [row[0] for row in rows], country_code)
+    return albums
+
+def search_similar(conn: sqlite3.Connection, user_search: str, country_code: str, limit: int = config.ALBUM_RESULT_LIMIT) -> list:
+    """
+    Searches the index for albums with artist and album names similar to a user search, tolerating typos.
+    Similar albums are not necessarily the searched ones, so they are only suggestions for when an exact search finds nothing.
+
+    Args:
+    conn (sqlite3.Connection): Index database connection.
+    user_search (str): Raw user search input.
+    country_code (str): ISO 3166-1 alpha-2 country code.
+    limit (int): Maximum number of results.
+
+    Returns:
+    albums (list): List of similar album dictionaries, most similar first, empty on a miss.
+    """
+    query = normalize(user_search)
+    if len(query) < 3:
+        return []
+    # Trigram search, candidates are filtered by the share of query trigrams they contain
+    query_trigrams = trigrams(query)
+    match = " OR ".join(f'"{trigram}"' for trigram in query_trigrams)
+    candidates = conn.execute(
+        "SELECT album_id, title FROM album_trigrams WHERE album_trigrams MATCH ? AND country = ? ORDER BY rank LIMIT ?",
+        (match, country_code, limit * 10)
+    ).fetchall()
+    album_ids = [
+        album_id for album_id, title in candidates
+        if len(query_trigrams & trigrams(title)) / len(query_trigrams) >= config.INDEX_FUZZY_MIN_SIMILARITY
+    ][:limit]
+    albums = _get_albums_by_ids(conn, album_ids, country_code)
+    return albums
+
+def read_dump_records(dump_path: str) -> list:
+    """
+    Reads raw iTunes API result records from an offline dump.
+    Dumps are either JSON Lines files with one record per line, or JSON files holding an iTunes API response or a list of records.
+
+    Args:
+    dump_path (str): Path to the dump file.
+
+    Returns:
+    records (list): List of raw iTunes API result records.
+    """
+    with open(dump_path, "r", encoding="utf-8") as f:
+        if dump_path.endswith(".jsonl"):
+            records = [json.loads(line) for line in f if line.strip() != ""]
+        else:
+            content = json.load(f)
+            records = content['results'] if isinstance(content, dict) else content
+    return records
+
+def build_from_records(conn: sqlite3.Connection, records: list, country_code: str) -> tuple[int, int]:
+    """
+    Builds or extends the index from raw iTunes API album and track records.
+
+    Args:
+    conn (sqlite3.Connection): Index database connection.
+    records (list): List of raw iTunes API result records.
+    country_code (str): ISO 3166-1 alpha-2 country code.
+
+    Returns:
+    counts (tuple[int, int]): Number of indexed albums and tracks.
+    """
+    albums = [utils.parse_itunes_album(record) for record in records if utils.is_itunes_album(record)]
+    # Group track records by album, ordered by disc and track number
+    track_records = sorted([record for record in records if utils.is_itunes_track(record)], key=lambda record: (record.get('discNumber', 1), record['trackNumber']))
+    tracks_by_album = {}
+    for record in track_records:
+        tracks_by_album.setdefault(record['collectionId'], []).append(utils.parse_itunes_track(record))
+    add_albums(conn, albums, country_code)
+    for album in albums:
+        if album['id'] in tracks_by_album:
+            add_tracks(conn, album, country_code, tracks_by_album[album['id']])
+    counts = (len(albums), sum(len(tracks_by_album.get(album['id'], [])) for album in albums))
+    return counts
+
+def main() -> None:
+    """Builds the local metadata index from offline dumps."""
+    parser = argparse.ArgumentParser(description="Build the local metadata index from offline iTunes API dumps.")
+    parser.add_argument("dumps", nargs="+", help="Paths to .json or .jsonl dump files")
+    parser.add_argument("--country", default=config.ISO_3166_1_ALPHA_2_CC["United States of America"], help="ISO 3166-1 alpha-2 storefront country code of the dumps")
+    parser.add_argument("--db", default=config.INDEX_DB_PATH, help="Path to the index database file")
+    args = parser.parse_args()
+    conn = open_index(args.db)
+    for dump_path in args.dumps:
+        try:
+            album_count, track_count = build_from_records(conn, read_dump_records(dump_path), args.country)
+        except Exception as e:
+            print(f"{config.ANSI_FORMATS['FONT_RED']}✗{config.ANSI_FORMATS['END']} Failed to index {dump_path}: {e}")
+            sys.exit(1)
+        print(f"{config.ANSI_FORMATS['FONT_GREEN']}✔{config.ANSI_FORMATS['END']} Indexed {album_count} albums and {track_count} tracks from {dump_path}")
+    conn.close()
+
+if (__name__ == "__main__"):
+    main()
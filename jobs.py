@@ -0,0 +1,513 @@
+## -- STD LIB IMPORTS --
+import os
+import abc
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+import multiprocessing
+## -- LOCAL IMPORTS --
+import config   # constants
+import utils    # utility functions
+import progress # progress reporting
+
+## -- CLASSES --
+class JobQueue(abc.ABC):
+    """
+    Queue backend interface for render jobs.
+    Workers claim jobs with a time-limited lease; jobs whose lease expires are handed to the next worker,
+    failed jobs are retried with exponential backoff until the attempt limit is reached.
+    """
+    @abc.abstractmethod
+    def submit(self, payload: dict) -> str:
+        """
+        Adds a job to the queue.
+
+        Args:
+        payload (dict): Job payload.
+
+        Returns:
+        job_id (str): Job ID.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def claim(self, worker_id: str, lease_seconds: float) -> dict | None:
+        """
+        Claims the next due job for a worker.
+
+        Args:
+        worker_id (str): Worker ID.
+        lease_seconds (float): Lease duration in seconds.
+
+        Returns:
+        job (dict | None): Job dictionary with ID, payload and attempt count, None if no job is due.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """
+        Extends the lease of a claimed job.
+
+        Args:
+        job_id (str): Job ID.
+        worker_id (str): Worker ID holding the lease.
+        lease_seconds (float): Lease duration in seconds from now.
+
+        Returns:
+        extended (bool): True if the worker still holds the lease.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def complete(self, job_id: str, worker_id: str, result: str) -> bool:
+        """
+        Marks a claimed job as done.
+
+        Args:
+        job_id (str): Job ID.
+        worker_id (str): Worker ID holding the lease.
+        result (str): Job result, e.g. the output file path.
+
+        Returns:
+        completed (bool): True if the worker still held the lease.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str) -> float | None:
+        """
+        Marks a claimed job as failed, scheduling a retry if attempts remain.
+
+        Args:
+        job_id (str): Job ID.
+        worker_id (str): Worker ID holding the lease.
+        error (str): Error message.
+
+        Returns:
+        retry_delay (float | None): Seconds until the retry, None if the job failed permanently or the lease was lost.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def counts(self) -> dict:
+        """
+        Counts jobs by status.
+
+        Returns:
+        counts (dict): Mapping of status ("queued", "running", "done", "failed") to job count.
+        """
+        raise NotImplementedError
+
+class SqliteJobQueue(JobQueue):
+    """
+    Job queue backed by a single SQLite database file, safe for concurrent workers on one host or a shared volume with working file locks.
+    """
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        not_before REAL NOT NULL DEFAULT 0,
+        lease_owner TEXT,
+        lease_expires REAL,
+        result TEXT,
+        error TEXT,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, not_before);
+    """
+
+    def __init__(self, db_path: str, max_attempts: int = config.JOB_MAX_ATTEMPTS, backoff_seconds: float = config.JOB_RETRY_BACKOFF_SECONDS):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+
+    def submit(self, payload: dict) -> str:
+        cursor = self.conn.execute("INSERT INTO jobs (payload, updated_at) VALUES (?, ?)", (json.dumps(payload), time.time()))
+        return str(cursor.lastrowid)
+
+    def claim(self, worker_id: str, lease_seconds: float) -> dict | None:
+        now = time.time()
+        # Serialize claims across processes with an immediate write transaction
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Jobs whose lease expired on their last allowed attempt fail permanently
+            self.conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Lease expired', lease_owner = NULL, lease_expires = NULL, updated_at = ? WHERE status = 'running' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+            row = self.conn.execute(
+                "SELECT id, payload, attempts FROM jobs WHERE (status = 'queued' AND not_before <= ?) OR (status = 'running' AND lease_expires < ?) ORDER BY id LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, lease_expires = ?, updated_at = ? WHERE id = ?",
+                    (worker_id, now + lease_seconds, now, row[0])
+                )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        job = {"id": str(row[0]), "payload": json.loads(row[1]), "attempts": row[2] + 1} if row is not None else None
+        return job
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        cursor = self.conn.execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND status = 'running' AND lease_owner = ?",
+            (time.time() + lease_seconds, time.time(), int(job_id), worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: str) -> bool:
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_owner = NULL, lease_expires = NULL, updated_at = ? WHERE id = ? AND status = 'running' AND lease_owner = ?",
+            (result, time.time(), int(job_id), worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> float | None:
+        row = self.conn.execute("SELECT attempts FROM jobs WHERE id = ? AND status = 'running' AND lease_owner = ?", (int(job_id), worker_id)).fetchone()
+        if row is None:
+            return None
+        retry_delay = self.backoff_seconds * 2 ** (row[0] - 1) if row[0] < self.max_attempts else None
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = ?, not_before = ?, error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? WHERE id = ? AND status = 'running' AND lease_owner = ?",
+            ("queued" if retry_delay is not None else "failed", time.time() + (retry_delay or 0), error, time.time(), int(job_id), worker_id)
+        )
+        if cursor.rowcount != 1:
+            return None
+        return retry_delay
+
+    def counts(self) -> dict:
+        counts = {status: 0 for status in ("queued", "running", "done", "failed")}
+        counts.update(dict(self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()))
+        return counts
+
+class SpoolJobQueue(JobQueue):
+    """
+    Job queue backed by a spool directory with one JSON file per job, moved between status subdirectories by atomic renames.
+    Needs no database, so it works on any shared volume with atomic rename semantics.
+    Jobs are only rewritten while taken, i.e. renamed to a private claim file "<job ID>.<deadline ns>.<nonce>.claim" in the running
+    subdirectory, so no other worker can see or move them meanwhile. Claim files left past their deadline by crashed workers are requeued.
+    """
+    STATUSES = ("queued", "running", "done", "failed")
+
+    def __init__(self, spool_dir: str, max_attempts: int = config.JOB_MAX_ATTEMPTS, backoff_seconds: float = config.JOB_RETRY_BACKOFF_SECONDS):
+        self.spool_dir = spool_dir
+        for status in self.STATUSES:
+            os.makedirs(os.path.join(spool_dir, status), exist_ok=True)
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+
+    def _path(self, status: str, job_id: str) -> str:
+        """Composes the spool file path of a job in a status subdirectory."""
+        return os.path.join(self.spool_dir, status, f"{job_id}.json")
+
+    def _read(self, status: str, job_id: str) -> dict | None:
+        """Reads a job spool file, None if it was moved away meanwhile."""
+        return self._read_path(self._path(status, job_id))
+
+    @staticmethod
+    def _read_path(path: str) -> dict | None:
+        """Reads a job spool or claim file, None if it was moved away meanwhile."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _move(self, job_id: str, from_status: str, to_status: str) -> bool:
+        """Moves a job between status subdirectories. Renames are atomic, exactly one of several competing workers succeeds."""
+        try:
+            os.rename(self._path(from_status, job_id), self._path(to_status, job_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _take(self, path: str, job_id: str, deadline: float) -> str | None:
+        """Takes a job file by renaming it to a new private claim file, None if another worker took it first."""
+        claim_path = os.path.join(self.spool_dir, "running", f"{job_id}.{int(deadline * 1e9)}.{uuid.uuid4().hex[:8]}.claim")
+        try:
+            os.rename(path, claim_path)
+            return claim_path
+        except FileNotFoundError:
+            return None
+
+    def _list(self, status: str) -> list:
+        """Lists the job IDs of a status subdirectory in submission order."""
+        return sorted(name[:-5] for name in os.listdir(os.path.join(self.spool_dir, status)) if name.endswith(".json"))
+
+    def _list_claims(self) -> list:
+        """Lists the claim files of taken jobs as (path, job ID, deadline) tuples."""
+        claims = []
+        for name in os.listdir(os.path.join(self.spool_dir, "running")):
+            # Skip temporary files of claim file rewrites
+            if name.endswith(".claim") and not name.startswith("."):
+                job_id, deadline_ns, _, _ = name.split(".")
+                claims.append((os.path.join(self.spool_dir, "running", name), job_id, int(deadline_ns) / 1e9))
+        return claims
+
+    def _release(self, claim_path: str, job: dict, to_status: str, **updates) -> None:
+        """Rewrites a taken job with its lease cleared, then moves it to a status subdirectory."""
+        utils.atomic_write(claim_path, json.dumps({**job, **updates, "lease_owner": None, "lease_expires": None}))
+        os.rename(claim_path, self._path(to_status, job['id']))
+
+    def submit(self, payload: dict) -> str:
+        job_id = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+        utils.atomic_write(self._path("queued", job_id), json.dumps({"id": job_id, "payload": payload, "attempts": 0, "not_before": 0}))
+        return job_id
+
+    def _requeue_expired(self) -> None:
+        """Returns jobs with expired leases and abandoned claim files to the queue, or fails them if no attempts remain."""
+        now = time.time()
+        taken = []
+        for job_id in self._list("running"):
+            job = self._read("running", job_id)
+            if job is not None and (job.get('lease_expires') or 0) < now:
+                taken.append((self._take(self._path("running", job_id), job_id, now), job_id))
+        for claim_path, job_id, deadline in self._list_claims():
+            if deadline < now:
+                taken.append((self._take(claim_path, job_id, now), job_id))
+        for claim_path, job_id in taken:
+            # Read again once taken, the lease may have been renewed meanwhile
+            job = self._read_path(claim_path) if claim_path is not None else None
+            if job is None:
+                continue
+            if (job.get('lease_expires') or 0) >= now:
+                os.rename(claim_path, self._path("running", job_id))
+            elif job['attempts'] >= self.max_attempts:
+                self._release(claim_path, job, "failed", error="Lease expired")
+            else:
+                self._release(claim_path, job, "queued")
+
+    def claim(self, worker_id: str, lease_seconds: float) -> dict | None:
+        self._requeue_expired()
+        now = time.time()
+        for job_id in self._list("queued"):
+            job = self._read("queued", job_id)
+            if job is None or job['not_before'] > now:
+                continue
+            claim_path = self._take(self._path("queued", job_id), job_id, now + lease_seconds)
+            if claim_path is None:
+                continue
+            # Write the lease before the job becomes visible as running
+            job.update({"attempts": job['attempts'] + 1, "lease_owner": worker_id, "lease_expires": now + lease_seconds})
+            utils.atomic_write(claim_path, json.dumps(job))
+            os.rename(claim_path, self._path("running", job_id))
+            return {"id": job_id, "payload": job['payload'], "attempts": job['attempts']}
+        return None
+
+    def _owned(self, job_id: str, worker_id: str) -> dict | None:
+        """Reads a running job if the worker still holds its lease."""
+        job = self._read("running", job_id)
+        return job if job is not None and job.get('lease_owner') == worker_id else None
+
+    def _take_owned(self, job_id: str, worker_id: str, deadline: float) -> tuple[str | None, dict | None]:
+        """Takes a running job if the worker still holds its lease, jobs taken by mistake are put back."""
+        if self._owned(job_id, worker_id) is None:
+            return None, None
+        claim_path = self._take(self._path("running", job_id), job_id, deadline)
+        job = self._read_path(claim_path) if claim_path is not None else None
+        if job is not None and job.get('lease_owner') != worker_id:
+            os.rename(claim_path, self._path("running", job_id))
+            job = None
+        return claim_path, job
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        lease_expires = time.time() + lease_seconds
+        claim_path, job = self._take_owned(job_id, worker_id, lease_expires)
+        if job is None:
+            return False
+        utils.atomic_write(claim_path, json.dumps({**job, "lease_expires": lease_expires}))
+        os.rename(claim_path, self._path("running", job_id))
+        return True
+
+    def complete(self, job_id: str, worker_id: str, result: str) -> bool:
+        claim_path, job = self._take_owned(job_id, worker_id, time.time() + config.JOB_LEASE_SECONDS)
+        if job is None:
+            return False
+        self._release(claim_path, job, "done", result=result)
+        return True
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> float | None:
+        claim_path, job = self._take_owned(job_id, worker_id, time.time() + config.JOB_LEASE_SECONDS)
+        if job is None:
+            return None
+        retry_delay = self.backoff_seconds * 2 ** (job['attempts'] - 1) if job['attempts'] < self.max_attempts else None
+        # Rewrite before moving, so the job never becomes claimable without its retry delay
+        self._release(claim_path, job, "queued" if retry_delay is not None else "failed", error=error, not_before=time.time() + (retry_delay or 0))
+        return retry_delay
+
+    def counts(self) -> dict:
+        counts = {status: len(self._list(status)) for status in self.STATUSES}
+        # Taken jobs are still running
+        counts['running'] += len(self._list_claims())
+        return counts
+
+## -- FUNCTIONS --
+def open_queue(queue_url: str = config.JOB_QUEUE_URL) -> JobQueue:
+    """
+    Opens a job queue backend from a URL, "sqlite://<database path>" or "spool://<directory path>".
+
+    Args:
+    queue_url (str): Queue URL.
+
+    Returns:
+    queue (JobQueue): Job queue backend.
+    """
+    scheme, _, location = queue_url.partition("://")
+    backends = {"sqlite": SqliteJobQueue, "spool": SpoolJobQueue}
+    if scheme not in backends:
+        raise ValueError(f"Unsupported job queue backend '{scheme}', use one of: {', '.join(backends)}")
+    queue = backends[scheme](location)
+    return queue
+
+def create_worker_id() -> str:
+    """
+    Creates a worker ID unique across hosts and processes.
+
+    Returns:
+    worker_id (str): Worker ID.
+    """
+    worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:4]}"
+    return worker_id
+
+def keep_lease(queue: JobQueue, job_id: str, worker_id: str, lease_seconds: float, stop: threading.Event) -> None:
+    """
+    Periodically extends a job lease until stopped.
+
+    Args:
+    queue (JobQueue): Job queue backend, used from this thread only.
+    job_id (str): Job ID.
+    worker_id (str): Worker ID.
+    lease_seconds (float): Lease duration in seconds.
+    stop (threading.Event): Event set when the job has finished.
+
+    Returns:
+    None
+    """
+    while not stop.wait(lease_seconds / 3):
+        if not queue.heartbeat(job_id, worker_id, lease_seconds):
+            return
+
+def run_worker(queue_url: str, render_job, lease_seconds: float = config.JOB_LEASE_SECONDS, poll_interval: float = config.JOB_POLL_INTERVAL_SECONDS, exit_when_empty: bool = False, event_queue = None, on_exit = None) -> None:
+    """
+    Claims and renders jobs until interrupted, or until no jobs are left if requested.
+
+    Args:
+    queue_url (str): Queue URL.
+    render_job (Callable[[dict], str]): Renders a job payload and returns the output file path, raises on failure.
+    lease_seconds (float): Lease duration in seconds.
+    poll_interval (float): Seconds to wait between polls of an empty queue.
+    exit_when_empty (bool): Stop once no jobs are queued or running.
+    event_queue (multiprocessing.Queue | None): Progress event queue of the parent process, None to report progress directly.
+    on_exit (Callable[[], None] | None): Called once the worker stops, e.g. to flush output buffered across jobs.
+
+    Returns:
+    None
+    """
+    reporter = progress.forward_events(event_queue) if event_queue is not None else progress.get_reporter()
+    queue = open_queue(queue_url)
+    worker_id = create_worker_id()
+    reporter.log(f"  Worker {worker_id} started")
+    try:
+        _process_jobs(queue, worker_id, queue_url, render_job, lease_seconds, poll_interval, exit_when_empty, reporter)
+    finally:
+        if on_exit is not None:
+            on_exit()
+    reporter.log(f"  Worker {worker_id} finished, queue is empty")
+
+def _process_jobs(queue: JobQueue, worker_id: str, queue_url: str, render_job, lease_seconds: float, poll_interval: float, exit_when_empty: bool, reporter: progress.ProgressReporter) -> None:
+    """
+    Claims and renders jobs until interrupted, or until no jobs are left if requested.
+
+    Args:
+    queue (JobQueue): Job queue.
+    worker_id (str): Worker ID.
+    queue_url (str): Queue URL, lease keepers open their own backend connection.
+    render_job (Callable[[dict], str]): Renders a job payload and returns the output file path, raises on failure.
+    lease_seconds (float): Lease duration in seconds.
+    poll_interval (float): Seconds to wait between polls of an empty queue.
+    exit_when_empty (bool): Stop once no jobs are queued or running.
+    reporter (progress.ProgressReporter): Progress reporter.
+
+    Returns:
+    None
+    """
+    while True:
+        job = queue.claim(worker_id, lease_seconds)
+        if job is None:
+            counts = queue.counts()
+            if exit_when_empty and counts['queued'] == 0 and counts['running'] == 0:
+                break
+            time.sleep(poll_interval)
+            continue
+        # Keep lease alive from a separate thread with its own backend connection
+        stop = threading.Event()
+        lease_keeper = threading.Thread(target=keep_lease, args=(open_queue(queue_url), job['id'], worker_id, lease_seconds, stop), daemon=True)
+        lease_keeper.start()
+        try:
+            result = render_job(job['payload'])
+        except Exception as e:
+            # Wait for a running heartbeat, so the job is not updated concurrently
+            stop.set()
+            lease_keeper.join()
+            retry_delay = queue.fail(job['id'], worker_id, str(e))
+            message = f"{config.ANSI_FORMATS['FONT_RED']}✗{config.ANSI_FORMATS['END']} Job {job['id']} failed on attempt {job['attempts']}, " + (f"retrying in {retry_delay:.0f}s ({e})" if retry_delay is not None else f"giving up ({e})")
+            # Only jobs given up on count as failed items, retried jobs are still pending
+            if retry_delay is not None:
+                reporter.log(message)
+            else:
+                reporter.item_finished(False, message)
+            continue
+        stop.set()
+        lease_keeper.join()
+        if queue.complete(job['id'], worker_id, result):
+            reporter.item_finished(True, f"{config.ANSI_FORMATS['FONT_GREEN']}✔{config.ANSI_FORMATS['END']} Job {job['id']} done {config.ANSI_FORMATS['FONT_LIGHT_GREEN']}{result}{config.ANSI_FORMATS['END']}")
+        else:
+            reporter.item_finished(False, f"{config.ANSI_FORMATS['FONT_RED']}✗{config.ANSI_FORMATS['END']} Job {job['id']} lease lost before completion, result discarded")
+
+def run_workers(queue_url: str, render_job, worker_count: int, exit_when_empty: bool = False, on_exit = None) -> None:
+    """
+    Runs several worker processes on this node and waits for them to finish.
+    Progress events of all workers are aggregated by the progress reporter of this process.
+
+    Args:
+    queue_url (str): Queue URL.
+    render_job (Callable[[dict], str]): Module-level function rendering a job payload.
+    worker_count (int): Number of worker processes.
+    exit_when_empty (bool): Stop workers once no jobs are queued or running.
+    on_exit (Callable[[], None] | None): Module-level function called by each worker once it stops.
+
+    Returns:
+    None
+    """
+    reporter = progress.get_reporter()
+    if exit_when_empty:
+        # Draining a queue has a known amount of work
+        counts = open_queue(queue_url).counts()
+        reporter.set_total(counts['queued'] + counts['running'])
+    try:
+        if worker_count <= 1:
+            run_worker(queue_url, render_job, exit_when_empty = exit_when_empty, on_exit = on_exit)
+            return
+        event_queue = multiprocessing.Queue()
+        consumer = reporter.consume(event_queue)
+        processes = [multiprocessing.Process(target=run_worker, args=(queue_url, render_job), kwargs={"exit_when_empty": exit_when_empty, "event_queue": event_queue, "on_exit": on_exit}) for _ in range(worker_count)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        event_queue.put(None)
+        consumer.join()
+    finally:
+        reporter.close()
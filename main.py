@@ -1,18 +1,47 @@
 ## -- STD LIB IMPORTS --
-import requests
 import shutil
 import os
 import json
+import gzip
 import base64
+import hashlib
+import functools
 import sys
-import html
+import sqlite3
+import argparse
 import time
 import threading
-## -- EXT LIB IMPORTS --
-from InquirerPy import prompt
+import tracemalloc
 ## -- LOCAL IMPORTS --
 import config   # constants
 import utils    # utility functions
+import index    # local metadata index
+import catalogue    # columnar metadata catalogue
+import jobs     # render job queue
+import batch    # resumable batch runs
+import providers    # metadata providers
+import progress     # progress reporting
+import pipeline     # bounded stage pipelines
+import storefronts  # storefront fallback
+import templatedev  # template development mode
+
+## -- Classes --
+class RenderError(Exception):
+    """
+    Raised when any step of rendering an album fails.
+    Ends an interactive run, but only fails the affected job in worker runs.
+    The error string holds the failed step and its cause, e.g. "Error caching artwork: HTTP 404".
+    """
+    def __init__(self, message: str, cause: Exception | None = None):
+        if cause is None:
+            error = message
+        elif message == "":
+            error = str(cause)
+        else:
+            error = f"{message}: {cause}"
+        super().__init__(error)
+        self.message = message
+        self.cause = cause
 
 ## -- Functions --
 def print_title() -> None:
@@ -49,82 +78,68 @@ def print_error_and_trigger_exit(e: Exception, message = "") -> None:
     # Print exception message
     print(f"✗ {e}")
     # Initiate graceful exit
-    clean_up_and_exit(config.TEMP_ARTWORK_DIR_PATH)
+    clean_up_and_exit(config.TEMP_RUN_DIR_PATH)
 
-def loading_spinner(loading_text: str, success_text: str, failure_text: str) -> None:
+def raise_render_error(e: Exception, message = "") -> None:
     """
-    Display loading spinner with text.
+    Raises a render error wrapping the original exception. Render errors raised by nested steps are passed on unchanged.
 
     Args:
-    text (str): Text to display with loading spinner.
-    
+    e (Exception): Exception object.
+    message (str): Optional message describing the failed step.
+
     Returns:
     None
     """
-    # Define loading spinner animation
-    animation = "|/-\\"
-    idx = 0
-    # Get current thread
-    t = threading.current_thread()
-    # Show animation while attribute is set
-    while getattr(t, "is_loading", True):
-        print(f"  {loading_text}..." + animation[idx % len(animation)], end="\r")
-        idx += 1
-        time.sleep(0.1)
-    # Print success or failure text based on success status attribute
-    if getattr(t, "finished_successfully", True):
-        print(f"{config.ANSI_FORMATS['FONT_GREEN']}✔{config.ANSI_FORMATS['END']} {success_text}")
-    else:
-        print(f"{config.ANSI_FORMATS['FONT_RED']}✗{config.ANSI_FORMATS['END']} {failure_text}")
-    
-def spawn_loading_spinner_thread(loading_text: str, success_text: str, failure_text: str) -> threading.Thread:
+    if isinstance(e, RenderError):
+        raise e
+    raise RenderError(message, e) from e
+
+def start_progress_task(stage: str, loading_text: str, success_text: str, failure_text: str) -> progress.Task:
     """
-    Spawns a new thread for the loading spinner.
+    Starts a progress task, shown with a loading spinner by the progress reporter of the run.
 
     Args:
+    stage (str): Stage name the task latency is recorded under.
     loading_text (str): Text to display with loading spinner.
     success_text (str): Text to display upon successful completion.
     failure_text (str): Text to display upon failure.
 
     Returns:
-    thread (threading.Thread): Thread object for loading spinner.
+    task (progress.Task): Running progress task.
     """
-    thread = None
-    try:
-        # Spawn thread with target function and arguments
-        thread = threading.Thread(target=loading_spinner, args=(loading_text, success_text, failure_text))
-        # Set thread as daemon to allow for KeyboardInterrupt to stop thread
-        thread.daemon = True                                                                                                
-        # Set thread loading status to True to start animation  
-        thread.is_loading = True                                                                                    
-        # Set thread success status initial value
-        thread.finished_successfully = False                                                                    
-        # Start thread   
-        thread.start()                                                                                                           
-    except KeyboardInterrupt:
-        pass
-    return thread
+    task = progress.get_reporter().start_task(stage, loading_text, success_text, failure_text)
+    return task
 
-def terminate_loading_spinner_thread(thread: threading.Thread, terminate_success: bool ) -> None:
+def finish_progress_task(task: progress.Task | None, success: bool) -> None:
     """
-    Terminates the loading spinner thread and sets success status.
+    Finishes a progress task and reports success or failure.
 
     Args:
-    thread (threading.Thread): Thread object for loading spinner.
-    terminate_success (bool): True if successful, False if failed.
+    task (progress.Task | None): Progress task, None in non-interactive runs.
+    success (bool): True if successful, False if failed.
 
     Returns:
     None
     """
-    try:
-        # Set thread loading status attribute to stop animation
-        thread.is_loading = False
-        # Set thread success status for conditional print of failure text                            
-        thread.finished_successfully = {terminate_success}
-        # Join thread back to main thread / end thread     
-        thread.join()                                           
-    except KeyboardInterrupt: 
-        pass
+    # Nothing to finish in non-interactive runs
+    if task is None:
+        return
+    task.finish(success)
+
+def prompt(questions: list) -> dict:
+    """
+    Asks InquirerPy prompt questions. InquirerPy is imported on first use, so the render core can be embedded without it.
+
+    Args:
+    questions (list): List of InquirerPy question dictionaries.
+
+    Returns:
+    answers (dict): Mapping of question names to answers.
+    """
+    from InquirerPy import prompt as inquirer_prompt
+    answers = inquirer_prompt(questions)
+    return answers
 
 def get_user_search() -> str:
     """
@@ -193,54 +208,221 @@ def get_store_country_code() -> str:
     country_code = config.ISO_3166_1_ALPHA_2_CC[country]
     return country_code
 
-def get_albums_from_itunes(search_string: str, country_code: str, spinner_thread: threading.Thread) -> list:
+def get_albums_from_provider(provider: providers.MetadataProvider, user_search: str, country_code: str, progress_task: progress.Task | None) -> list:
     """
-    Fetches albums from the iTunes API based on the search string and country code.
+    Fetches albums matching a user search and country code from a metadata provider.
 
     Args:
-    search_string (str): Formatted search string for the iTunes API.
+    provider (providers.MetadataProvider): Metadata provider.
+    user_search (str): Raw user search input.
     country_code (str): ISO 3166-1 alpha-2 country code.
-    spinner_thread (threading.Thread): Thread object for loading spinner.
+    progress_task (progress.Task | None): Progress task shown with a loading spinner.
 
     Returns:
-    albums (list): Dictionary of albums fetched from the iTunes API.
+    albums (list): List of album dictionaries, empty if the provider could not serve the search.
     """
-    # Initialize albums dictionary
+    # Initialize albums list
     albums = []
-    # Set request url
-    url = f"{config.SEARCH_API_BASE_URL}?term={search_string}&entity=album&country={country_code}&limit={config.ALBUM_RESULT_LIMIT}" # iTunes API URL
     try:
-        # Send GET request to iTunes API
-        response = requests.get(url)
-        # Handle response status code
-        if response.status_code == 200:
-            # Terminate loading spinner thread with success message
-            terminate_loading_spinner_thread(spinner_thread, True)
-            # Parse JSON response
-            albums = response.json()
-            # Filter out non-album results and reduce to required properties
-            albums = [
-                {
-                    "artist": album['artistName'],
-                    "artist_id": album['artistId'],
-                    "id": album['collectionId'],
-                    "name": album['collectionName'],
-                    "artwork_url": album['artworkUrl100'].replace("100x100bb", "1500x1500bb"),
-                    "track_count": album['trackCount'],
-                    "copyright": album['copyright'],
-                    "release_date": album['releaseDate'],
-                } for album in response.json()['results'] if album['wrapperType'] == 'collection' and album['collectionType'] == 'Album'
-            ]
-        else:
-            # Terminate loading spinner thread with failure message
-            terminate_loading_spinner_thread(spinner_thread, False)
+        # Search albums with provider
+        albums = provider.search_albums(user_search, country_code, config.ALBUM_RESULT_LIMIT)
+        # Finish progress task with success message
+        finish_progress_task(progress_task, True)
+    except providers.ProviderError:
+        # Finish progress task with failure message
+        finish_progress_task(progress_task, False)
     except Exception as e:
-        # Terminate loading spinner thread with exception message
-        terminate_loading_spinner_thread(spinner_thread, False)
-        # Print error message and trigger exit
-        print_error_and_trigger_exit(e)
+        # Finish progress task with exception message
+        finish_progress_task(progress_task, False)
+        # Raise render error
+        raise_render_error(e)
+    return albums
+
+def open_metadata_provider(provider_url: str) -> providers.MetadataProvider:
+    """
+    Opens the metadata provider of a run.
+
+    Args:
+    provider_url (str): Provider URL.
+
+    Returns:
+    provider (providers.MetadataProvider): Metadata provider.
+    """
+    try:
+        provider = providers.open_provider(provider_url)
+    except Exception as e:
+        # Raise render error
+        raise_render_error(e, "Error opening metadata provider")
+    return provider
+
+def open_local_index() -> sqlite3.Connection | None:
+    """
+    Opens the local metadata index if enabled. Failures only disable the index, they never end the run.
+
+    Returns:
+    index_conn (sqlite3.Connection | None): Index database connection, None if disabled or unavailable.
+    """
+    index_conn = None
+    if config.USE_LOCAL_INDEX:
+        try:
+            index_conn = index.open_index(config.INDEX_DB_PATH)
+        except Exception as e:
+            print(f"{config.ANSI_FORMATS['FONT_RED']}✗{config.ANSI_FORMATS['END']} Local index unavailable, using metadata provider only ({e})")
+    return index_conn
+
+def search_local_index(index_conn: sqlite3.Connection | None, user_search: str, country_code: str, similar: bool = False) -> list:
+    """
+    Searches the local metadata index for albums, treating any index failure as a miss.
+
+    Args:
+    index_conn (sqlite3.Connection | None): Index database connection.
+    user_search (str): Raw user search input.
+    country_code (str): ISO 3166-1 alpha-2 country code.
+    similar (bool): Search typo-tolerantly for similar albums instead of exact matches.
+
+    Returns:
+    albums (list): List of album dictionaries from the local index, empty on a miss.
+    """
+    albums = []
+    if index_conn is not None:
+        try:
+            search = index.search_similar if similar else index.search
+            albums = search(index_conn, user_search, country_code, config.ALBUM_RESULT_LIMIT)
+        except Exception:
+            albums = []
+    return albums
+
+def find_albums(provider: providers.MetadataProvider, index_conn: sqlite3.Connection | None, catalogue_writer: catalogue.CatalogueWriter, user_search: str, country_code: str) -> list:
+    """
+    Finds albums matching a user search. Exact local index matches are used without asking the metadata provider.
+    Similar local index matches are only suggested if the provider finds nothing or fails, since they may not be the searched albums.
+
+    Args:
+    provider (providers.MetadataProvider): Metadata provider.
+    index_conn (sqlite3.Connection | None): Index database connection.
+    catalogue_writer (catalogue.CatalogueWriter): Catalogue writer of the run.
+    user_search (str): Raw user search input.
+    country_code (str): ISO 3166-1 alpha-2 country code.
+
+    Returns:
+    albums (list): List of album dictionaries.
+    """
+    # Search local index first
+    albums = search_local_index(index_conn, user_search, country_code)
+    if len(albums) > 0:
+        print(f"{config.ANSI_FORMATS['FONT_GREEN']}✔{config.ANSI_FORMATS['END']} Found albums in local index")
+        return albums
+    # Start progress task
+    task_album_loading = start_progress_task("search", f"Fetching albums from {provider.label}", f"Successfully fetched albums from {provider.label}", f"Failed to fetch albums from {provider.label}")
+    try:
+        # Get albums from provider on local index miss
+        albums = get_albums_from_provider(provider, user_search, country_code, task_album_loading)
+        provider_error = None
+    except RenderError as e:
+        albums, provider_error = [], e
+    # Record fetched albums in local index and catalogue
+    update_local_index(index_conn, country_code, albums = albums)
+    update_catalogue(catalogue_writer, country_code, albums = albums)
+    if len(albums) == 0:
+        # Suggest similar albums from the local index instead
+        albums = search_local_index(index_conn, user_search, country_code, similar = True)
+        if len(albums) > 0:
+            print(f"{config.ANSI_FORMATS['FONT_GREEN']}✔{config.ANSI_FORMATS['END']} Found similar albums in local index")
+        elif provider_error is not None:
+            raise provider_error
     return albums
 
+def get_local_index_tracks(index_conn: sqlite3.Connection | None, album_id: str, country_code: str) -> list:
+    """
+    Gets the track list of an album from the local metadata index, treating any index failure as a miss.
+
+    Args:
+    index_conn (sqlite3.Connection | None): Index database connection.
+    album_id (str): Album ID.
+    country_code (str): ISO 3166-1 alpha-2 country code.
+
+    Returns:
+    tracks (list): List of track dictionaries from the local index, empty on a miss.
+    """
+    tracks = []
+    if index_conn is not None:
+        try:
+            tracks = index.get_tracks(index_conn, album_id, country_code)
+        except Exception:
+            tracks = []
+    return tracks
+
+def update_local_index(index_conn: sqlite3.Connection | None, country_code: str, albums: list = None, album: dict = None, tracks: list = None) -> None:
+    """
+    Records freshly fetched albums and/or an album's tracks in the local metadata index.
+    Index write failures are ignored, the run continues with the fetched data.
+
+    Args:
+    index_conn (sqlite3.Connection | None): Index database connection.
+    country_code (str): ISO 3166-1 alpha-2 country code.
+    albums (list): List of album dictionaries to record.
+    album (dict): Album dictionary the tracks belong to.
+    tracks (list): List of track dictionaries to record.
+
+    Returns:
+    None
+    """
+    if index_conn is None:
+        return
+    try:
+        if albums:
+            index.add_albums(index_conn, albums, country_code)
+        if album is not None and tracks:
+            index.add_tracks(index_conn, album, country_code, tracks)
+    except Exception:
+        pass
+
+def update_catalogue(catalogue_writer: catalogue.CatalogueWriter, country_code: str, albums: list = None, album: dict = None, tracks: list = None) -> None:
+    """
+    Buffers freshly fetched albums and/or an album's tracks for the columnar catalogue.
+
+    Args:
+    catalogue_writer (catalogue.CatalogueWriter): Catalogue writer of the run.
+    country_code (str): ISO 3166-1 alpha-2 country code.
+    albums (list): List of album dictionaries to record.
+    album (dict): Album dictionary the tracks belong to.
+    tracks (list): List of track dictionaries to record.
+
+    Returns:
+    None
+    """
+    if albums:
+        catalogue_writer.add_albums(albums, country_code)
+    if album is not None and tracks:
+        catalogue_writer.add_tracks(album['id'], country_code, tracks)
+
+def flush_catalogue(catalogue_writer: catalogue.CatalogueWriter) -> None:
+    """
+    Appends the run's buffered records to the columnar catalogue. Failures are reported but never end the run.
+
+    Args:
+    catalogue_writer (catalogue.CatalogueWriter): Catalogue writer of the run.
+
+    Returns:
+    None
+    """
+    try:
+        catalogue_writer.flush()
+    except Exception as e:
+        print(f"{config.ANSI_FORMATS['FONT_RED']}✗{config.ANSI_FORMATS['END']} Failed to update catalogue ({e})")
+
+def flush_storefront_availability() -> None:
+    """
+    Writes the storefront availability records of the run to the cache file. Failures are reported but never end the run.
+
+    Returns:
+    None
+    """
+    try:
+        storefronts.flush_availability()
+    except Exception as e:
+        print(f"{config.ANSI_FORMATS['FONT_RED']}✗{config.ANSI_FORMATS['END']} Failed to update storefront cache ({e})")
+
 def create_dir(dir_path: str) -> None:
     """
     Creates a directory if it does not exist.
@@ -251,20 +433,20 @@ def create_dir(dir_path: str) -> None:
     Returns:
     None
     """
-    # Attempt to create directory if not exists
+    # Attempt to create directory if not exists, tolerating concurrent creation by other runs
     try:
-        if not os.path.exists(dir_path):
-            os.makedirs(dir_path)
+        os.makedirs(dir_path, exist_ok=True)
     except Exception as e:
-        # Print error message and trigger exit
-        print_error_and_trigger_exit(e, "Failed to create directory")
+        # Raise render error
+        raise_render_error(e, "Failed to create directory")
 
 def clean_up_and_exit(clean_up_path: str) -> None:
     """
-    Exits the script with a message.
+    Removes the run's temporary directory and exits the script with a message.
+    Scratch directories of other, concurrently running processes are left untouched.
 
     Args:
-    None
+    clean_up_path (str): Path to the per-run temporary directory.
 
     Returns:
     None
@@ -273,9 +455,12 @@ def clean_up_and_exit(clean_up_path: str) -> None:
     # Attempt to remove temporary directory and files if exist
     try:
         if os.path.exists(clean_up_path):
-            for f in os.listdir(clean_up_path):
-                os.remove(os.path.join(clean_up_path, f))
-            os.rmdir(clean_up_path)
+            shutil.rmtree(clean_up_path)
+        # Remove shared temporary root only if no other run is using it
+        try:
+            os.rmdir(config.TEMP_ARTWORK_DIR_PATH)
+        except OSError:
+            pass
     except Exception as e:
         # Print error message
         print(f"✗ {e}")
@@ -300,7 +485,7 @@ def validate_or_exit(container: list, message: str) -> None:
     if len(container) == 0:
         print(message)
         # Initiate graceful exit
-        clean_up_and_exit(config.TEMP_ARTWORK_DIR_PATH)
+        clean_up_and_exit(config.TEMP_RUN_DIR_PATH)
 
 def get_selected_album(albums: list) -> dict:
     """
@@ -331,85 +516,209 @@ def get_selected_album(albums: list) -> dict:
     album = albums[selected_album_idx]
     return album
 
-def get_album_tracks_from_itunes(album_id: str, country_code: str, spinner_thread: threading.Thread) -> list:
+def get_album_and_tracks_from_storefronts(provider: providers.MetadataProvider, album_id: str, country_code: str, fallback_country_codes: list, progress_task: progress.Task | None) -> tuple[str, dict | None, list]:
     """
-    Fetches tracks from the iTunes API based on album ID and country code.
+    Fetches an album and its tracks from a metadata provider based on album ID and country code,
+    falling back to other storefronts if the album is unavailable in the requested one.
 
     Args:
+    provider (providers.MetadataProvider): Metadata provider.
     album_id (str): Album ID.
     country_code (str): ISO 3166-1 alpha-2 country code.
-    spinner_thread (threading.Thread): Thread object for loading spinner.
+    fallback_country_codes (list): Ordered list of fallback storefront country codes, empty to disable fallback.
+    progress_task (progress.Task | None): Progress task shown with a loading spinner, None in non-interactive runs.
 
     Returns:
-    tracks (list): Dictionary of tracks fetched from the iTunes API.
+    lookup (tuple[str, dict | None, list]): Serving country code, album dictionary (None if not found) and list of track dictionaries.
     """
-    # Initialize tracks dictionary
-    tracks = []
-    # Set request URL
-    url = f"{config.LOOKUP_API_BASE_URL}?id={album_id}&entity=song&country={country_code}"
+    # Initialize lookup
+    store_country_code, album, tracks = country_code, None, []
     try:
-        # Send GET request to iTunes API
-        response = requests.get(url)
-        # Handle response status code
-        if response.status_code == 200:
-            # Terminate loading spinner thread with success message
-            terminate_loading_spinner_thread(spinner_thread, True)
-            # Parse JSON response
-            tracks = response.json()
-            # Filter out non-track results and reduce to required properties
-            tracks = [
-                {
-                    "id": track['trackId'],
-                    "name": track['trackName'],
-                    "number": track['trackNumber'],
-                    "time_millis": track['trackTimeMillis'],
-                    "time_parts": utils.millis_to_minutes_and_seconds(track['trackTimeMillis'])
-                } for track in response.json()['results'] if track['wrapperType'] == 'track'
-            ]
-        else:
-            # Terminate loading spinner thread with failure message
-            terminate_loading_spinner_thread(spinner_thread, False)
+        # Look up album and tracks in the requested or fallback storefronts
+        store_country_code, album, tracks = storefronts.resolve_album(provider, album_id, country_code, fallback_country_codes)
+        # Finish progress task with success or failure message
+        finish_progress_task(progress_task, len(tracks) > 0)
     except Exception as e:
-        # Terminate loading spinner thread with exception message
-        terminate_loading_spinner_thread(spinner_thread, False)
-        # Print error message and trigger exit
-        print_error_and_trigger_exit(e)
-    return tracks
+        # Finish progress task with exception message
+        finish_progress_task(progress_task, False)
+        # Raise render error
+        raise_render_error(e)
+    return store_country_code, album, tracks
 
-def download_album_artwork(artwork_url: str, file_path: str, spinner_thread: threading.Thread) -> None:
+def fetch_album_artwork(provider: providers.MetadataProvider, album: dict, size: int, file_path: str, progress_task: progress.Task | None) -> None:
     """
-    Fetches album artwork from a URL and saves it to a temporary file.
+    Fetches album artwork from a metadata provider and saves it to a temporary file.
 
     Args:
-    artwork_url (str): URL of the album artwork.
-    spinner_thread (threading.Thread): Thread object for loading spinner.
+    provider (providers.MetadataProvider): Metadata provider.
+    album (dict): Album dictionary.
+    size (int): Artwork edge length in pixels.
+    file_path (str): Path to the temporary artwork file.
+    progress_task (progress.Task | None): Progress task shown with a loading spinner, None in non-interactive runs.
 
     Returns:
     None
     """
     try:
-        # Send GET request to artwork URL
-        response = requests.get(artwork_url, stream=True)
-        # Handle response status code
-        if response.status_code == 200:
-            # Terminate loading spinner thread with success message
-            terminate_loading_spinner_thread(spinner_thread, True)
-            try:
-                # Save artwork to file
-                with open(file_path, "wb") as f:
-                    response.raw.decode_content = True
-                    shutil.copyfileobj(response.raw, f)
-            except Exception as e:
-                # Print error message and trigger exit
-                print_error_and_trigger_exit(e, "Error saving artwork to file")
-        else:
-            # Terminate loading spinner thread with failure message
-            terminate_loading_spinner_thread(spinner_thread, False)
+        # Fetch artwork with provider
+        provider.fetch_artwork(album, size, file_path)
+        # Finish progress task with success message
+        finish_progress_task(progress_task, True)
+    except providers.ProviderError:
+        # Finish progress task with failure message
+        finish_progress_task(progress_task, False)
     except Exception as e:
-        # Terminate loading spinner thread with exception message
-        terminate_loading_spinner_thread(spinner_thread, False)
-        # Print error message and trigger exit
-        print_error_and_trigger_exit(e)
+        # Finish progress task with exception message
+        finish_progress_task(progress_task, False)
+        # Raise render error
+        raise_render_error(e, "Error saving artwork to file")
+
+def get_artwork_cache_path(album_id: str, size: int) -> str:
+    """
+    Composes the shared cache file path of an album artwork rendition.
+
+    Args:
+    album_id (str): Album ID.
+    size (int): Artwork edge length in pixels.
+
+    Returns:
+    artwork_file_path (str): Artwork cache file path.
+    """
+    artwork_file_path = os.path.join(config.ARTWORK_CACHE_DIR_PATH, f"{album_id}-{size}.jpg")
+    return artwork_file_path
+
+def download_album_artwork_to_cache(provider: providers.MetadataProvider, album: dict, size: int, file_path: str, progress_task: progress.Task | None) -> None:
+    """
+    Downloads album artwork into the shared artwork cache.
+    Downloads go to the per-run temporary directory first and are moved into the cache once complete,
+    the cache entry is locked meanwhile so concurrent runs download each artwork only once.
+
+    Args:
+    provider (providers.MetadataProvider): Metadata provider.
+    album (dict): Album dictionary.
+    size (int): Artwork edge length in pixels.
+    file_path (str): Artwork cache file path.
+    progress_task (progress.Task | None): Progress task shown with a loading spinner, None in non-interactive runs.
+
+    Returns:
+    None
+    """
+    # Create cache and per-run temporary directories
+    create_dir(os.path.dirname(file_path))
+    create_dir(config.TEMP_RUN_DIR_PATH)
+    try:
+        with utils.file_lock(file_path):
+            # Another run may have completed the download while waiting for the lock
+            if os.path.exists(file_path):
+                finish_progress_task(progress_task, True)
+                return
+            temp_file_path = os.path.join(config.TEMP_RUN_DIR_PATH, os.path.basename(file_path))
+            # Get album artwork from provider
+            fetch_album_artwork(provider, album, size, temp_file_path, progress_task)
+            # Move completed download into cache
+            if os.path.exists(temp_file_path):
+                shutil.move(temp_file_path, file_path)
+    except Exception as e:
+        # Raise render error
+        raise_render_error(e, "Error caching artwork")
+    evict_artwork_cache()
+
+# Time of the last artwork cache eviction of the process, guarded by the lock
+_artwork_eviction_lock = threading.Lock()
+_artwork_eviction_time = None
+
+def evict_artwork_cache(force: bool = False) -> None:
+    """
+    Evicts least recently used artworks from the shared artwork cache, at most once per eviction interval.
+    Eviction failures never fail the render.
+
+    Args:
+    force (bool): Evict regardless of the eviction interval.
+
+    Returns:
+    None
+    """
+    global _artwork_eviction_time
+    with _artwork_eviction_lock:
+        if not force and _artwork_eviction_time is not None and time.monotonic() - _artwork_eviction_time < config.ARTWORK_CACHE_EVICT_INTERVAL_SECONDS:
+            return
+        _artwork_eviction_time = time.monotonic()
+    try:
+        utils.evict_cache(config.ARTWORK_CACHE_DIR_PATH, config.ARTWORK_CACHE_MAX_MB * 1024 * 1024, config.ARTWORK_CACHE_MAX_AGE_DAYS * 86400)
+    except OSError:
+        pass
+
+@functools.lru_cache(maxsize=None)
+def get_font_file_hash(font_name: str) -> tuple[str, str]:
+    """
+    Resolves a font file and hashes its content once per run.
+
+    Args:
+    font_name (str): Font file name or path, extension optional.
+
+    Returns:
+    font (tuple[str, str]): Font file path and SHA-256 hex digest of its content.
+    """
+    font_path = utils.get_font_path(font_name)
+    font = (font_path, utils.file_sha256(font_path))
+    return font
+
+@functools.lru_cache(maxsize=1024)
+def get_font_face_rule(font_name: str, font_family: str, font_weight: str, glyphs: str) -> str:
+    """
+    Composes a CSS font face rule embedding a WOFF2 subset of a font.
+    Subsets are cached on disk by font content and glyph set, so repeated renders of the same text reuse them.
+
+    Args:
+    font_name (str): Font file name or path, extension optional.
+    font_family (str): Font family name the rule declares.
+    font_weight (str): Font weight the rule declares.
+    glyphs (str): Characters the subset must contain.
+
+    Returns:
+    font_face_rule (str): CSS font face rule.
+    """
+    font_path, font_hash = get_font_file_hash(font_name)
+    subset_hash = hashlib.sha256(f"{font_hash}:{glyphs}".encode("utf-8")).hexdigest()
+    subset_file_path = os.path.join(config.FONT_SUBSET_CACHE_DIR_PATH, f"{subset_hash[:32]}.woff2")
+    if os.path.exists(subset_file_path):
+        with open(subset_file_path, "rb") as f:
+            font_data = f.read()
+    else:
+        # Subset font and store in cache, concurrent runs write identical content
+        font_data = utils.subset_font(font_path, glyphs)
+        create_dir(config.FONT_SUBSET_CACHE_DIR_PATH)
+        utils.atomic_write(subset_file_path, font_data)
+    font_face_rule = f"@font-face{{font-family:\"{font_family}\";font-weight:{font_weight};src:url(data:font/woff2;base64,{base64.b64encode(font_data).decode('ascii')}) format(\"woff2\")}}"
+    return font_face_rule
+
+def embed_font_subsets(svg_file_content: str, template: dict) -> str:
+    """
+    Embeds WOFF2 subsets of the template fonts into SVG content, holding only the glyphs its text elements use.
+    The embedded fonts are the ones text overflow is measured with, so the layout renders identically without them installed.
+
+    Args:
+    svg_file_content (str): SVG file content.
+    template (dict): Template dictionary.
+
+    Returns:
+    svg_file_content (str): SVG file content with embedded fonts.
+    """
+    try:
+        font_face_rules = [
+            get_font_face_rule(template['calc_values']['font_weight_mapping'][font_weight], font_family, font_weight, glyphs)
+            for (font_family, font_weight), glyphs in sorted(utils.get_text_glyphs(svg_file_content).items())
+            if font_weight in template['calc_values']['font_weight_mapping']
+        ]
+    except Exception as e:
+        # Raise render error
+        raise_render_error(e, "Error embedding fonts")
+    if len(font_face_rules) == 0:
+        return svg_file_content
+    # Declare font faces right after the root element
+    root_end = svg_file_content.index(">") + 1
+    svg_file_content = svg_file_content[:root_end] + "\n<style>" + "".join(font_face_rules) + "</style>" + svg_file_content[root_end:]
+    return svg_file_content
 
 def convert_image_to_base64(image_path: str) -> str:
     """
@@ -426,8 +735,8 @@ def convert_image_to_base64(image_path: str) -> str:
         with open(image_path, "rb") as f:
             encoded_image = base64.b64encode(f.read())
     except Exception as e:
-        # Print error message and trigger exit
-        print_error_and_trigger_exit(e, "Error encoding image to base64")
+        # Raise render error
+        raise_render_error(e, "Error encoding image to base64")
     return encoded_image
 
 def get_template_path_from_options(options: dict) -> str:
@@ -471,10 +780,50 @@ def read_template_from_path(template_path: str) -> dict:
         # Read template file
         template = json.load(open(template_path, "r"))
     except Exception as e:
-        # Print error message and trigger exit
-        print_error_and_trigger_exit(e, "Error reading template file")
+        # Raise render error
+        raise_render_error(e, "Error reading template file")
     return template
 
+def populate_template_elements(template: dict, album: dict, tracks: list, element_names = config.TEMPLATE_ELEMENTS) -> dict:
+    """
+    Populates template elements with album and track data.
+
+    Args:
+    template (dict): Template dictionary.
+    album (dict): Album dictionary.
+    tracks (list): List of track dictionaries.
+    element_names (Iterable): Names of the elements to populate, all elements by default.
+
+    Returns:
+    elements (dict): Mapping of element names to populated SVG markup.
+    """
+    elements = {}
+    try:
+        for element_name in element_names:
+            placeholder = template['svg_placeholders'][element_name]
+            if element_name in ("album_title", "album_artist", "album_copyright"):
+                # Prepare text once, plain text is measured and escaped text is written
+                text, text_escaped = utils.prepare_text(album[{"album_title": "name", "album_artist": "artist", "album_copyright": "copyright"}[element_name]], True)
+                overflow = template['overflow_compensation'] if utils.check_overflow(text = text, element = placeholder, calc_values = template['calc_values']) else ""
+                elements[element_name] = placeholder.format(**{element_name: text_escaped}, overflow = overflow)
+            elif element_name == "album_artwork":
+                elements[element_name] = placeholder.format(artwork_b64 = album["artwork_b64"])
+            elif element_name == "tracklist_item":
+                elements[element_name] = "\n".join([placeholder.format(tracklist_item_x = str(template['tracklist_item_coordinates'][idx]['x']), tracklist_item_y = str(template['tracklist_item_coordinates'][idx]['y']), tracklist_item_text_anchor = template['tracklist_item_coordinates'][idx]['text_anchor'], track_title = utils.prepare_text(track['name'], False)[1]) for idx, track in enumerate(tracks) if idx < template['limits']['tracklist_item_max']])
+            elif element_name == "album_release_year":
+                elements[element_name] = placeholder.format(album_release_year = album["release_date"].split('-')[0])
+            elif element_name == "album_length":
+                elements[element_name] = placeholder.format(album_length = f"{album['length_time_parts'][0]}:{album['length_time_parts'][1]}")
+            elif element_name == "color_blob_item":
+                elements[element_name] = "\n".join([placeholder.format(color_blob_item_x = str(template['color_blob_item_coordinates'][idx]['x']), color_blob_item_y = str(template['color_blob_item_coordinates'][idx]['y']), color_hex = color) for idx, color in enumerate(album['colors']) if idx < template['limits']['color_blob_item_max']])
+            else:
+                # Static element
+                elements[element_name] = placeholder
+    except Exception as e:
+        # Raise render error
+        raise_render_error(e, "Error populating template")
+    return elements
+
 def populate_template(template: dict, album: dict, tracks: list) -> str:
     """
     Populates a template with album and track data.
@@ -487,57 +836,865 @@ def populate_template(template: dict, album: dict, tracks: list) -> str:
     Returns:
     svg_file_content (str): SVG file content.
     """
+    # Populate all elements in document order
+    svg_file_content = "\n".join(populate_template_elements(template, album, tracks).values())
+    return svg_file_content
+
+def compose_contact_sheet(svg_contents: list, template: dict, scale: float) -> str:
+    """
+    Composes multiple rendered posters onto a single contact sheet page.
+
+    Args:
+    svg_contents (list): List of rendered SVG file contents, scaled by the given factor.
+    template (dict): Template dictionary the posters were rendered from.
+    scale (float): Scale factor the posters were rendered at.
+
+    Returns:
+    svg_file_content (str): Contact sheet SVG file content.
+    """
+    # Calculate grid layout
+    cell_width = round(template['calc_values']['dims']['doc_width'] * scale)
+    cell_height = round(template['calc_values']['dims']['doc_height'] * scale)
+    gap = config.CONTACT_SHEET_GAP
+    columns = min(len(svg_contents), config.CONTACT_SHEET_COLUMNS)
+    rows = -(-len(svg_contents) // columns)
+    width = columns * cell_width + (columns + 1) * gap
+    height = rows * cell_height + (rows + 1) * gap
+    # Place each poster in its grid cell
+    svg_file_content = "\n".join([
+        f'<svg version="1.1" width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" viewBox="0 0 {width} {height}">',
+        f'<rect x="0" y="0" width="{width}" height="{height}" fill="#e5e5e5"/>',
+        "\n".join([
+            f'<g transform="translate({gap + (idx % columns) * (cell_width + gap)},{gap + (idx // columns) * (cell_height + gap)})">\n{content}\n</g>'
+            for idx, content in enumerate(svg_contents)
+        ]),
+        "</svg>"
+    ])
+    return svg_file_content
+
+def get_output_file_path(out_dir: str, file_name: str, album_id: str, extension: str) -> str:
+    """
+    Resolves the output file path for an album, avoiding slug collisions.
+    The first album to claim a slug keeps the plain file name, any other album with the same slug gets its ID appended.
+    Each slug is claimed with its own marker file, so concurrent runs never wait for each other and claims stay O(1).
+
+    Args:
+    out_dir (str): Path to the output directory.
+    file_name (str): Slugified file name without extension.
+    album_id (str): Album ID.
+    extension (str): File extension without leading dot.
+
+    Returns:
+    out_file_path (str): Output file path.
+    """
+    marker_dir_path = os.path.join(out_dir, config.OUTPUT_SLUG_CLAIMS_DIR_NAME)
     try:
-        # Populate template with album and track data using placeholders
-        svg_file_content = "\n".join([
-            template['svg_placeholders']['file_wrapper_open'],
-            template['svg_placeholders']['background'],
-            template['svg_placeholders']['album_artwork'].format(artwork_b64 = album["artwork_b64"]),
-            template['svg_placeholders']['album_title'].format(album_title = html.escape(album["name"].upper()), overflow = template['overflow_compensation'] if utils.check_overflow(text = html.escape(album["name"].upper()), element = template['svg_placeholders']['album_title'], calc_values = template['calc_values']) else ""),
-            template['svg_placeholders']['album_artist'].format(album_artist = html.escape(album["artist"].upper()), overflow = template['overflow_compensation'] if utils.check_overflow(text = html.escape(album["artist"].upper()), element = template['svg_placeholders']['album_artist'], calc_values = template['calc_values']) else ""),
-            template['svg_placeholders']['album_copyright'].format(album_copyright = html.escape(album["copyright"].upper()), overflow = template['overflow_compensation'] if utils.check_overflow(text = html.escape(album["copyright"].upper()), element = template['svg_placeholders']['album_copyright'], calc_values = template['calc_values']) else ""),
-            template['svg_placeholders']['header_separator'],
-            "\n".join([template['svg_placeholders']['tracklist_item'].format(tracklist_item_x = str(template['tracklist_item_coordinates'][idx]['x']), tracklist_item_y = str(template['tracklist_item_coordinates'][idx]['y']), tracklist_item_text_anchor = template['tracklist_item_coordinates'][idx]['text_anchor'], track_title = html.escape(track['name'])) for idx, track in enumerate(tracks) if idx < template['limits']['tracklist_item_max']]),
-            template['svg_placeholders']['album_release_label'],
-            template['svg_placeholders']['album_release_year'].format(album_release_year = album["release_date"].split('-')[0]),
-            template['svg_placeholders']['album_length_label'],
-            template['svg_placeholders']['album_length'].format(album_length = f"{album['length_time_parts'][0]}:{album['length_time_parts'][1]}"),
-            "\n".join([ template['svg_placeholders']['color_blob_item'].format(color_blob_item_x = str(template['color_blob_item_coordinates'][idx]['x']), color_blob_item_y = str(template['color_blob_item_coordinates'][idx]['y']), color_hex = color) for idx, color in enumerate(album['colors']) if idx < template['limits']['color_blob_item_max']]),
-            template['svg_placeholders']['file_wrapper_close']
-        ])
+        create_dir(marker_dir_path)
+        # Claim slug if free, otherwise disambiguate with album ID
+        if utils.claim_file(os.path.join(marker_dir_path, file_name), str(album_id)) != str(album_id):
+            file_name = f"{file_name}-{album_id}"
     except Exception as e:
-        # Print error message and trigger exit
-        print_error_and_trigger_exit(e, "Error populating template")
-    return svg_file_content
+        # Raise render error
+        raise_render_error(e, "Error resolving output file path")
+    out_file_path = os.path.join(out_dir, f"{file_name}.{extension}")
+    return out_file_path
 
-def write_to_svg_file(file_path: str, content: str) -> None:
+def write_to_svg_file(file_path: str, content: str, minify: bool = config.OUTPUT_MINIFY, compress: bool = config.OUTPUT_COMPRESS) -> None:
     """
-    Writes content to an SVG file.
+    Writes content to an SVG file atomically, so concurrent runs never produce a partially written file.
+    Minified content is written chunk by chunk, compressed content is gzipped on the fly as an .svgz file.
 
     Args:
     file_path (str): Path to the SVG file.
     content (str): SVG file content.
+    minify (bool): Hoist repeated presentation attributes into CSS classes and strip whitespace.
+    compress (bool): Write gzip compressed content.
 
     Returns:
     None
     """
     try:
-        # Write content to file
-        with open(file_path, "w") as f:
-            f.write(content)
+        chunks = utils.iter_minified_svg(content) if minify else [content]
+        # Write content to temporary file and rename into place
+        if compress:
+            with utils.atomic_open(file_path, "wb") as f, gzip.GzipFile(fileobj=f, mode="wb", compresslevel=config.OUTPUT_COMPRESS_LEVEL, mtime=0) as gz:
+                for chunk in chunks:
+                    gz.write(chunk.encode("utf-8"))
+        else:
+            with utils.atomic_open(file_path, "w") as f:
+                for chunk in chunks:
+                    f.write(chunk)
     except Exception as e:
-        # Print error message and trigger exit
-        print_error_and_trigger_exit(e, "Error writing to file")
+        # Raise render error
+        raise_render_error(e, "Error writing to file")
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parses command line arguments.
+
+    Returns:
+    args (argparse.Namespace): Parsed command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Generate album posters from iTunes store metadata.")
+    parser.add_argument("--provider", default=config.METADATA_PROVIDER_URL, help="metadata provider URL, itunes:// or fixture://<directory path> for recorded metadata and artwork")
+    parser.add_argument("--preview", action="store_true", help="render a low-resolution draft using the smallest artwork, an approximate palette and a downscaled document")
+    parser.add_argument("--contact-sheet", action="store_true", help="render previews of all found albums onto a single page (implies --preview)")
+    parser.add_argument("--palette", choices=config.PALETTE_COLOR_SPACES, default=config.PALETTE_COLOR_SPACE, help="color space the palette is clustered in, oklab yields perceptually distinct colors")
+    parser.add_argument("--saliency", action="store_true", default=config.PALETTE_SALIENCY_WEIGHTING, help="weight artwork pixels by visual saliency when clustering in oklab")
+    parser.add_argument("--minify", action="store_true", default=config.OUTPUT_MINIFY, help="hoist repeated attributes into CSS classes and strip whitespace from the output")
+    parser.add_argument("--svgz", action="store_true", default=config.OUTPUT_COMPRESS, help="write gzip compressed .svgz output")
+    parser.add_argument("--fallback-countries", default=",".join(config.STOREFRONT_FALLBACK_COUNTRY_CODES), help="comma separated store country codes to look up albums unavailable in the requested store country, empty to disable")
+    parser.add_argument("--embed-fonts", action="store_true", default=config.FONT_EMBEDDING, help="embed subsets of the used fonts, so output renders identically without the fonts installed")
+    # Job queue arguments
+    queue_group = parser.add_argument_group("job queue")
+    queue_group.add_argument("--queue", default=config.JOB_QUEUE_URL, help="job queue URL, sqlite://<database path> or spool://<directory path>")
+    queue_group.add_argument("--submit", nargs="+", metavar="ALBUM_ID", help="submit render jobs for album IDs instead of running interactively")
+    queue_group.add_argument("--country", default=config.ISO_3166_1_ALPHA_2_CC["United States of America"], help="store country code of submitted jobs and batch items")
+    queue_group.add_argument("--template", choices=config.TEMPLATE_OPTIONS.keys(), default=next(iter(config.TEMPLATE_OPTIONS)), help="template of submitted jobs and batches")
+    queue_group.add_argument("--out", help="output folder of submitted jobs and batches")
+    queue_group.add_argument("--worker", action="store_true", help="claim and render queued jobs")
+    queue_group.add_argument("--workers", type=int, default=1, help="number of worker processes on this node")
+    queue_group.add_argument("--exit-when-empty", action="store_true", help="stop workers once the queue is drained")
+    queue_group.add_argument("--queue-status", action="store_true", help="print job counts by status")
+    # Template development arguments
+    dev_group = parser.add_argument_group("template development")
+    dev_group.add_argument("--watch-template", metavar="FILE", help="watch the template and re-render the albums listed in a file (batch file format) on every change")
+    dev_group.add_argument("--template-file", metavar="PATH", help="template file path to watch instead of the --template option")
+    # Batch arguments
+    batch_group = parser.add_argument_group("batch")
+    batch_group.add_argument("--batch", metavar="FILE", help="render all album IDs listed in a file (one per line, optionally 'ID,country'), resuming interrupted runs")
+    batch_group.add_argument("--journal", metavar="PATH", help="batch checkpoint journal path, derived from batch file and options by default")
+    batch_group.add_argument("--max-inflight-artworks", type=int, default=config.PIPELINE_MAX_INFLIGHT_ARTWORKS, help="maximum number of artworks between download and written output")
+    batch_group.add_argument("--max-pixel-mb", type=int, default=config.PIPELINE_MAX_DECODED_PIXEL_MB, help="maximum decoded artwork pixels held for palette extraction at once, in MB")
+    batch_group.add_argument("--queue-depth", type=int, default=config.PIPELINE_QUEUE_DEPTH, help="maximum number of items waiting in front of each pipeline stage")
+    batch_group.add_argument("--trace-memory", action="store_true", default=config.PIPELINE_TRACE_MEMORY, help="trace Python heap allocations and report the peak heap size in the run summary")
+    args = parser.parse_args()
+    args.preview = args.preview or args.contact_sheet
+    args.fallback_countries = [country_code.strip().lower() for country_code in args.fallback_countries.split(",") if country_code.strip() != ""]
+    return args
+
+def get_album_tracks(provider: providers.MetadataProvider, index_conn: sqlite3.Connection | None, catalogue_writer: catalogue.CatalogueWriter, album: dict, country_code: str, fallback_country_codes: list = config.STOREFRONT_FALLBACK_COUNTRY_CODES) -> list:
+    """
+    Gets the tracks of an album from the local index, or from the metadata provider on a local index miss.
+    Albums unavailable in the requested storefront are looked up in the fallback storefronts.
+
+    Args:
+    provider (providers.MetadataProvider): Metadata provider.
+    index_conn (sqlite3.Connection | None): Index database connection.
+    catalogue_writer (catalogue.CatalogueWriter): Catalogue writer of the run.
+    album (dict): Album dictionary.
+    country_code (str): ISO 3166-1 alpha-2 country code.
+    fallback_country_codes (list): Ordered list of fallback storefront country codes, empty to disable fallback.
+
+    Returns:
+    tracks (list): List of track dictionaries.
+    """
+    # Get tracks from local index first, indexed under the storefront known to serve the album
+    tracks = get_local_index_tracks(index_conn, album['id'], storefronts.get_preferred_country_code(album['id'], country_code, fallback_country_codes))
+    if len(tracks) > 0:
+        print(f"{config.ANSI_FORMATS['FONT_GREEN']}✔{config.ANSI_FORMATS['END']} Found tracks in local index")
+    else:
+        # Start progress task
+        task_tracks_loading = start_progress_task("tracks", f"Fetching tracks from {provider.label}", f"Successfully fetched tracks from {provider.label}", f"Failed to fetch tracks from {provider.label}")
+        # Get tracks from provider on local index miss
+        store_country_code, _, tracks = get_album_and_tracks_from_storefronts(provider, album['id'], country_code, fallback_country_codes, task_tracks_loading)
+        if store_country_code != country_code:
+            print(f"{config.ANSI_FORMATS['FONT_GREEN']}✔{config.ANSI_FORMATS['END']} Album unavailable in store country '{country_code}', using tracks of store country '{store_country_code}'")
+        # Record fetched tracks in local index and catalogue
+        update_local_index(index_conn, store_country_code, album = album, tracks = tracks)
+        update_catalogue(catalogue_writer, store_country_code, album = album, tracks = tracks)
+    return tracks
+
+def get_album_colors(artwork_file_path: str, preview: bool, color_space: str = config.PALETTE_COLOR_SPACE, saliency: bool = config.PALETTE_SALIENCY_WEIGHTING) -> list:
+    """
+    Extracts the album color palette from artwork, sorted from light to dark.
+
+    Args:
+    artwork_file_path (str): Path to the artwork file.
+    preview (bool): Use the cheap median cut approximation instead of KMeans clustering.
+    color_space (str): Clustering color space, "srgb" or "oklab".
+    saliency (bool): Weight pixels by visual saliency when clustering in OKLab.
+
+    Returns:
+    colors (list): List of hex color strings.
+    """
+    try:
+        if preview:
+            palette = utils.extract_colors_median_cut(artwork_file_path, config.PALETTE_SIZE, config.PREVIEW_PALETTE_SAMPLE_SIZE)
+        elif color_space == "oklab":
+            palette = utils.extract_colors_oklab(artwork_file_path, config.PALETTE_SIZE, saliency)
+        else:
+            palette = utils.extract_colors_kmeans(artwork_file_path, config.PALETTE_SIZE, True)
+        colors = [utils.rgb_to_hex(color) for color in utils.sort_colors_by_luminance(palette)]
+    except Exception as e:
+        # Raise render error
+        raise_render_error(e, "Error extracting colors from artwork")
+    return colors
+
+def get_album_artwork(provider: providers.MetadataProvider, album: dict, preview: bool, interactive: bool = True) -> str:
+    """
+    Gets album artwork from the shared cache, or from the metadata provider on a cache miss, and identifies it by hash.
+
+    Args:
+    provider (providers.MetadataProvider): Metadata provider serving the artwork.
+    album (dict): Album dictionary, artwork size and hash are added.
+    preview (bool): Use the smallest artwork.
+    interactive (bool): Show loading spinners and status messages.
+
+    Returns:
+    artwork_file_path (str): Artwork cache file path.
+    """
+    artwork_size = config.PREVIEW_ARTWORK_SIZE if preview else config.ARTWORK_SIZE
+    artwork_file_path = get_artwork_cache_path(album['id'], artwork_size)
+    if os.path.exists(artwork_file_path):
+        # Mark artwork as recently used, so it is evicted last
+        utils.touch_file(artwork_file_path)
+        if interactive:
+            print(f"{config.ANSI_FORMATS['FONT_GREEN']}✔{config.ANSI_FORMATS['END']} Found album artwork in cache")
+    elif interactive:
+        # Start progress task
+        task_artwork_loading = start_progress_task("artwork", "Fetching album artwork", "Successfully fetched album artwork", "Failed to fetch album artwork")
+        download_album_artwork_to_cache(provider, album, artwork_size, artwork_file_path, task_artwork_loading)
+    else:
+        with progress.get_reporter().stage("artwork"):
+            download_album_artwork_to_cache(provider, album, artwork_size, artwork_file_path, None)
+    # Identify artwork the palette is computed from
+    if not os.path.exists(artwork_file_path):
+        raise RenderError(f"Artwork of album {album['id']} is not available")
+    album['artwork_size'] = artwork_size
+    album['artwork_hash'] = utils.file_sha256(artwork_file_path)
+    return artwork_file_path
+
+def get_palette_method(preview: bool, color_space: str = config.PALETTE_COLOR_SPACE, saliency: bool = config.PALETTE_SALIENCY_WEIGHTING) -> str:
+    """
+    Names the method palettes are extracted with, palettes are only reused if extracted with the same method.
+
+    Args:
+    preview (bool): Use the approximate palette.
+    color_space (str): Palette clustering color space, "srgb" or "oklab".
+    saliency (bool): Weight pixels by visual saliency when clustering in OKLab.
+
+    Returns:
+    palette_method (str): Palette method name, "mediancut", "srgb", "oklab" or "oklab-saliency".
+    """
+    if preview:
+        palette_method = "mediancut"
+    elif color_space == "oklab":
+        palette_method = "oklab-saliency" if saliency else "oklab"
+    else:
+        palette_method = "srgb"
+    return palette_method
+
+def get_album_palette(album: dict, artwork_file_path: str, preview: bool, color_space: str = config.PALETTE_COLOR_SPACE, saliency: bool = config.PALETTE_SALIENCY_WEIGHTING, cached_palette: dict | None = None) -> None:
+    """
+    Sets the album color palette, extracted from artwork unless already computed for identical artwork.
+
+    Args:
+    album (dict): Album dictionary with artwork hash, colors and palette method are added.
+    artwork_file_path (str): Artwork file path.
+    preview (bool): Use the approximate palette.
+    color_space (str): Palette clustering color space, "srgb" or "oklab".
+    saliency (bool): Weight pixels by visual saliency when clustering in OKLab.
+    cached_palette (dict | None): Previously computed palette with artwork hash and colors.
+
+    Returns:
+    None
+    """
+    album['palette_method'] = get_palette_method(preview, color_space, saliency)
+    if cached_palette is not None and cached_palette['artwork_hash'] == album['artwork_hash']:
+        album['colors'] = cached_palette['colors']
+    else:
+        with progress.get_reporter().stage("palette"):
+            album['colors'] = get_album_colors(artwork_file_path, preview, color_space, saliency)
+
+def set_album_template_values(album: dict, tracks: list, artwork_file_path: str) -> None:
+    """
+    Sets the derived album values the template is populated with, album length and base64 encoded artwork.
+
+    Args:
+    album (dict): Album dictionary, length time parts and encoded artwork are added.
+    tracks (list): List of track dictionaries.
+    artwork_file_path (str): Artwork file path.
+
+    Returns:
+    None
+    """
+    # Calculate album length time parts
+    album['length_time_parts'] = [ utils.pad(time_component, 2) for time_component in utils.millis_to_minutes_and_seconds(sum([track['time_millis'] for track in tracks]))]
+    # Convert album artwork to base64
+    encoded_artwork = convert_image_to_base64(artwork_file_path)
+    album['artwork_b64'] = "data:image/png;base64," + str(encoded_artwork, encoding='utf-8')
+
+def populate_album_template(album: dict, tracks: list, template: dict, artwork_file_path: str) -> str:
+    """
+    Embeds album artwork and populates the template with album and track data.
+
+    Args:
+    album (dict): Album dictionary with colors.
+    tracks (list): List of track dictionaries.
+    template (dict): Template dictionary.
+    artwork_file_path (str): Artwork file path.
+
+    Returns:
+    svg_file_content (str): SVG file content.
+    """
+    with progress.get_reporter().stage("template"):
+        set_album_template_values(album, tracks, artwork_file_path)
+        # Populate template with album and track data
+        svg_file_content = populate_template(template, album, tracks)
+        # Release the encoded artwork, only the SVG content holds it from here on
+        del album['artwork_b64']
+    return svg_file_content
+
+def render_album_svg(provider: providers.MetadataProvider, album: dict, tracks: list, template: dict, preview: bool, color_space: str = config.PALETTE_COLOR_SPACE, saliency: bool = config.PALETTE_SALIENCY_WEIGHTING, interactive: bool = True, cached_palette: dict | None = None) -> str:
+    """
+    Fetches artwork, extracts colors and populates the template for an album.
+
+    Args:
+    provider (providers.MetadataProvider): Metadata provider serving the artwork.
+    album (dict): Album dictionary.
+    tracks (list): List of track dictionaries.
+    template (dict): Template dictionary, already scaled in preview mode.
+    preview (bool): Use the smallest artwork and the approximate palette.
+    color_space (str): Palette clustering color space, "srgb" or "oklab".
+    saliency (bool): Weight pixels by visual saliency when clustering in OKLab.
+    interactive (bool): Show loading spinners and status messages.
+    cached_palette (dict | None): Previously computed palette with artwork hash and colors, reused if the artwork is unchanged.
+
+    Returns:
+    svg_file_content (str): SVG file content.
+    """
+    artwork_file_path = get_album_artwork(provider, album, preview, interactive)
+    get_album_palette(album, artwork_file_path, preview, color_space, saliency, cached_palette)
+    svg_file_content = populate_album_template(album, tracks, template, artwork_file_path)
+    return svg_file_content
+
+def get_album_and_tracks(provider: providers.MetadataProvider, index_conn: sqlite3.Connection | None, catalogue_writer: catalogue.CatalogueWriter, album_id: str, country_code: str, fallback_country_codes: list = config.STOREFRONT_FALLBACK_COUNTRY_CODES) -> tuple[dict, list]:
+    """
+    Gets an album and its tracks by ID without any user interaction.
+    Both are taken from the local index, or fetched from the metadata provider on a local index miss.
+    Albums unavailable in the requested storefront are looked up in the fallback storefronts.
+
+    Args:
+    provider (providers.MetadataProvider): Metadata provider.
+    index_conn (sqlite3.Connection | None): Index database connection.
+    catalogue_writer (catalogue.CatalogueWriter): Catalogue writer of the run.
+    album_id (str): Album ID.
+    country_code (str): ISO 3166-1 alpha-2 country code.
+    fallback_country_codes (list): Ordered list of fallback storefront country codes, empty to disable fallback.
+
+    Returns:
+    album_and_tracks (tuple[dict, list]): Album dictionary and list of track dictionaries.
+    """
+    # Get album and tracks from local index first, indexed under the storefront known to serve the album
+    store_country_code = storefronts.get_preferred_country_code(album_id, country_code, fallback_country_codes)
+    album = index.get_album(index_conn, int(album_id), store_country_code) if index_conn is not None else None
+    tracks = get_local_index_tracks(index_conn, int(album_id), store_country_code) if album is not None else []
+    if album is None or len(tracks) == 0:
+        # Get album and tracks from provider on local index miss
+        with progress.get_reporter().stage("metadata"):
+            store_country_code, album, tracks = get_album_and_tracks_from_storefronts(provider, album_id, country_code, fallback_country_codes, None)
+        if album is None or len(tracks) == 0:
+            raise RenderError(f"Album {album_id} or its tracks are not available in store country '{country_code}'" + (" or any fallback store country" if len(fallback_country_codes) > 0 else ""))
+        # Record fetched album and tracks in local index and catalogue
+        update_local_index(index_conn, store_country_code, albums = [album], album = album, tracks = tracks)
+        update_catalogue(catalogue_writer, store_country_code, albums = [album], album = album, tracks = tracks)
+    return album, tracks
+
+# Catalogue render inputs and catalogue writer shared by all renders of the process, guarded by the lock
+_catalogue_lock = threading.Lock()
+_catalogue_render_inputs = {}
+_catalogue_writer = None
+
+def get_catalogue_render_inputs(artwork_size: int, palette_method: str) -> dict:
+    """
+    Gets the render inputs of all albums in the catalogue, loaded in bulk once per process.
+    Albums fetched later by the process are served by the local index instead.
+
+    Args:
+    artwork_size (int): Artwork edge length the palettes must have been computed from.
+    palette_method (str): Method the palettes must have been computed with.
+
+    Returns:
+    render_inputs (dict): Mapping of (album ID, storefront country code) tuples to render inputs, see catalogue.load_render_inputs.
+    """
+    with _catalogue_lock:
+        if (artwork_size, palette_method) not in _catalogue_render_inputs:
+            try:
+                render_inputs = catalogue.load_render_inputs(config.CATALOGUE_DIR_PATH, None, artwork_size, palette_method)
+            except Exception:
+                # Treat an unreadable catalogue as empty
+                render_inputs = []
+            _catalogue_render_inputs[(artwork_size, palette_method)] = {(str(render_input['album']['id']), render_input['country']): render_input for render_input in render_inputs}
+        render_inputs = _catalogue_render_inputs[(artwork_size, palette_method)]
+    return render_inputs
+
+def get_shared_catalogue_writer() -> catalogue.CatalogueWriter:
+    """
+    Gets the catalogue writer shared by all renders of the process, so records are appended in few large chunks.
+    Flushed by close_shared_catalogue.
+
+    Returns:
+    catalogue_writer (catalogue.CatalogueWriter): Shared catalogue writer.
+    """
+    global _catalogue_writer
+    with _catalogue_lock:
+        if _catalogue_writer is None:
+            _catalogue_writer = catalogue.CatalogueWriter(config.CATALOGUE_DIR_PATH)
+        catalogue_writer = _catalogue_writer
+    return catalogue_writer
+
+def close_shared_catalogue() -> None:
+    """
+    Appends the records buffered by the shared catalogue writer and drops the loaded render inputs,
+    later renders reload them. Storefront availability records are written too.
+
+    Returns:
+    None
+    """
+    global _catalogue_writer
+    with _catalogue_lock:
+        catalogue_writer, _catalogue_writer = _catalogue_writer, None
+        _catalogue_render_inputs.clear()
+    if catalogue_writer is not None:
+        flush_catalogue(catalogue_writer)
+    flush_storefront_availability()
+
+def get_album_tracks_and_palette(provider: providers.MetadataProvider, index_conn: sqlite3.Connection | None, catalogue_writer: catalogue.CatalogueWriter, album_id: str, country_code: str, preview: bool, color_space: str = config.PALETTE_COLOR_SPACE, saliency: bool = config.PALETTE_SALIENCY_WEIGHTING, fallback_country_codes: list = config.STOREFRONT_FALLBACK_COUNTRY_CODES) -> tuple[dict, list, dict | None]:
+    """
+    Gets an album, its tracks and its previously computed palette by ID without any user interaction.
+    All are taken from the catalogue loaded in bulk, albums missing in the catalogue are taken from the local index or the metadata provider.
+
+    Args:
+    provider (providers.MetadataProvider): Metadata provider.
+    index_conn (sqlite3.Connection | None): Index database connection.
+    catalogue_writer (catalogue.CatalogueWriter): Catalogue writer of the run.
+    album_id (str): Album ID.
+    country_code (str): ISO 3166-1 alpha-2 country code.
+    preview (bool): Palettes for the smallest artwork and the approximate palette.
+    color_space (str): Palette clustering color space, "srgb" or "oklab".
+    saliency (bool): Weight pixels by visual saliency when clustering in OKLab.
+    fallback_country_codes (list): Ordered list of fallback storefront country codes, empty to disable fallback.
+
+    Returns:
+    album_tracks_and_palette (tuple[dict, list, dict | None]): Album dictionary, list of track dictionaries and palette with artwork hash and colors, None if not computed before.
+    """
+    render_inputs = get_catalogue_render_inputs(config.PREVIEW_ARTWORK_SIZE if preview else config.ARTWORK_SIZE, get_palette_method(preview, color_space, saliency))
+    # Catalogue records are stored under the storefront known to serve the album
+    render_input = render_inputs.get((str(album_id), storefronts.get_preferred_country_code(album_id, country_code, fallback_country_codes)))
+    if render_input is not None:
+        # Copy the shared album record, rendering adds values to it
+        album, tracks = dict(render_input['album']), render_input['tracks']
+        cached_palette = {"artwork_hash": render_input['artwork_hash'], "colors": render_input['colors']} if render_input['colors'] is not None else None
+    else:
+        album, tracks = get_album_and_tracks(provider, index_conn, catalogue_writer, album_id, country_code, fallback_country_codes)
+        cached_palette = None
+    return album, tracks, cached_palette
+
+def record_album_palette(catalogue_writer: catalogue.CatalogueWriter, album: dict, cached_palette: dict | None) -> None:
+    """
+    Buffers the album palette for the catalogue, unless it was reused from the catalogue.
+
+    Args:
+    catalogue_writer (catalogue.CatalogueWriter): Catalogue writer of the run.
+    album (dict): Album dictionary with palette.
+    cached_palette (dict | None): Reused palette with artwork hash and colors.
+
+    Returns:
+    None
+    """
+    if cached_palette is None or cached_palette['artwork_hash'] != album['artwork_hash']:
+        catalogue_writer.add_palette(album['id'], album['artwork_hash'], album['artwork_size'], album['colors'], album['palette_method'])
+
+def write_album_svg(album: dict, svg_file_content: str, out_folder: str, minify: bool = config.OUTPUT_MINIFY, compress: bool = config.OUTPUT_COMPRESS) -> str:
+    """
+    Writes a rendered album poster to a collision-free path in the output folder.
+
+    Args:
+    album (dict): Album dictionary.
+    svg_file_content (str): SVG file content.
+    out_folder (str): Output folder path.
+    minify (bool): Minify the SVG file content.
+    compress (bool): Write a gzip compressed .svgz file.
+
+    Returns:
+    out_file_path (str): Path to the written SVG file.
+    """
+    create_dir(out_folder)
+    with progress.get_reporter().stage("write"):
+        out_file_path = get_output_file_path(out_folder, utils.slug(f"{album['artist']} - {album['name']}"), album['id'], "svgz" if compress else "svg")
+        write_to_svg_file(out_file_path, svg_file_content, minify, compress)
+    return out_file_path
+
+def render_album_to_file(provider: providers.MetadataProvider, album_id: str, country_code: str, template: dict, out_folder: str, preview: bool = False, color_space: str = config.PALETTE_COLOR_SPACE, saliency: bool = config.PALETTE_SALIENCY_WEIGHTING, minify: bool = config.OUTPUT_MINIFY, compress: bool = config.OUTPUT_COMPRESS, embed_fonts: bool = config.FONT_EMBEDDING, fallback_country_codes: list = config.STOREFRONT_FALLBACK_COUNTRY_CODES) -> str:
+    """
+    Renders the poster of an album by ID without any user interaction and writes it to the output folder.
+    Fetched records are buffered by the shared catalogue writer, flushed by close_shared_catalogue.
+
+    Args:
+    provider (providers.MetadataProvider): Metadata provider.
+    album_id (str): Album ID.
+    country_code (str): ISO 3166-1 alpha-2 country code.
+    template (dict): Template dictionary, already scaled in preview mode.
+    out_folder (str): Output folder path.
+    preview (bool): Use the smallest artwork and the approximate palette.
+    color_space (str): Palette clustering color space, "srgb" or "oklab".
+    saliency (bool): Weight pixels by visual saliency when clustering in OKLab.
+    minify (bool): Minify the SVG file content.
+    compress (bool): Write a gzip compressed .svgz file.
+    embed_fonts (bool): Embed subsets of the used fonts.
+    fallback_country_codes (list): Ordered list of fallback storefront country codes, empty to disable fallback.
+
+    Returns:
+    out_file_path (str): Path to the written SVG file.
+    """
+    index_conn = open_local_index()
+    catalogue_writer = get_shared_catalogue_writer()
+    try:
+        album, tracks, cached_palette = get_album_tracks_and_palette(provider, index_conn, catalogue_writer, album_id, country_code, preview, color_space, saliency, fallback_country_codes)
+        # Render album poster
+        svg_file_content = render_album_svg(provider, album, tracks, template, preview, color_space, saliency, interactive = False, cached_palette = cached_palette)
+        record_album_palette(catalogue_writer, album, cached_palette)
+        if embed_fonts:
+            svg_file_content = embed_font_subsets(svg_file_content, template)
+        out_file_path = write_album_svg(album, svg_file_content, out_folder, minify, compress)
+    finally:
+        if index_conn is not None:
+            index_conn.close()
+    return out_file_path
+
+def render_job(payload: dict) -> str:
+    """
+    Renders a queued job. Job payloads hold album ID, country code, template name, output folder, provider URL and render options.
+
+    Args:
+    payload (dict): Job payload.
+
+    Returns:
+    out_file_path (str): Path to the written SVG file.
+    """
+    # Load and, in preview mode, downscale template
+    template = read_template_from_path(config.TEMPLATE_OPTIONS[payload['template']])
+    if payload.get('preview', False):
+        template['svg_placeholders']['file_wrapper_open'] = utils.scale_svg_dimensions(template['svg_placeholders']['file_wrapper_open'], config.PREVIEW_SCALE)
+    out_file_path = render_album_to_file(
+        providers.open_provider(payload.get('provider', config.METADATA_PROVIDER_URL)), payload['album_id'], payload['country'], template, payload['out_folder'],
+        payload.get('preview', False), payload.get('palette', config.PALETTE_COLOR_SPACE), payload.get('saliency', config.PALETTE_SALIENCY_WEIGHTING),
+        payload.get('minify', config.OUTPUT_MINIFY), payload.get('svgz', config.OUTPUT_COMPRESS), payload.get('embed_fonts', config.FONT_EMBEDDING),
+        payload.get('fallback_countries', config.STOREFRONT_FALLBACK_COUNTRY_CODES)
+    )
+    return out_file_path
+
+def submit_jobs(args: argparse.Namespace) -> None:
+    """
+    Submits one render job per album ID to the job queue.
+
+    Args:
+    args (argparse.Namespace): Parsed command line arguments.
+
+    Returns:
+    None
+    """
+    queue = jobs.open_queue(args.queue)
+    out_folder = args.out or (config.PREVIEW_OUTPUT_FOLDER if args.preview else config.OUTPUT_FOLDER)
+    for album_id in args.submit:
+        job_id = queue.submit({
+            "album_id": album_id, "country": args.country, "template": args.template, "out_folder": out_folder, "provider": args.provider,
+            "preview": args.preview, "palette": args.palette, "saliency": args.saliency, "minify": args.minify, "svgz": args.svgz,
+            "embed_fonts": args.embed_fonts, "fallback_countries": args.fallback_countries
+        })
+        print(f"{config.ANSI_FORMATS['FONT_GREEN']}✔{config.ANSI_FORMATS['END']} Submitted job {job_id} for album {album_id}")
+
+def run_batch(args: argparse.Namespace) -> None:
+    """
+    Renders every album of a batch file, checkpointing each item in a journal.
+    Items flow through a pipeline of metadata, artwork, palette, template and write stages connected by bounded queues,
+    while resource budgets cap the artworks in flight and the decoded pixel bytes held for palette extraction.
+    Failed items are recorded and skipped without ending the batch; rerunning an interrupted batch
+    skips finished items and reuses checkpointed metadata and palettes.
+
+    Args:
+    args (argparse.Namespace): Parsed command line arguments.
+
+    Returns:
+    None
+    """
+    # Read batch items
+    try:
+        items = batch.read_batch_items(args.batch, args.country)
+    except Exception as e:
+        raise_render_error(e, "Error reading batch file")
+    out_folder = args.out or (config.PREVIEW_OUTPUT_FOLDER if args.preview else config.OUTPUT_FOLDER)
+    options = {"template": args.template, "out_folder": out_folder, "provider": args.provider, "preview": args.preview, "palette": args.palette, "saliency": args.saliency, "minify": args.minify, "svgz": args.svgz, "embed_fonts": args.embed_fonts}
+    journal_path = args.journal or batch.get_journal_path(args.batch, options)
+    # Load and, in preview mode, downscale template once for all items
+    template = read_template_from_path(config.TEMPLATE_OPTIONS[args.template])
+    if args.preview:
+        template['svg_placeholders']['file_wrapper_open'] = utils.scale_svg_dimensions(template['svg_placeholders']['file_wrapper_open'], config.PREVIEW_SCALE)
+    provider = open_metadata_provider(args.provider)
+    catalogue_writer = catalogue.CatalogueWriter(config.CATALOGUE_DIR_PATH)
+    # Index connections are opened per metadata worker thread
+    index_local, index_conns, index_conns_lock = threading.local(), [], threading.Lock()
+    # Resource budgets shared by all pipeline workers
+    inflight_artworks = pipeline.ResourceBudget("in-flight artworks", args.max_inflight_artworks)
+    decoded_pixel_bytes = pipeline.ResourceBudget("decoded pixel bytes", args.max_pixel_mb * 2**20)
+    if args.trace_memory:
+        tracemalloc.start()
+    done_count, failed_count = 0, 0
+    create_dir(os.path.dirname(journal_path) or ".")
+    # Hold the journal lock for the whole run, so a second run of the same batch waits instead of duplicating work
+    with utils.file_lock(journal_path):
+        journal = batch.BatchJournal(journal_path)
+
+        def get_metadata(item: dict) -> dict:
+            # Get album and tracks from checkpoint, or fetch and checkpoint them
+            if "metadata" in item['state']:
+                item['album'], item['tracks'] = item['state']['metadata']['album'], item['state']['metadata']['tracks']
+            else:
+                if not hasattr(index_local, "conn"):
+                    index_local.conn = open_local_index()
+                    with index_conns_lock:
+                        index_conns.append(index_local.conn)
+                item['album'], item['tracks'], item['cached_palette'] = get_album_tracks_and_palette(provider, index_local.conn, catalogue_writer, item['album_id'], item['country_code'], args.preview, args.palette, args.saliency, args.fallback_countries)
+                journal.record(item['key'], "metadata", {"album": item['album'], "tracks": item['tracks']})
+            return item
+
+        def get_artwork(item: dict) -> dict:
+            # Wait for an artwork slot, released once the item leaves the pipeline
+            inflight_artworks.acquire(1)
+            item['inflight'] = True
+            item['artwork_file_path'] = get_album_artwork(provider, item['album'], args.preview, interactive = False)
+            return item
+
+        def get_palette(item: dict) -> dict:
+            # Reuse a checkpointed or catalogued palette for unchanged artwork, otherwise hold the decoded pixels within budget
+            album, cached_palette = item['album'], item['state'].get("palette", item.pop("cached_palette", None))
+            if cached_palette is not None and cached_palette['artwork_hash'] == album['artwork_hash']:
+                get_album_palette(album, item['artwork_file_path'], args.preview, args.palette, args.saliency, cached_palette)
+                return item
+            with decoded_pixel_bytes.reserve(utils.get_decoded_image_bytes(item['artwork_file_path'])):
+                get_album_palette(album, item['artwork_file_path'], args.preview, args.palette, args.saliency)
+            journal.record(item['key'], "palette", {"artwork_hash": album['artwork_hash'], "colors": album['colors']})
+            catalogue_writer.add_palette(album['id'], album['artwork_hash'], album['artwork_size'], album['colors'], album['palette_method'])
+            return item
+
+        def populate(item: dict) -> dict:
+            item['svg_file_content'] = populate_album_template(item['album'], item['tracks'], template, item['artwork_file_path'])
+            if args.embed_fonts:
+                item['svg_file_content'] = embed_font_subsets(item['svg_file_content'], template)
+            return item
+
+        def write(item: dict) -> dict:
+            item['out_file_path'] = write_album_svg(item['album'], item.pop("svg_file_content"), out_folder, args.minify, args.svgz)
+            journal.record(item['key'], "done", {"out_file_path": item['out_file_path']})
+            return item
+
+        keys = [batch.BatchJournal.item_key(album_id, country_code) for album_id, country_code in items]
+        resumed_count = sum(journal.is_done(key) for key in keys)
+        print(f"  Batch of {len(items)} items, {resumed_count} already done, journal {journal_path}")
+        pending = [{"key": key, "album_id": album_id, "country_code": country_code, "state": journal.state(key)} for (album_id, country_code), key in zip(items, keys) if not journal.is_done(key)]
+        stage_functions = {"metadata": get_metadata, "artwork": get_artwork, "palette": get_palette, "template": populate, "write": write}
+        batch_pipeline = pipeline.Pipeline([(stage, function, config.PIPELINE_STAGE_WORKERS[stage]) for stage, function in stage_functions.items()], args.queue_depth, [inflight_artworks, decoded_pixel_bytes])
+        # Report progress of the remaining items
+        reporter = progress.get_reporter()
+        reporter.set_total(len(pending))
+        try:
+            for item, error in batch_pipeline.run(pending):
+                # Free the artwork slot for the next item
+                if item.pop("inflight", False):
+                    inflight_artworks.release(1)
+                if error is None:
+                    done_count += 1
+                    reporter.item_finished(True, f"{config.ANSI_FORMATS['FONT_GREEN']}✔{config.ANSI_FORMATS['END']} [{resumed_count + done_count}/{len(items)}] {config.ANSI_FORMATS['FONT_LIGHT_GREEN']}{item['out_file_path']}{config.ANSI_FORMATS['END']}")
+                else:
+                    # Fail only this item, the batch continues
+                    journal.record(item['key'], "failed", {"error": str(error)})
+                    failed_count += 1
+                    reporter.item_finished(False, f"{config.ANSI_FORMATS['FONT_RED']}✗{config.ANSI_FORMATS['END']} Album {item['album_id']} ({item['country_code']}) failed: {error}")
+        except KeyboardInterrupt:
+            reporter.log("  Batch interrupted, rerun the same command to resume")
+            raise
+        finally:
+            # Let workers finish their current item before the journal closes
+            batch_pipeline.stop()
+            reporter.close()
+            journal.close()
+            flush_catalogue(catalogue_writer)
+            flush_storefront_availability()
+            for index_conn in index_conns:
+                if index_conn is not None:
+                    index_conn.close()
+    print(f"  Batch finished: {done_count} rendered, {resumed_count} resumed, {failed_count} failed")
+    print(f"  Peak budget use: {inflight_artworks.peak}/{inflight_artworks.capacity} {inflight_artworks.name}, {decoded_pixel_bytes.peak / 2**20:.0f}/{args.max_pixel_mb} MB {decoded_pixel_bytes.name}")
+
+def load_template_dev_albums(provider: providers.MetadataProvider, items: list, preview: bool, color_space: str, saliency: bool) -> dict:
+    """
+    Loads everything the albums of a template development session are populated with, once per session.
+    Metadata and palettes come from the catalogue and artwork from the artwork cache, only missing inputs are fetched or computed.
+    Albums that cannot be loaded are reported and skipped.
+
+    Args:
+    provider (providers.MetadataProvider): Metadata provider.
+    items (list): List of (album ID, country code) tuples.
+    preview (bool): Use the smallest artwork and the approximate palette.
+    color_space (str): Palette clustering color space, "srgb" or "oklab".
+    saliency (bool): Weight pixels by visual saliency when clustering in OKLab.
+
+    Returns:
+    dev_albums (dict): Mapping of (album ID, country code) tuples to (album, tracks) tuples ready for populating.
+    """
+    index_conn = open_local_index()
+    catalogue_writer = catalogue.CatalogueWriter(config.CATALOGUE_DIR_PATH)
+    dev_albums = {}
+    try:
+        for album_id, country_code in items:
+            try:
+                album, tracks, cached_palette = get_album_tracks_and_palette(provider, index_conn, catalogue_writer, album_id, country_code, preview, color_space, saliency)
+                artwork_file_path = get_album_artwork(provider, album, preview, interactive = False)
+                get_album_palette(album, artwork_file_path, preview, color_space, saliency, cached_palette)
+                record_album_palette(catalogue_writer, album, cached_palette)
+                # Keep the encoded artwork for the whole session
+                set_album_template_values(album, tracks, artwork_file_path)
+                dev_albums[(album_id, country_code)] = (album, tracks)
+            except RenderError as e:
+                print(f"{config.ANSI_FORMATS['FONT_RED']}✗{config.ANSI_FORMATS['END']} Skipping album {album_id} ({country_code}): {e}")
+    finally:
+        flush_catalogue(catalogue_writer)
+        flush_storefront_availability()
+        if index_conn is not None:
+            index_conn.close()
+    return dev_albums
+
+def run_template_dev(args: argparse.Namespace) -> None:
+    """
+    Watches a template file and re-renders a fixed set of albums whenever it changes, until interrupted.
+    Only elements whose placeholder or settings changed are populated again, the other elements are reused.
+    Changed posters are written next to their previous render, with a textual diff and a side-by-side comparison page.
+
+    Args:
+    args (argparse.Namespace): Parsed command line arguments.
+
+    Returns:
+    None
+    """
+    template_path = args.template_file or config.TEMPLATE_OPTIONS[args.template]
+    # Read development albums
+    try:
+        items = batch.read_batch_items(args.watch_template, args.country)
+    except Exception as e:
+        raise_render_error(e, "Error reading album list file")
+    provider = open_metadata_provider(args.provider)
+    dev_albums = load_template_dev_albums(provider, items, args.preview, args.palette, args.saliency)
+    validate_or_exit(dev_albums, "No albums could be loaded for template development.")
+    out_folder = args.out or config.TEMPLATE_DEV_OUTPUT_FOLDER
+    create_dir(out_folder)
+    # Populated elements, element signatures and rendered content per album
+    file_names = {key: f"{utils.slug(album['artist'] + ' - ' + album['name'])}-{album['id']}" for key, (album, _) in dev_albums.items()}
+    elements = {key: {} for key in dev_albums}
+    signatures = {key: {} for key in dev_albums}
+    contents = {key: None for key in dev_albums}
+    revision = 0
+    print(f"  Watching {template_path} with {len(dev_albums)} albums, writing to {out_folder} (Ctrl+C to stop)")
+    for _ in templatedev.watch_file(template_path):
+        started = time.perf_counter()
+        # Load changed template, keep watching while it is invalid mid-edit
+        try:
+            template = read_template_from_path(template_path)
+            if args.preview:
+                template['svg_placeholders']['file_wrapper_open'] = utils.scale_svg_dimensions(template['svg_placeholders']['file_wrapper_open'], config.PREVIEW_SCALE)
+            template_signatures = templatedev.get_element_signatures(template)
+        except Exception as e:
+            print(f"{config.ANSI_FORMATS['FONT_RED']}✗{config.ANSI_FORMATS['END']} Invalid template, waiting for next change ({getattr(e, 'cause', None) or e})")
+            continue
+        changed_elements, changed_count, changed_files, diff_lines = set(), 0, [], []
+        for key, (album, tracks) in dev_albums.items():
+            # Populate only elements whose signature changed since this album's last successful render
+            element_names = [element_name for element_name in config.TEMPLATE_ELEMENTS if template_signatures[element_name] != signatures[key].get(element_name)]
+            if len(element_names) == 0:
+                continue
+            try:
+                elements[key].update(populate_template_elements(template, album, tracks, element_names))
+            except RenderError as e:
+                print(f"{config.ANSI_FORMATS['FONT_RED']}✗{config.ANSI_FORMATS['END']} Album {album['id']} failed: {e}")
+                continue
+            signatures[key].update({element_name: template_signatures[element_name] for element_name in element_names})
+            changed_elements.update(element_names)
+            content = "\n".join([elements[key][element_name] for element_name in config.TEMPLATE_ELEMENTS])
+            if content == contents[key]:
+                continue
+            file_path = os.path.join(out_folder, f"{file_names[key]}.svg")
+            previous_file_path = os.path.join(out_folder, f"{file_names[key]}.previous.svg")
+            try:
+                # Output files may have been deleted meanwhile, recreate the output folder
+                os.makedirs(out_folder, exist_ok=True)
+                if contents[key] is not None:
+                    # Keep the previous render for comparison, rewritten from memory if it was deleted
+                    try:
+                        os.replace(file_path, previous_file_path)
+                    except FileNotFoundError:
+                        utils.atomic_write(previous_file_path, contents[key])
+                utils.atomic_write(file_path, content)
+            except OSError as e:
+                print(f"{config.ANSI_FORMATS['FONT_RED']}✗{config.ANSI_FORMATS['END']} Album {album['id']} could not be written: {e}")
+                continue
+            if contents[key] is not None:
+                diff_lines += templatedev.diff_documents(file_names[key], contents[key], content)
+                changed_files.append((f"{file_names[key]}.previous.svg", f"{file_names[key]}.svg"))
+            contents[key] = content
+            changed_count += 1
+        if changed_count == 0:
+            print(f"  No poster changed ({len(changed_elements)} elements re-rendered)")
+            continue
+        # Write textual and visual diffs of the changed posters
+        revision += 1
+        try:
+            utils.atomic_write(os.path.join(out_folder, "changes.diff"), "\n".join(diff_lines) + "\n")
+            templatedev.write_comparison_page(out_folder, changed_files, revision)
+        except OSError as e:
+            print(f"{config.ANSI_FORMATS['FONT_RED']}✗{config.ANSI_FORMATS['END']} Comparison could not be written: {e}")
+        elapsed_millis = (time.perf_counter() - started) * 1000
+        print(f"{config.ANSI_FORMATS['FONT_GREEN']}✔{config.ANSI_FORMATS['END']} Revision {revision}: {len(changed_elements)} elements re-rendered ({', '.join(sorted(changed_elements)) or 'none'}), {changed_count} posters changed in {elapsed_millis:.0f} ms")
+
+def print_queue_status(queue_url: str) -> None:
+    """
+    Prints job counts by status.
+
+    Args:
+    queue_url (str): Queue URL.
+
+    Returns:
+    None
+    """
+    counts = jobs.open_queue(queue_url).counts()
+    print("  " + ", ".join(f"{status}: {count}" for status, count in counts.items()))
 
 def main() -> None:
     """Envelopes main script execution."""
     # ------------------------------------- #
+    # Parse command line arguments
+    args = parse_args()
     # Print script title
     print_title() 
     # ------------------------------------- #
+    # Run job queue commands instead of the interactive flow
+    if args.submit:
+        submit_jobs(args)
+        return
+    if args.queue_status:
+        print_queue_status(args.queue)
+        return
+    if args.worker:
+        jobs.run_workers(args.queue, render_job, args.workers, args.exit_when_empty, close_shared_catalogue)
+        clean_up_and_exit(config.TEMP_RUN_DIR_PATH)
+    if args.batch:
+        run_batch(args)
+        clean_up_and_exit(config.TEMP_RUN_DIR_PATH)
+    if args.watch_template:
+        run_template_dev(args)
+    # ------------------------------------- #
     # Get user search input
     user_search = get_user_search()
-    # Format search string for iTunes API                                                 
+    # Format search string, identifies contact sheet output files
     search_string = utils.format_search_string(user_search)                         
     # ------------------------------------- #
     # Set default storefront country code
@@ -548,63 +1705,79 @@ def main() -> None:
         # Get user selected storefront country code
         country_code = get_store_country_code()                                     
     # ------------------------------------- #
-    # Spawn loading spinner thread
-    thread_album_loading = spawn_loading_spinner_thread("Fetching albums from iTunes store", "Successfully fetched albums from iTunes store", "Failed to fetch albums from iTunes store")
-    # Get albums from iTunes API
-    albums = get_albums_from_itunes(search_string, country_code, thread_album_loading)
+    # Open metadata provider, local metadata index and catalogue writer
+    provider = open_metadata_provider(args.provider)
+    index_conn = open_local_index()
+    catalogue_writer = catalogue.CatalogueWriter(config.CATALOGUE_DIR_PATH)
+    # Search local index, then metadata provider
+    albums = find_albums(provider, index_conn, catalogue_writer, user_search, country_code)
     # Validate fetched albums
     validate_or_exit(albums, "No albums found matching search criteria. Try a different search term or store country.")
     # ------------------------------------- #
-    # Get user selected album
-    album = get_selected_album(albums)                                              
-    # ------------------------------------- #
-    # Spawn loading spinner thread
-    thread_tracks_loading = spawn_loading_spinner_thread("Fetching tracks from iTunes store", "Successfully fetched tracks from iTunes store", "Failed to fetch tracks from iTunes store")
-    # Get tracks for selected album from iTunes API
-    tracks = get_album_tracks_from_itunes(album['id'], country_code, thread_tracks_loading)
-    # Validate fetched tracks
-    validate_or_exit(tracks, "No tracks found for selected album.\n  Likely the album tracks are not available for the selected store country. Please retry with a differrent selection.")
-    # Calculate album length time parts
-    album['length_time_parts'] = [ utils.pad(time_component, 2) for time_component in utils.millis_to_minutes_and_seconds(sum([track['time_millis'] for track in tracks]))]
-    # ------------------------------------- #
-    # Spawn loading spinner thread
-    thread_artwork_loading = spawn_loading_spinner_thread("Fetching album artwork", "Successfully fetched album artwork", "Failed to fetch album artwork")
-    # Create temporary artwork directory
-    create_dir(config.TEMP_ARTWORK_DIR_PATH)     
-    # Get album artwork from iTunes API                                          
-    artwork_file_path = os.path.join(config.TEMP_ARTWORK_DIR_PATH, config.TEMP_ARTWORK_FILE_NAME)
-    # Get album artwork from iTunes CDN resource 
-    download_album_artwork(album['artwork_url'], artwork_file_path, thread_artwork_loading)
-    # Convert album artwork to base64
-    encoded_artwork = convert_image_to_base64(artwork_file_path)                                        
-    album['artwork_b64'] = "data:image/png;base64," + str(encoded_artwork, encoding='utf-8')
-    # Extract colors from album artwork
-    album['colors'] = [utils.rgb_to_hex(color) for color in sorted(utils.extract_colors_kmeans(artwork_file_path, 5, True), key=lambda color: utils.compute_luminance(color), reverse=True)]
+    # Get user selected album, contact sheets include all found albums
+    selected_albums = albums if args.contact_sheet else [get_selected_album(albums)]
     # ------------------------------------- #
     # Get user selected template path
     template_path = get_template_path_from_options(config.TEMPLATE_OPTIONS)   
     # Load template JSON      
     template = read_template_from_path(template_path)
-    # Populate template with album and track data
-    svg_file_content = populate_template(template, album, tracks)
-    # Generate file name slug                 
-    out_file_name = utils.slug(f"{album['artist']} - {album['name']}")
-    # Create output directory
-    create_dir(config.OUTPUT_FOLDER)
-    # Compose output file path
-    out_file_path = os.path.join(config.OUTPUT_FOLDER, f"{out_file_name}.svg")
+    # Downscale document in preview mode
+    if args.preview:
+        template['svg_placeholders']['file_wrapper_open'] = utils.scale_svg_dimensions(template['svg_placeholders']['file_wrapper_open'], config.PREVIEW_SCALE)
+    # ------------------------------------- #
+    svg_contents = []
+    for album in selected_albums:
+        # Get tracks for album
+        tracks = get_album_tracks(provider, index_conn, catalogue_writer, album, country_code, args.fallback_countries)
+        if args.contact_sheet and len(tracks) == 0:
+            # Skip unavailable albums on contact sheets
+            print(f"{config.ANSI_FORMATS['FONT_RED']}✗{config.ANSI_FORMATS['END']} Skipping {album['name']} - {album['artist']}, no tracks available in selected store country")
+            continue
+        # Validate fetched tracks
+        validate_or_exit(tracks, "No tracks found for selected album.\n  Likely the album tracks are not available for the selected store country. Please retry with a differrent selection.")
+        # Render album poster
+        svg_contents.append(render_album_svg(provider, album, tracks, template, args.preview, args.palette, args.saliency))
+        # Record palette in catalogue
+        catalogue_writer.add_palette(album['id'], album['artwork_hash'], album['artwork_size'], album['colors'], album['palette_method'])
+    # Append fetched metadata and palettes to catalogue, and storefront lookups to their cache
+    flush_catalogue(catalogue_writer)
+    flush_storefront_availability()
+    # ------------------------------------- #
+    if args.contact_sheet:
+        # Validate rendered previews
+        validate_or_exit(svg_contents, "No album previews could be rendered. Try a different search term or store country.")
+        # Compose previews onto one page
+        svg_file_content = compose_contact_sheet(svg_contents, template, config.PREVIEW_SCALE)
+        out_file_name = utils.slug(f"contact sheet - {user_search}")
+        out_file_owner = search_string
+    else:
+        svg_file_content = svg_contents[0]
+        # Generate file name slug                 
+        out_file_name = utils.slug(f"{selected_albums[0]['artist']} - {selected_albums[0]['name']}")
+        out_file_owner = selected_albums[0]['id']
+    # Embed subsets of the used fonts
+    if args.embed_fonts:
+        svg_file_content = embed_font_subsets(svg_file_content, template)
+    # Create output directory, previews are kept apart from print quality renders
+    out_folder = config.PREVIEW_OUTPUT_FOLDER if args.preview else config.OUTPUT_FOLDER
+    create_dir(out_folder)
+    # Compose collision-free output file path
+    out_file_path = get_output_file_path(out_folder, out_file_name, out_file_owner, "svgz" if args.svgz else "svg")
     # Write SVG content to file
-    write_to_svg_file(out_file_path, svg_file_content)                             
+    write_to_svg_file(out_file_path, svg_file_content, args.minify, args.svgz)                             
     # ------------------------------------- #
     # Print success message
     print(f"{config.ANSI_FORMATS['FONT_GREEN']}✔{config.ANSI_FORMATS['END']} Successfully generated SVG file {config.ANSI_FORMATS['FONT_LIGHT_GREEN']}{out_file_path}{config.ANSI_FORMATS['END']}")
     # Initiate graceful exit            
-    clean_up_and_exit(config.TEMP_ARTWORK_DIR_PATH)
+    clean_up_and_exit(config.TEMP_RUN_DIR_PATH)
     # ------------------------------------- #
 if (__name__ == "__main__"):
     try:
         # Execute main script
         main()
+    except RenderError as e:
+        # Print error message and trigger exit
+        print_error_and_trigger_exit(e.cause, e.message) if e.cause is not None else print_error_and_trigger_exit(e)
     except KeyboardInterrupt as e:                                                  
         # Initiate graceful exit
-        clean_up_and_exit(config.TEMP_ARTWORK_DIR_PATH)
\ No newline at end of file
+        clean_up_and_exit(config.TEMP_RUN_DIR_PATH)
\ No newline at end of file
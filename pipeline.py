@@ -0,0 +1,221 @@
+## -- STD LIB IMPORTS --
+import queue
+import threading
+from contextlib import contextmanager
+## -- LOCAL IMPORTS --
+import config   # constants
+
+## -- CLASSES --
+class PipelineStopped(Exception):
+    """Raised in workers waiting on a resource budget once the pipeline they serve was stopped."""
+
+class ResourceBudget:
+    """
+    Counting budget of a shared resource, e.g. in-flight artworks or decoded pixel bytes.
+    Acquiring blocks while the budget is exhausted; a single request larger than the whole budget
+    is admitted once nothing else holds the resource, so oversized items run alone instead of deadlocking.
+    """
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.capacity = capacity
+        self.used = 0
+        self.peak = 0
+        self.cancelled = False
+        self.condition = threading.Condition()
+
+    def acquire(self, amount: int) -> None:
+        """
+        Acquires an amount of the resource, blocking until it is available.
+
+        Args:
+        amount (int): Amount to acquire.
+
+        Returns:
+        None
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.cancelled or self.used == 0 or self.used + amount <= self.capacity)
+            if self.cancelled:
+                raise PipelineStopped(f"Pipeline stopped while waiting for {self.name}")
+            self.used += amount
+            self.peak = max(self.peak, self.used)
+
+    def release(self, amount: int) -> None:
+        """
+        Releases a previously acquired amount of the resource.
+
+        Args:
+        amount (int): Amount to release.
+
+        Returns:
+        None
+        """
+        with self.condition:
+            self.used -= amount
+            self.condition.notify_all()
+
+    def cancel(self) -> None:
+        """
+        Wakes all waiting workers and fails their and any later acquisitions with PipelineStopped.
+
+        Returns:
+        None
+        """
+        with self.condition:
+            self.cancelled = True
+            self.condition.notify_all()
+
+    @contextmanager
+    def reserve(self, amount: int):
+        """
+        Holds an amount of the resource for the enclosed block.
+
+        Args:
+        amount (int): Amount to hold.
+
+        Yields:
+        None
+        """
+        self.acquire(amount)
+        try:
+            yield
+        finally:
+            self.release(amount)
+
+class Pipeline:
+    """
+    Runs items through a sequence of stages, each served by its own worker threads.
+    Stages are connected by bounded queues, so a slow stage blocks the stages feeding it (back-pressure)
+    instead of letting intermediate results pile up in memory. An item failing in one stage skips the remaining stages.
+    Stages are given as (stage name, stage function, worker count) tuples, each function maps an item to its next form.
+    Stopping the pipeline lets every worker finish its current item, then ends all threads; resource budgets
+    the stage functions wait on are cancelled, so no worker stays blocked on them.
+    """
+    _DONE = object()
+
+    def __init__(self, stages: list, queue_depth: int, budgets: list = ()):
+        self.stages = stages
+        self.budgets = budgets
+        self.queues = [queue.Queue(maxsize=queue_depth) for _ in range(len(stages) + 1)]
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def _put(self, target: queue.Queue, envelope) -> bool:
+        """
+        Puts an envelope into a queue, blocking while it is full until the pipeline is stopped.
+
+        Args:
+        target (queue.Queue): Queue to put into.
+        envelope (tuple | object): Item envelope or end of input marker.
+
+        Returns:
+        put (bool): False if the pipeline was stopped first.
+        """
+        while not self.stop_event.is_set():
+            try:
+                target.put(envelope, timeout=config.PIPELINE_STOP_POLL_SECONDS)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _get(self, source: queue.Queue):
+        """
+        Gets an envelope from a queue, blocking while it is empty until the pipeline is stopped.
+
+        Args:
+        source (queue.Queue): Queue to get from.
+
+        Returns:
+        envelope (tuple | object | None): Item envelope or end of input marker, None if the pipeline was stopped first.
+        """
+        while not self.stop_event.is_set():
+            try:
+                return source.get(timeout=config.PIPELINE_STOP_POLL_SECONDS)
+            except queue.Empty:
+                pass
+        return None
+
+    def _feed(self, items) -> None:
+        """
+        Feeds items into the first stage, blocking while it is saturated.
+
+        Args:
+        items (Iterable): Input items.
+
+        Returns:
+        None
+        """
+        for item in items:
+            if not self._put(self.queues[0], (item, None)):
+                return
+        self._put(self.queues[0], self._DONE)
+
+    def _work(self, stage_idx: int, function, remaining: list, remaining_lock: threading.Lock) -> None:
+        """
+        Processes items of one stage until its input is exhausted; the last worker of a stage closes the next stage's input.
+
+        Args:
+        stage_idx (int): Stage index.
+        function (Callable): Stage function.
+        remaining (list): One-element list counting the running workers of the stage.
+        remaining_lock (threading.Lock): Lock guarding the worker count.
+
+        Returns:
+        None
+        """
+        inbox, outbox = self.queues[stage_idx], self.queues[stage_idx + 1]
+        while (envelope := self._get(inbox)) is not None:
+            if envelope is self._DONE:
+                # Let sibling workers see the end of input too
+                self._put(inbox, self._DONE)
+                with remaining_lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    self._put(outbox, self._DONE)
+                return
+            item, error = envelope
+            if error is None:
+                try:
+                    item = function(item)
+                except Exception as e:
+                    error = e
+            if not self._put(outbox, (item, error)):
+                return
+
+    def run(self, items):
+        """
+        Runs items through all stages. The pipeline is stopped once the results are exhausted or the caller stops iterating.
+
+        Args:
+        items (Iterable): Input items.
+
+        Yields:
+        result (tuple): Tuple of the final item form (or the form it failed in) and the raised exception or None, in completion order.
+        """
+        self.threads = [threading.Thread(target=self._feed, args=(items,), daemon=True)]
+        for stage_idx, (stage_name, function, worker_count) in enumerate(self.stages):
+            remaining, remaining_lock = [max(worker_count, 1)], threading.Lock()
+            self.threads += [threading.Thread(target=self._work, args=(stage_idx, function, remaining, remaining_lock), name=f"{stage_name}-{idx}", daemon=True) for idx in range(remaining[0])]
+        for thread in self.threads:
+            thread.start()
+        try:
+            while (envelope := self.queues[-1].get()) is not self._DONE:
+                yield envelope
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """
+        Stops all threads and waits for them to end, workers finish the item they are processing first.
+        Results of those items are discarded. Stopping a stopped pipeline has no effect.
+
+        Returns:
+        None
+        """
+        self.stop_event.set()
+        for budget in self.budgets:
+            budget.cancel()
+        for thread in self.threads:
+            thread.join()
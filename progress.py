@@ -0,0 +1,403 @@
+## -- STD LIB IMPORTS --
+import sys
+import time
+import threading
+import tracemalloc
+import collections
+from contextlib import contextmanager
+try:
+    import resource     # POSIX resource usage
+except ImportError:
+    resource = None
+## -- LOCAL IMPORTS --
+import config   # constants
+
+## -- CLASSES --
+class Task:
+    """
+    A single step in progress, shown with a spinner on terminals and reported as success or failure once finished.
+    """
+    def __init__(self, reporter, stage: str, loading_text: str, success_text: str, failure_text: str):
+        self.reporter = reporter
+        self.stage = stage
+        self.loading_text = loading_text
+        self.success_text = success_text
+        self.failure_text = failure_text
+        self.started = time.perf_counter()
+        self.finished = False
+
+    def finish(self, success: bool) -> None:
+        """
+        Finishes the task, recording its latency and reporting its outcome. Only the first call has an effect.
+
+        Args:
+        success (bool): True if successful, False if failed.
+
+        Returns:
+        None
+        """
+        if self.finished:
+            return
+        self.finished = True
+        if self.reporter.interactive:
+            self.reporter._emit(("task", id(self), None))
+        self.reporter.record(self.stage, time.perf_counter() - self.started, success)
+        if success:
+            self.reporter.log(f"{config.ANSI_FORMATS['FONT_GREEN']}✔{config.ANSI_FORMATS['END']} {self.success_text}")
+        else:
+            self.reporter.log(f"{config.ANSI_FORMATS['FONT_RED']}✗{config.ANSI_FORMATS['END']} {self.failure_text}")
+
+class ProgressReporter:
+    """
+    Aggregates progress events of a run into a single status display.
+    Tracks finished and failed items, throughput, ETA and per-stage latency percentiles. On a terminal, one thread
+    redraws a status line with a spinner for running tasks; otherwise plain lines are logged with periodic summaries.
+    Reporters created with an event queue forward all events to the reporter of another process instead.
+    """
+    def __init__(self, stream = None, interactive: bool | None = None, event_queue = None):
+        self.stream = stream or sys.stdout
+        self.event_queue = event_queue
+        # Forwarding reporters never draw, the aggregating reporter does
+        self.interactive = False if event_queue is not None else self.stream.isatty() if interactive is None else interactive
+        self.lock = threading.Lock()
+        self.tasks = {}
+        self.latencies = collections.defaultdict(lambda: collections.deque(maxlen=config.PROGRESS_LATENCY_SAMPLES))
+        self.errors = collections.Counter()
+        self.total = None
+        self.done = 0
+        self.failed = 0
+        self.started = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.status_length = 0
+
+    def _emit(self, event: tuple) -> None:
+        """
+        Applies an event locally, or forwards it to the aggregating process.
+
+        Args:
+        event (tuple): Event tuple of event type and arguments.
+
+        Returns:
+        None
+        """
+        if self.event_queue is not None:
+            self.event_queue.put(event)
+        else:
+            self.handle(event)
+
+    def handle(self, event: tuple) -> None:
+        """
+        Applies an event to the aggregated progress state.
+
+        Args:
+        event (tuple): Event tuple of event type and arguments.
+
+        Returns:
+        None
+        """
+        kind = event[0]
+        with self.lock:
+            if kind == "stage":
+                _, stage, seconds, success = event
+                self.latencies[stage].append(seconds)
+                if not success:
+                    self.errors[stage] += 1
+            elif kind == "item":
+                _, success, message = event
+                if self.started is None:
+                    self.started = time.perf_counter()
+                if success:
+                    self.done += 1
+                else:
+                    self.failed += 1
+                if message:
+                    self._write_line(message)
+            elif kind == "log":
+                self._write_line(event[1])
+            elif kind == "task":
+                _, task_id, task = event
+                if task is None:
+                    self.tasks.pop(task_id, None)
+                else:
+                    self.tasks[task_id] = task
+            elif kind == "total":
+                self.total = event[1]
+                if self.started is None:
+                    self.started = time.perf_counter()
+        if kind in ("task", "item", "total"):
+            self._ensure_thread()
+
+    def _ensure_thread(self) -> None:
+        """
+        Starts the status thread on first use.
+
+        Returns:
+        None
+        """
+        if self.thread is None and self.event_queue is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def _run(self) -> None:
+        """
+        Redraws the status line on terminals, or logs a summary line whenever progress was made otherwise.
+
+        Returns:
+        None
+        """
+        frame = 0
+        last_logged = None
+        while not self.stop_event.wait(config.PROGRESS_REFRESH_SECONDS if self.interactive else config.PROGRESS_LOG_SECONDS):
+            with self.lock:
+                if self.interactive:
+                    self._write_status(frame)
+                    frame += 1
+                elif (self.done, self.failed) != last_logged and self.started is not None:
+                    last_logged = (self.done, self.failed)
+                    self._write_line("  " + self._summary())
+
+    def _write_status(self, frame: int) -> None:
+        """
+        Overwrites the status line. The caller holds the lock.
+
+        Args:
+        frame (int): Spinner animation frame.
+
+        Returns:
+        None
+        """
+        parts = [f"  {task.loading_text}..." + "|/-\\"[frame % 4] for task in self.tasks.values()]
+        if self.started is not None:
+            parts.append("  " + self._summary())
+        status = " ".join(parts)
+        if status == "" and self.status_length == 0:
+            return
+        self.stream.write("\r" + status.ljust(self.status_length) + "\r")
+        self.stream.flush()
+        self.status_length = len(status)
+
+    def _write_line(self, message: str) -> None:
+        """
+        Writes a log line, clearing the status line first. The caller holds the lock.
+
+        Args:
+        message (str): Message to write.
+
+        Returns:
+        None
+        """
+        if self.status_length > 0:
+            self.stream.write("\r" + " " * self.status_length + "\r")
+            self.status_length = 0
+        self.stream.write(message + "\n")
+        self.stream.flush()
+
+    def _summary(self) -> str:
+        """
+        Composes a progress summary of items, throughput, ETA, stage latencies and errors. The caller holds the lock.
+
+        Returns:
+        summary (str): Progress summary.
+        """
+        finished = self.done + self.failed
+        elapsed = time.perf_counter() - self.started if self.started is not None else 0
+        rate = finished / elapsed if elapsed > 0 else 0
+        parts = [f"[{finished}/{self.total}]" if self.total is not None else f"[{finished}]", f"{rate:.2f}/s"]
+        if self.total is not None and rate > 0:
+            remaining = max(self.total - finished, 0) / rate
+            parts.append(f"ETA {int(remaining // 60)}:{int(remaining % 60):02d}")
+        for stage, samples in self.latencies.items():
+            ordered = sorted(samples)
+            parts.append(f"{stage} " + " ".join(f"p{p} {ordered[min(len(ordered) - 1, len(ordered) * p // 100)] * 1000:.0f}ms" for p in config.PROGRESS_PERCENTILES))
+        memory = get_peak_memory()
+        if memory != "":
+            parts.append(memory)
+        if self.failed > 0 or len(self.errors) > 0:
+            parts.append(f"{self.failed} failed" + (" (" + ", ".join(f"{stage}: {count}" for stage, count in self.errors.items()) + ")" if len(self.errors) > 0 else ""))
+        summary = " | ".join(parts)
+        return summary
+
+    def start_task(self, stage: str, loading_text: str, success_text: str, failure_text: str) -> Task:
+        """
+        Starts a task shown with a spinner until finished.
+
+        Args:
+        stage (str): Stage name the task latency is recorded under.
+        loading_text (str): Text to display while running.
+        success_text (str): Text to display upon successful completion.
+        failure_text (str): Text to display upon failure.
+
+        Returns:
+        task (Task): Running task.
+        """
+        task = Task(self, stage, loading_text, success_text, failure_text)
+        if self.interactive:
+            self._emit(("task", id(task), task))
+        return task
+
+    def set_total(self, total: int) -> None:
+        """
+        Sets the number of items expected to finish, enabling the ETA.
+
+        Args:
+        total (int): Number of items.
+
+        Returns:
+        None
+        """
+        self._emit(("total", total))
+
+    def record(self, stage: str, seconds: float, success: bool = True) -> None:
+        """
+        Records the latency of one stage execution.
+
+        Args:
+        stage (str): Stage name.
+        seconds (float): Stage duration in seconds.
+        success (bool): False if the stage failed.
+
+        Returns:
+        None
+        """
+        self._emit(("stage", stage, seconds, success))
+
+    @contextmanager
+    def stage(self, stage: str):
+        """
+        Times the enclosed block as one execution of a stage, counting raised exceptions as stage errors.
+
+        Args:
+        stage (str): Stage name.
+
+        Yields:
+        None
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.record(stage, time.perf_counter() - started, False)
+            raise
+        self.record(stage, time.perf_counter() - started, True)
+
+    def item_finished(self, success: bool, message: str = "") -> None:
+        """
+        Counts a finished item and logs its message.
+
+        Args:
+        success (bool): True if the item succeeded.
+        message (str): Message to log, nothing is logged if empty.
+
+        Returns:
+        None
+        """
+        self._emit(("item", success, message))
+
+    def log(self, message: str) -> None:
+        """
+        Logs a message line without disturbing the status line.
+
+        Args:
+        message (str): Message to log.
+
+        Returns:
+        None
+        """
+        self._emit(("log", message))
+
+    def consume(self, event_queue) -> threading.Thread:
+        """
+        Applies events forwarded by other processes until a None sentinel is received.
+
+        Args:
+        event_queue (multiprocessing.Queue): Event queue.
+
+        Returns:
+        thread (threading.Thread): Consumer thread, finished after the sentinel.
+        """
+        def _consume():
+            while (event := event_queue.get()) is not None:
+                self.handle(event)
+        thread = threading.Thread(target=_consume, daemon=True)
+        thread.start()
+        return thread
+
+    def close(self) -> None:
+        """
+        Stops the status thread and logs a final summary if items were tracked.
+        Counters and latencies are reset, so later runs in the same process report their own progress only.
+
+        Returns:
+        None
+        """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        with self.lock:
+            if self.started is not None:
+                self._write_line("  " + self._summary())
+            elif self.status_length > 0:
+                self._write_line("")
+            # Reset run state, the next event starts a new status thread
+            self.latencies.clear()
+            self.errors.clear()
+            self.total = None
+            self.done = 0
+            self.failed = 0
+            self.started = None
+            self.stop_event = threading.Event()
+
+## -- FUNCTIONS --
+def get_peak_memory() -> str:
+    """
+    Describes the peak memory use of this process and its child processes.
+    The resident set size is sampled from the OS at no cost, the Python heap peak is only known while tracemalloc is tracing.
+
+    Returns:
+    memory (str): Peak memory description, empty if unavailable.
+    """
+    parts = []
+    if resource is not None:
+        peak_rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+        # Reported in bytes on macOS and in kilobytes elsewhere
+        peak_rss_bytes = peak_rss if sys.platform == "darwin" else peak_rss * 1024
+        parts.append(f"peak RSS {peak_rss_bytes / 2**20:.0f} MB")
+    if tracemalloc.is_tracing():
+        parts.append(f"peak heap {tracemalloc.get_traced_memory()[1] / 2**20:.0f} MB")
+    memory = ", ".join(parts)
+    return memory
+
+_reporter = None
+_reporter_lock = threading.Lock()
+
+def get_reporter() -> ProgressReporter:
+    """
+    Gets the progress reporter of this process, creating it on first use.
+
+    Returns:
+    reporter (ProgressReporter): Process-wide progress reporter.
+    """
+    global _reporter
+    with _reporter_lock:
+        if _reporter is None:
+            _reporter = ProgressReporter()
+        reporter = _reporter
+    return reporter
+
+def forward_events(event_queue) -> ProgressReporter:
+    """
+    Replaces the progress reporter of this process with one forwarding all events to another process.
+
+    Args:
+    event_queue (multiprocessing.Queue): Event queue consumed by the aggregating reporter.
+
+    Returns:
+    reporter (ProgressReporter): Forwarding progress reporter.
+    """
+    global _reporter
+    with _reporter_lock:
+        _reporter = ProgressReporter(event_queue = event_queue)
+        reporter = _reporter
+    return reporter
@@ -0,0 +1,240 @@
+## -- STD LIB IMPORTS --
+import os
+import abc
+import glob
+import shutil
+import functools
+## -- EXT LIB IMPORTS --
+import requests
+from PIL import Image
+## -- LOCAL IMPORTS --
+import config   # constants
+import utils    # utility functions
+import index    # local metadata index
+
+## -- CLASSES --
+class ProviderError(Exception):
+    """Raised when a provider cannot serve a request, e.g. on an unsuccessful HTTP response."""
+
+class MetadataProvider(abc.ABC):
+    """
+    Metadata provider interface for album search, album and track lookup and artwork retrieval.
+    Albums and tracks are returned as the dictionaries produced by utils.parse_itunes_album and utils.parse_itunes_track.
+    """
+    label = ""
+
+    @abc.abstractmethod
+    def search_albums(self, user_search: str, country_code: str, limit: int = config.ALBUM_RESULT_LIMIT) -> list:
+        """
+        Searches albums matching a user search.
+
+        Args:
+        user_search (str): Raw user search input.
+        country_code (str): ISO 3166-1 alpha-2 country code.
+        limit (int): Maximum number of results.
+
+        Returns:
+        albums (list): List of album dictionaries.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def lookup_album(self, album_id: str, country_code: str) -> tuple[dict | None, list]:
+        """
+        Looks up an album and its tracks by album ID.
+
+        Args:
+        album_id (str): Album ID.
+        country_code (str): ISO 3166-1 alpha-2 country code.
+
+        Returns:
+        album_and_tracks (tuple[dict | None, list]): Album dictionary (None if not found) and list of track dictionaries.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def fetch_artwork(self, album: dict, size: int, file_path: str) -> None:
+        """
+        Fetches the artwork of an album at a size and saves it to a file.
+
+        Args:
+        album (dict): Album dictionary.
+        size (int): Artwork edge length in pixels.
+        file_path (str): Path to the artwork file to write.
+
+        Returns:
+        None
+        """
+        raise NotImplementedError
+
+class ITunesProvider(MetadataProvider):
+    """Metadata provider backed by the iTunes Search API and the iTunes artwork CDN."""
+    label = "iTunes store"
+
+    @staticmethod
+    def _get(url: str, **kwargs) -> requests.Response:
+        """
+        Sends a GET request with a timeout, raising connection failures and timeouts as provider errors.
+
+        Args:
+        url (str): Request URL.
+        **kwargs: Further arguments of requests.get.
+
+        Returns:
+        response (requests.Response): Response.
+        """
+        try:
+            response = requests.get(url, timeout=config.ITUNES_REQUEST_TIMEOUT_SECONDS, **kwargs)
+        except requests.RequestException as e:
+            raise ProviderError(f"iTunes request failed: {e}") from e
+        return response
+
+    def search_albums(self, user_search: str, country_code: str, limit: int = config.ALBUM_RESULT_LIMIT) -> list:
+        # Set request url
+        url = f"{config.SEARCH_API_BASE_URL}?term={utils.format_search_string(user_search)}&entity=album&country={country_code}&limit={limit}"
+        # Send GET request to iTunes API
+        response = self._get(url)
+        if response.status_code != 200:
+            raise ProviderError(f"iTunes search failed with status {response.status_code}")
+        # Filter out non-album results and reduce to required properties
+        albums = [utils.parse_itunes_album(album) for album in response.json()['results'] if utils.is_itunes_album(album)]
+        return albums
+
+    def lookup_album(self, album_id: str, country_code: str) -> tuple[dict | None, list]:
+        # Set request URL
+        url = f"{config.LOOKUP_API_BASE_URL}?id={album_id}&entity=song&country={country_code}"
+        # Send GET request to iTunes API
+        response = self._get(url)
+        if response.status_code != 200:
+            raise ProviderError(f"iTunes lookup failed with status {response.status_code}")
+        results = response.json()['results']
+        # Reduce album and track results to required properties
+        albums = [utils.parse_itunes_album(result) for result in results if utils.is_itunes_album(result)]
+        album = albums[0] if len(albums) > 0 else None
+        tracks = [utils.parse_itunes_track(track) for track in results if utils.is_itunes_track(track)]
+        return album, tracks
+
+    def fetch_artwork(self, album: dict, size: int, file_path: str) -> None:
+        # Send GET request to artwork URL of the requested size
+        response = self._get(utils.artwork_url_for_size(album['artwork_url'], size), stream=True)
+        if response.status_code != 200:
+            raise ProviderError(f"Artwork download failed with status {response.status_code}")
+        # Save artwork to file
+        with open(file_path, "wb") as f:
+            response.raw.decode_content = True
+            shutil.copyfileobj(response.raw, f)
+
+class FixtureProvider(MetadataProvider):
+    """
+    Metadata provider serving recorded iTunes API records and artwork images from disk.
+    All records are loaded into memory once, so lookups run at memory speed without network access.
+
+    Fixture directory layout:
+    <root>/*.json, *.jsonl            Records served in every storefront
+    <root>/<country code>/*.json(l)   Records served in one storefront only
+    <root>/artwork/<album ID>.<ext>   Artwork images, downscaled to the requested size on fetch
+    """
+    label = "fixtures"
+
+    def __init__(self, root_path: str):
+        if not os.path.isdir(root_path):
+            raise ProviderError(f"Fixture directory '{root_path}' does not exist")
+        self.root_path = root_path
+        self.storefronts = {}
+        # Load shared records, then storefront specific records
+        for dump_path in sorted(glob.glob(os.path.join(root_path, "*.json*"))):
+            self._add_records(None, index.read_dump_records(dump_path))
+        for dump_path in sorted(glob.glob(os.path.join(root_path, "*", "*.json*"))):
+            self._add_records(os.path.basename(os.path.dirname(dump_path)).lower(), index.read_dump_records(dump_path))
+
+    def _add_records(self, storefront: str | None, records: list) -> None:
+        """
+        Adds raw iTunes API records to the in-memory storefront tables.
+
+        Args:
+        storefront (str | None): Country code of the storefront, None for all storefronts.
+        records (list): List of raw iTunes API result records.
+
+        Returns:
+        None
+        """
+        albums, tracks = self.storefronts.setdefault(storefront, ({}, {}))
+        for record in records:
+            if utils.is_itunes_album(record):
+                album = utils.parse_itunes_album(record)
+                album['search_tokens'] = index.normalize(f"{album['artist']} {album['name']}").split()
+                albums[album['id']] = album
+            elif utils.is_itunes_track(record):
+                tracks.setdefault(record['collectionId'], []).append((record.get('discNumber', 1), record['trackNumber'], utils.parse_itunes_track(record)))
+
+    def _tables(self, country_code: str) -> list:
+        """
+        Gets the storefront tables serving a country, the country's own before the shared ones.
+
+        Args:
+        country_code (str): ISO 3166-1 alpha-2 country code.
+
+        Returns:
+        tables (list): List of (albums, tracks) table tuples.
+        """
+        tables = [self.storefronts[storefront] for storefront in (country_code, None) if storefront in self.storefronts]
+        return tables
+
+    def search_albums(self, user_search: str, country_code: str, limit: int = config.ALBUM_RESULT_LIMIT) -> list:
+        # All search tokens must prefix-match an artist or album name token
+        query_tokens = index.normalize(user_search).split()
+        matches = {}
+        for album_table, _ in self._tables(country_code):
+            for album_id, album in album_table.items():
+                if len(matches) < limit and album_id not in matches and len(query_tokens) > 0 and all(any(token.startswith(query_token) for token in album['search_tokens']) for query_token in query_tokens):
+                    matches[album_id] = {key: value for key, value in album.items() if key != 'search_tokens'}
+        albums = list(matches.values())
+        return albums
+
+    def lookup_album(self, album_id: str, country_code: str) -> tuple[dict | None, list]:
+        tables = self._tables(country_code)
+        album_record = next((album_table[int(album_id)] for album_table, _ in tables if int(album_id) in album_table), None)
+        if album_record is None:
+            return None, []
+        album = {key: value for key, value in album_record.items() if key != 'search_tokens'}
+        # Storefronts may override album records only, take the tracks of the first table holding any
+        track_items = next((track_table[int(album_id)] for _, track_table in tables if len(track_table.get(int(album_id), [])) > 0), [])
+        # Order tracks by disc and track number
+        tracks = [track for _, _, track in sorted(track_items, key=lambda item: item[:2])]
+        return album, tracks
+
+    def fetch_artwork(self, album: dict, size: int, file_path: str) -> None:
+        artwork_paths = sorted(glob.glob(os.path.join(self.root_path, "artwork", f"{album['id']}.*")))
+        if len(artwork_paths) == 0:
+            raise ProviderError(f"No fixture artwork for album {album['id']}")
+        with Image.open(artwork_paths[0]) as image:
+            if max(image.size) <= size and image.format == "JPEG":
+                # Serve fixture file as is
+                shutil.copyfile(artwork_paths[0], file_path)
+            else:
+                # Downscale like the artwork CDN does
+                image = image.convert("RGB")
+                image.thumbnail((size, size))
+                image.save(file_path, "JPEG", quality=90)
+
+## -- FUNCTIONS --
+@functools.lru_cache(maxsize=None)
+def open_provider(provider_url: str = config.METADATA_PROVIDER_URL) -> MetadataProvider:
+    """
+    Opens a metadata provider from a URL, "itunes://" or "fixture://<directory path>".
+    Providers are opened once per process and shared, so fixtures are only loaded once.
+
+    Args:
+    provider_url (str): Provider URL.
+
+    Returns:
+    provider (MetadataProvider): Metadata provider.
+    """
+    scheme, _, location = provider_url.partition("://")
+    if scheme == "itunes":
+        provider = ITunesProvider()
+    elif scheme == "fixture":
+        provider = FixtureProvider(location)
+    else:
+        raise ValueError(f"Unsupported metadata provider '{scheme}', use one of: itunes, fixture")
+    return provider
@@ -0,0 +1,277 @@
+## -- STD LIB IMPORTS --
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+## -- LOCAL IMPORTS --
+import config       # constants
+import utils        # utility functions
+import providers    # metadata providers
+
+## -- FUNCTIONS --
+def _cache_key(album_id: str, country_code: str) -> str:
+    """
+    Composes the availability cache key of an album requested in a storefront.
+
+    Args:
+    album_id (str): Album ID.
+    country_code (str): ISO 3166-1 alpha-2 country code of the requested storefront.
+
+    Returns:
+    key (str): Availability cache key.
+    """
+    key = f"{country_code}:{album_id}"
+    return key
+
+def read_availability(cache_path: str = config.STOREFRONT_CACHE_PATH) -> dict:
+    """
+    Reads the storefront availability cache file. A missing or unreadable cache is treated as empty.
+    Entries of older cache files, holding the serving country code only, are converted.
+
+    Args:
+    cache_path (str): Availability cache file path.
+
+    Returns:
+    availability (dict): Mapping of availability cache keys to entries of the serving storefront's country code and track count.
+    """
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            availability = json.load(f)
+    except (OSError, ValueError):
+        availability = {}
+    availability = {key: {"country_code": entry, "track_count": None} if isinstance(entry, str) else entry for key, entry in availability.items()}
+    return availability
+
+# Availability caches loaded by the process by absolute cache file path, with their records not written yet, guarded by the lock
+_availability = {}
+_availability_lock = threading.Lock()
+
+def load_availability(cache_path: str = config.STOREFRONT_CACHE_PATH) -> dict:
+    """
+    Gets the storefront availability cache of this process, reading the cache file on first use only.
+
+    Args:
+    cache_path (str): Availability cache file path.
+
+    Returns:
+    availability (dict): Mapping of availability cache keys to availability entries, see read_availability.
+    """
+    with _availability_lock:
+        cache = _availability.get(os.path.abspath(cache_path))
+        if cache is None:
+            cache = _availability[os.path.abspath(cache_path)] = {"entries": read_availability(cache_path), "pending": {}, "pending_since": None}
+        availability = cache['entries']
+    return availability
+
+def get_cached_entry(album_id: str, country_code: str, cache_path: str = config.STOREFRONT_CACHE_PATH) -> dict | None:
+    """
+    Gets the storefront an album requested in a storefront was last found in, and the number of tracks found there.
+
+    Args:
+    album_id (str): Album ID.
+    country_code (str): ISO 3166-1 alpha-2 country code of the requested storefront.
+    cache_path (str): Availability cache file path.
+
+    Returns:
+    entry (dict | None): Serving storefront's country code and track count (None if unknown), None if not cached.
+    """
+    entry = load_availability(cache_path).get(_cache_key(album_id, country_code))
+    return entry
+
+def get_cached_country_code(album_id: str, country_code: str, cache_path: str = config.STOREFRONT_CACHE_PATH) -> str | None:
+    """
+    Gets the storefront an album requested in a storefront was last found in.
+
+    Args:
+    album_id (str): Album ID.
+    country_code (str): ISO 3166-1 alpha-2 country code of the requested storefront.
+    cache_path (str): Availability cache file path.
+
+    Returns:
+    cached_country_code (str | None): Country code of the serving storefront, None if not cached.
+    """
+    entry = get_cached_entry(album_id, country_code, cache_path)
+    cached_country_code = entry['country_code'] if entry is not None else None
+    return cached_country_code
+
+def get_preferred_country_code(album_id: str, country_code: str, fallback_country_codes: list = config.STOREFRONT_FALLBACK_COUNTRY_CODES, cache_path: str = config.STOREFRONT_CACHE_PATH) -> str:
+    """
+    Gets the storefront to ask first for an album, the cached serving storefront if it is still a candidate, the requested one otherwise.
+
+    Args:
+    album_id (str): Album ID.
+    country_code (str): ISO 3166-1 alpha-2 country code of the requested storefront.
+    fallback_country_codes (list): Ordered list of fallback storefront country codes.
+    cache_path (str): Availability cache file path.
+
+    Returns:
+    preferred_country_code (str): Country code of the storefront to ask first.
+    """
+    cached_country_code = get_cached_country_code(album_id, country_code, cache_path)
+    preferred_country_code = cached_country_code if cached_country_code in [code.lower() for code in fallback_country_codes] else country_code
+    return preferred_country_code
+
+def record_availability(album_id: str, country_code: str, store_country_code: str, track_count: int, cache_path: str = config.STOREFRONT_CACHE_PATH) -> None:
+    """
+    Records the storefront serving an album requested in a storefront, and the number of tracks it serves.
+    Records are kept in memory and written by flush_availability, at the latest once the oldest unwritten record
+    is older than STOREFRONT_CACHE_FLUSH_SECONDS.
+
+    Args:
+    album_id (str): Album ID.
+    country_code (str): ISO 3166-1 alpha-2 country code of the requested storefront.
+    store_country_code (str): ISO 3166-1 alpha-2 country code of the serving storefront.
+    track_count (int): Number of tracks the serving storefront returned.
+    cache_path (str): Availability cache file path.
+
+    Returns:
+    None
+    """
+    load_availability(cache_path)
+    entry = {"country_code": store_country_code, "track_count": track_count}
+    with _availability_lock:
+        cache = _availability[os.path.abspath(cache_path)]
+        cache['entries'][_cache_key(album_id, country_code)] = entry
+        cache['pending'][_cache_key(album_id, country_code)] = entry
+        if cache['pending_since'] is None:
+            cache['pending_since'] = time.monotonic()
+        due = time.monotonic() - cache['pending_since'] >= config.STOREFRONT_CACHE_FLUSH_SECONDS
+    if due:
+        flush_availability(cache_path)
+
+def flush_availability(cache_path: str = config.STOREFRONT_CACHE_PATH) -> None:
+    """
+    Writes the availability records of this process to the cache file, merged with the records of other runs.
+    Records that could not be written are kept for the next flush.
+
+    Args:
+    cache_path (str): Availability cache file path.
+
+    Returns:
+    None
+    """
+    with _availability_lock:
+        cache = _availability.get(os.path.abspath(cache_path))
+        if cache is None or len(cache['pending']) == 0:
+            return
+        pending, cache['pending'], cache['pending_since'] = cache['pending'], {}, None
+    try:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        with utils.file_lock(cache_path):
+            # Re-read under the lock, other runs may have recorded albums meanwhile
+            availability = read_availability(cache_path)
+            availability.update(pending)
+            utils.atomic_write(cache_path, json.dumps(availability, indent=2, sort_keys=True))
+    except BaseException:
+        # Keep unwritten records, newer records of the same albums take precedence
+        with _availability_lock:
+            cache['pending'] = {**pending, **cache['pending']}
+            cache['pending_since'] = cache['pending_since'] or time.monotonic()
+        raise
+
+# Lookup threads shared by all fallback lookups of the process, guarded by the lock
+_lookup_executor = None
+_lookup_executor_lock = threading.Lock()
+
+def _get_lookup_executor() -> ThreadPoolExecutor:
+    """
+    Gets the thread pool shared by all fallback lookups of the process, creating it on first use.
+    Lookups still running once another storefront won end at the latest with the provider request timeout,
+    so abandoned lookups never pile up threads.
+
+    Returns:
+    executor (ThreadPoolExecutor): Lookup thread pool.
+    """
+    global _lookup_executor
+    with _lookup_executor_lock:
+        if _lookup_executor is None:
+            _lookup_executor = ThreadPoolExecutor(max_workers=config.STOREFRONT_LOOKUP_WORKERS, thread_name_prefix="storefront")
+        executor = _lookup_executor
+    return executor
+
+def _lookup(provider: providers.MetadataProvider, album_id: str, country_code: str) -> tuple[str, dict | None, list]:
+    """
+    Looks up an album and its tracks in one storefront, treating provider errors as unavailability.
+
+    Args:
+    provider (providers.MetadataProvider): Metadata provider.
+    album_id (str): Album ID.
+    country_code (str): ISO 3166-1 alpha-2 country code.
+
+    Returns:
+    lookup (tuple[str, dict | None, list]): Country code, album dictionary (None if not found) and list of track dictionaries.
+    """
+    try:
+        album, tracks = provider.lookup_album(album_id, country_code)
+    except providers.ProviderError:
+        album, tracks = None, []
+    return country_code, album, tracks
+
+def _is_complete(album: dict | None, tracks: list, known_track_count: int | None = None) -> bool:
+    """
+    Checks whether a lookup returned the album with all of its tracks.
+    Album track counts include non-song items such as digital booklets and videos, which lookups never return,
+    so a few tracks may be missing; the track count a storefront was last found to serve counts as complete too.
+
+    Args:
+    album (dict | None): Album dictionary, None if not found.
+    tracks (list): List of track dictionaries.
+    known_track_count (int | None): Number of tracks the album was last found with, None if unknown.
+
+    Returns:
+    complete (bool): True if the album and its full track list were found.
+    """
+    expected_track_count = album.get('track_count', 0) - config.STOREFRONT_TRACK_COUNT_TOLERANCE if album is not None else 0
+    if known_track_count is not None:
+        expected_track_count = min(expected_track_count, known_track_count)
+    complete = album is not None and len(tracks) > 0 and len(tracks) >= expected_track_count
+    return complete
+
+def resolve_album(provider: providers.MetadataProvider, album_id: str, country_code: str, fallback_country_codes: list = config.STOREFRONT_FALLBACK_COUNTRY_CODES, cache_path: str = config.STOREFRONT_CACHE_PATH) -> tuple[str, dict | None, list]:
+    """
+    Looks up an album and its tracks, falling back to other storefronts if the requested one does not serve them completely.
+    The cached serving storefront, or else the requested one, is asked first. On a miss all remaining storefronts are asked
+    concurrently, the first complete track list to arrive wins (not the first in fallback order) and the outstanding
+    lookups are cancelled. Without any complete
+    track list, the longest partial one is kept. The serving storefront and its track count are cached for later lookups,
+    so albums no storefront serves completely are not looked up everywhere again.
+
+    Args:
+    provider (providers.MetadataProvider): Metadata provider.
+    album_id (str): Album ID.
+    country_code (str): ISO 3166-1 alpha-2 country code of the requested storefront.
+    fallback_country_codes (list): Ordered list of fallback storefront country codes.
+    cache_path (str): Availability cache file path.
+
+    Returns:
+    lookup (tuple[str, dict | None, list]): Serving country code, album dictionary (None if not found anywhere) and list of track dictionaries.
+    """
+    # Ask the storefront known to serve the album first, the requested one otherwise
+    first_country_code = get_preferred_country_code(album_id, country_code, fallback_country_codes, cache_path)
+    cached_entry = get_cached_entry(album_id, country_code, cache_path)
+    known_track_count = cached_entry['track_count'] if cached_entry is not None and cached_entry['country_code'] == first_country_code else None
+    candidates = list(dict.fromkeys([country_code] + [code.lower() for code in fallback_country_codes]))
+    best = _lookup(provider, album_id, first_country_code)
+    remaining = [code for code in candidates if code != first_country_code]
+    fell_back = not _is_complete(*best[1:], known_track_count) and len(remaining) > 0
+    if fell_back:
+        futures = [_get_lookup_executor().submit(_lookup, provider, album_id, code) for code in remaining]
+        try:
+            for future in as_completed(futures):
+                lookup = future.result()
+                if _is_complete(*lookup[1:]):
+                    best = lookup
+                    break
+                if len(lookup[2]) > len(best[2]):
+                    best = lookup
+        finally:
+            # Cancel lookups not started yet, results of running ones are discarded
+            for future in futures:
+                future.cancel()
+    store_country_code, album, tracks = best if best[1] is not None and len(best[2]) > 0 else (country_code, None, [])
+    # Remember the outcome of fallback lookups and changes of cached outcomes, albums served completely as requested need no entry
+    entry = {"country_code": store_country_code, "track_count": len(tracks)}
+    if album is not None and entry != cached_entry and (fell_back or cached_entry is not None):
+        record_availability(album_id, country_code, store_country_code, len(tracks), cache_path)
+    return store_country_code, album, tracks
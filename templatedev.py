@@ -0,0 +1,114 @@
+## -- STD LIB IMPORTS --
+import os
+import json
+import html
+import time
+import difflib
+## -- LOCAL IMPORTS --
+import config   # constants
+import utils    # utility functions
+
+## -- FUNCTIONS --
+def watch_file(file_path: str, poll_seconds: float = config.TEMPLATE_DEV_POLL_SECONDS):
+    """
+    Watches a file by polling its modification time, yielding once initially and after every change.
+    Files replaced by editors saving atomically count as changed, a temporarily missing file is waited for.
+
+    Args:
+    file_path (str): Path to the watched file.
+    poll_seconds (float): Polling interval in seconds.
+
+    Yields:
+    None
+    """
+    last_stamp = None
+    while True:
+        try:
+            stat = os.stat(file_path)
+            stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except OSError:
+            stamp = None
+        if stamp is not None and stamp != last_stamp:
+            last_stamp = stamp
+            yield
+        else:
+            time.sleep(poll_seconds)
+
+def get_element_signatures(template: dict) -> dict:
+    """
+    Computes a signature per template element from its placeholder and the template settings it is populated with.
+    An element only needs to be populated again if its signature changed.
+
+    Args:
+    template (dict): Template dictionary.
+
+    Returns:
+    signatures (dict): Mapping of element names to signature strings.
+    """
+    signatures = {
+        element_name: json.dumps([template['svg_placeholders'][element_name]] + [template[setting] for setting in settings], sort_keys=True)
+        for element_name, settings in config.TEMPLATE_ELEMENTS.items()
+    }
+    return signatures
+
+def _shorten(line: str, max_length: int) -> str:
+    """
+    Shortens a diff line to a maximum length.
+
+    Args:
+    line (str): Diff line.
+    max_length (int): Maximum line length.
+
+    Returns:
+    line (str): Shortened diff line.
+    """
+    if len(line) > max_length:
+        line = f"{line[:max_length]}... ({len(line)} characters)"
+    return line
+
+def diff_documents(label: str, previous_content: str, content: str, max_line_length: int = config.TEMPLATE_DEV_DIFF_LINE_LENGTH) -> list:
+    """
+    Compares two renders of a document line by line.
+
+    Args:
+    label (str): Document label used in the diff header.
+    previous_content (str): Previously rendered content.
+    content (str): Newly rendered content.
+    max_line_length (int): Diff lines are shortened to this length, e.g. lines holding embedded artwork.
+
+    Returns:
+    diff_lines (list): Unified diff lines without context lines, empty if both renders are identical.
+    """
+    diff_lines = [
+        _shorten(line.rstrip("\n"), max_line_length)
+        for line in difflib.unified_diff(previous_content.split("\n"), content.split("\n"), f"{label} (previous)", f"{label} (current)", n=0, lineterm="")
+    ]
+    return diff_lines
+
+def write_comparison_page(out_dir: str, file_names: list, revision: int) -> str:
+    """
+    Writes an HTML page showing the previous and current render of every changed document side by side.
+    The page reloads itself, so it follows template changes while open in a browser.
+
+    Args:
+    out_dir (str): Output directory holding the renders.
+    file_names (list): List of (previous file name, current file name) tuples of changed documents.
+    revision (int): Template revision, appended to image URLs to defeat browser caching.
+
+    Returns:
+    page_path (str): Path to the written page.
+    """
+    rows = "\n".join([
+        f'<tr><td><img src="{html.escape(previous_name)}?r={revision}"></td><td><img src="{html.escape(current_name)}?r={revision}"></td></tr>'
+        for previous_name, current_name in file_names
+    ])
+    page = "\n".join([
+        "<!DOCTYPE html>",
+        f'<html><head><meta charset="utf-8"><meta http-equiv="refresh" content="{config.TEMPLATE_DEV_PAGE_REFRESH_SECONDS}"><title>Template revision {revision}</title>',
+        "<style>body{font-family:sans-serif;background:#e5e5e5}td{vertical-align:top;padding:8px}img{width:420px;background:#fff}</style></head>",
+        f"<body><h1>Template revision {revision}: {len(file_names)} changed</h1>",
+        f"<table><tr><th>Previous</th><th>Current</th></tr>\n{rows}\n</table></body></html>"
+    ])
+    page_path = os.path.join(out_dir, "index.html")
+    utils.atomic_write(page_path, page)
+    return page_path
@@ -0,0 +1,43 @@
+## -- STD LIB IMPORTS --
+import os
+import sys
+## -- EXT LIB IMPORTS --
+import pytest
+
+# Modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+## -- FIXTURES --
+@pytest.fixture(autouse=True)
+def run_in_tmp_path(tmp_path, monkeypatch):
+    """Runs every test in its own working directory, so the relative cache, output and journal paths of config.py stay isolated."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+@pytest.fixture
+def font_path(tmp_path):
+    """Builds a small TrueType font whose glyphs are all half an em wide, so text widths are predictable."""
+    fontBuilder = pytest.importorskip("fontTools.fontBuilder")
+    ttGlyphPen = pytest.importorskip("fontTools.pens.ttGlyphPen")
+    characters = {"A": "A", "B": "B", "C": "C", "&": "ampersand", " ": "space"}
+    glyph_names = [".notdef", *characters.values()]
+    builder = fontBuilder.FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(glyph_names)
+    builder.setupCharacterMap({ord(character): glyph_name for character, glyph_name in characters.items()})
+    glyphs = {}
+    for glyph_name in glyph_names:
+        pen = ttGlyphPen.TTGlyphPen(None)
+        pen.moveTo((0, 0))
+        pen.lineTo((0, 700))
+        pen.lineTo((400, 700))
+        pen.closePath()
+        glyphs[glyph_name] = pen.glyph()
+    builder.setupGlyf(glyphs)
+    builder.setupHorizontalMetrics({glyph_name: (500, 0) for glyph_name in glyph_names})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({"familyName": "Test", "styleName": "Bold"})
+    builder.setupOS2()
+    builder.setupPost()
+    path = str(tmp_path / "Test-Bold.ttf")
+    builder.save(path)
+    return path
@@ -0,0 +1,54 @@
+## -- STD LIB IMPORTS --
+import os
+import sys
+import sqlite3
+import threading
+import subprocess
+## -- EXT LIB IMPORTS --
+import pytest
+## -- LOCAL IMPORTS --
+import api
+import config
+
+REPO_DIR_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture(autouse=True)
+def close_api():
+    yield
+    api.close()
+
+def test_provider_errors_raise_render_errors(tmp_path):
+    with pytest.raises(api.RenderError, match="Error opening metadata provider: Fixture directory"):
+        api.render_poster("1", provider=f"fixture://{tmp_path / 'missing'}")
+    with pytest.raises(api.RenderError, match="Error opening metadata provider: Unsupported metadata provider 'ftp'"):
+        api.render_poster("1", provider="ftp://example.com")
+    with pytest.raises(ValueError):
+        api.render_poster("1", palette="cmyk")
+
+def test_index_connections_of_ended_threads_are_closed(monkeypatch):
+    monkeypatch.setattr(config, "USE_LOCAL_INDEX", True)
+    conns = []
+    thread = threading.Thread(target=lambda: conns.append(api._get_index_conn()))
+    thread.start()
+    thread.join()
+    conns.append(api._get_index_conn())
+    assert api._get_index_conn() is conns[1]
+    assert api._index_conns == [(threading.current_thread(), conns[1])]
+    with pytest.raises(sqlite3.ProgrammingError):
+        conns[0].execute("SELECT 1")
+    api.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conns[1].execute("SELECT 1")
+
+def run_script(script, tmp_path):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(tmp_path), REPO_DIR_PATH, *sys.path]))
+    return subprocess.run([sys.executable, "-c", script], cwd=tmp_path, env=env, capture_output=True, text=True)
+
+def test_import_skips_inquirerpy(tmp_path):
+    result = run_script("import sys, api; assert 'InquirerPy' not in sys.modules and api.utils.slug('A B') == 'a-b'", tmp_path)
+    assert result.returncode == 0, result.stderr
+
+def test_import_fails_if_host_modules_shadow_core_modules(tmp_path):
+    (tmp_path / "utils.py").write_text("HOST = True\n")
+    result = run_script("import utils, api", tmp_path)
+    assert result.returncode != 0 and "ImportError: Module 'utils' of the host program shadows the render core module" in result.stderr
@@ -0,0 +1,105 @@
+## -- STD LIB IMPORTS --
+import os
+import threading
+## -- EXT LIB IMPORTS --
+from PIL import Image
+## -- LOCAL IMPORTS --
+import config
+import main
+import utils
+
+def write_image(path, colors):
+    image = Image.new("RGB", (64, 64), colors[0])
+    for i, color in enumerate(colors[1:], 1):
+        image.paste(color, (0, i * 8, 64, 64))
+    image.save(path)
+    return path
+
+def write_cache_file(path, size, mtime):
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+def test_median_cut_returns_only_colors_in_image():
+    path = write_image("two.png", [(200, 30, 30), (20, 40, 220)])
+    colors = utils.extract_colors_median_cut(path, 5, 64)
+    assert sorted(map(tuple, colors)) == [(20, 40, 220), (200, 30, 30)]
+    assert [0, 0, 0] not in colors
+
+def test_median_cut_single_color_image():
+    path = write_image("one.png", [(255, 255, 255)])
+    assert utils.extract_colors_median_cut(path, 5, 64) == [[255, 255, 255]]
+
+def test_median_cut_keeps_black_when_present():
+    path = write_image("black.png", [(0, 0, 0), (250, 250, 250)])
+    colors = utils.extract_colors_median_cut(path, 5, 64)
+    assert sorted(map(tuple, colors)) == [(0, 0, 0), (250, 250, 250)]
+
+def test_evict_cache_keeps_most_recently_used_within_budget(tmp_path):
+    now = 1_000_000.0
+    for i in range(5):
+        write_cache_file(tmp_path / f"{i}.jpg", 100, now - 100 + i)
+        (tmp_path / f"{i}.jpg{config.LOCK_FILE_SUFFIX}").touch()
+    assert utils.evict_cache(str(tmp_path), 300, 3600, now) == 2
+    assert sorted(os.listdir(tmp_path)) == sorted([f"{i}.jpg" for i in (2, 3, 4)] + [f"{i}.jpg{config.LOCK_FILE_SUFFIX}" for i in (2, 3, 4)])
+
+def test_evict_cache_removes_expired_files_and_orphaned_locks(tmp_path):
+    now = 1_000_000.0
+    write_cache_file(tmp_path / "old.jpg", 10, now - 7200)
+    write_cache_file(tmp_path / "new.jpg", 10, now - 60)
+    orphan = tmp_path / f"failed.jpg{config.LOCK_FILE_SUFFIX}"
+    orphan.touch()
+    os.utime(orphan, (now - 7200, now - 7200))
+    fresh_orphan = tmp_path / f"downloading.jpg{config.LOCK_FILE_SUFFIX}"
+    write_cache_file(fresh_orphan, 0, now - 60)
+    assert utils.evict_cache(str(tmp_path), 10**6, 3600, now) == 1
+    assert sorted(os.listdir(tmp_path)) == sorted(["new.jpg", f"downloading.jpg{config.LOCK_FILE_SUFFIX}"])
+
+def test_evict_cache_missing_directory(tmp_path):
+    assert utils.evict_cache(str(tmp_path / "missing"), 0, 0) == 0
+
+def test_file_lock_survives_lock_file_removal(tmp_path):
+    path = str(tmp_path / "artwork.jpg")
+    order = []
+    acquired = threading.Event()
+
+    def hold_and_remove():
+        with utils.file_lock(path):
+            acquired.set()
+            order.append("remove")
+            os.remove(path + config.LOCK_FILE_SUFFIX)
+
+    def wait_and_lock():
+        acquired.wait()
+        with utils.file_lock(path) as lock_path:
+            order.append("locked")
+            assert os.path.exists(lock_path)
+
+    threads = [threading.Thread(target=hold_and_remove), threading.Thread(target=wait_and_lock)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert order == ["remove", "locked"]
+
+def test_artwork_cache_hit_marks_artwork_used(monkeypatch):
+    album = {"id": "1"}
+    path = main.get_artwork_cache_path("1", config.ARTWORK_SIZE)
+    os.makedirs(os.path.dirname(path))
+    write_image(path, [(10, 20, 30)])
+    os.utime(path, (1, 1))
+    main.get_album_artwork(None, album, preview=False, interactive=False)
+    assert os.path.getmtime(path) > 1
+    assert album["artwork_hash"] == utils.file_sha256(path)
+
+def test_evict_artwork_cache_is_throttled(monkeypatch):
+    calls = []
+    monkeypatch.setattr(utils, "evict_cache", lambda *args: calls.append(args) or 0)
+    monkeypatch.setattr(main, "_artwork_eviction_time", None)
+    main.evict_artwork_cache()
+    main.evict_artwork_cache()
+    assert len(calls) == 1
+    main.evict_artwork_cache(force=True)
+    assert len(calls) == 2
+    assert calls[0] == (config.ARTWORK_CACHE_DIR_PATH, config.ARTWORK_CACHE_MAX_MB * 1024 * 1024, config.ARTWORK_CACHE_MAX_AGE_DAYS * 86400)
@@ -0,0 +1,145 @@
+## -- STD LIB IMPORTS --
+import os
+import sys
+import json
+import time
+import threading
+## -- EXT LIB IMPORTS --
+import pytest
+from PIL import Image
+## -- LOCAL IMPORTS --
+import batch
+import config
+import main
+import progress
+
+class BatchStubs:
+    """Replaces metadata, artwork, palette and template steps of batch runs, counting calls per album."""
+    def __init__(self, monkeypatch):
+        self.calls = {"metadata": [], "palette": [], "write": []}
+        self.failing = {}           # Mapping of album IDs to the stage failing once
+        monkeypatch.setattr(main, "read_template_from_path", lambda template_path: {"svg_placeholders": {"file_wrapper_open": '<svg width="100" height="100">'}})
+        monkeypatch.setattr(main, "open_metadata_provider", lambda provider_url: None)
+        monkeypatch.setattr(main, "open_local_index", lambda: None)
+        monkeypatch.setattr(main, "get_album_tracks_and_palette", self.get_album_tracks_and_palette)
+        monkeypatch.setattr(main, "get_album_artwork", self.get_album_artwork)
+        monkeypatch.setattr(main, "get_album_colors", self.get_album_colors)
+        monkeypatch.setattr(main, "populate_album_template", lambda album, tracks, template, artwork_file_path: f"<svg>{album['id']}</svg>")
+        write_to_svg_file = main.write_to_svg_file
+        def write_or_fail(file_path, content, minify, compress):
+            self.fail_once(content[5:-6], "write")
+            self.calls['write'].append(content[5:-6])
+            write_to_svg_file(file_path, content, minify, compress)
+        monkeypatch.setattr(main, "write_to_svg_file", write_or_fail)
+
+    def fail_once(self, album_id: str, stage: str) -> None:
+        if self.failing.get(album_id) == stage:
+            del self.failing[album_id]
+            raise main.RenderError(f"Error in {stage} stage", ValueError(f"album {album_id}"))
+
+    def get_album_tracks_and_palette(self, provider, index_conn, catalogue_writer, album_id, country_code, preview, color_space, saliency, fallback_country_codes):
+        self.calls['metadata'].append(album_id)
+        self.fail_once(album_id, "metadata")
+        album = {"id": int(album_id), "artist": "Artist", "name": f"Album {album_id}"}
+        return album, [{"name": "Track", "time_millis": 1000}], None
+
+    def get_album_artwork(self, provider, album, preview, interactive = True):
+        artwork_file_path = f"artwork-{album['id']}.png"
+        if not os.path.exists(artwork_file_path):
+            Image.new("RGB", (8, 8), (200, 10, 10)).save(artwork_file_path)
+        album['artwork_size'], album['artwork_hash'] = 8, "ab" * 32
+        return artwork_file_path
+
+    def get_album_colors(self, artwork_file_path, preview, color_space, saliency):
+        self.calls['palette'].append(artwork_file_path)
+        return ["#c80a0a"]
+
+@pytest.fixture
+def stubs(monkeypatch):
+    return BatchStubs(monkeypatch)
+
+def run_batch(monkeypatch, batch_file: str, *extra_args) -> None:
+    monkeypatch.setattr(sys, "argv", ["main.py", "--batch", batch_file, "--journal", "journal.jsonl", "--out", "out", *extra_args])
+    main.run_batch(main.parse_args())
+
+def read_journal(journal_path: str = "journal.jsonl") -> list:
+    with open(journal_path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_read_batch_items(tmp_path):
+    (tmp_path / "batch.txt").write_text("# comment\n\n1\n2, GB\n1\n 2,gb \n3,us\n1,de\n")
+    assert batch.read_batch_items("batch.txt", "us") == [("1", "us"), ("2", "gb"), ("3", "us"), ("1", "de")]
+
+def test_read_batch_items_dedupes_large_batches_quickly(tmp_path):
+    (tmp_path / "batch.txt").write_text("".join(f"{album_id}\n" for album_id in range(100000)) * 2)
+    items = batch.read_batch_items("batch.txt", "us")
+    assert len(items) == 100000 and items[:2] == [("0", "us"), ("1", "us")]
+
+def test_journal_path_depends_on_batch_and_options():
+    path = batch.get_journal_path("batch.txt", {"preview": False})
+    assert path == batch.get_journal_path("./batch.txt", {"preview": False})
+    assert path != batch.get_journal_path("batch.txt", {"preview": True})
+    assert path != batch.get_journal_path("other.txt", {"preview": False})
+
+def test_journal_reopens_checkpoints_and_skips_torn_lines():
+    journal = batch.BatchJournal("journal.jsonl")
+    key = batch.BatchJournal.item_key("1", "us")
+    journal.record(key, "metadata", {"album": {"id": 1}, "tracks": []})
+    journal.record(key, "failed", {"error": "Error caching artwork: HTTP 404"})
+    journal.close()
+    with open("journal.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"item": "us:1", "stage": "do')
+    journal = batch.BatchJournal("journal.jsonl")
+    assert journal.state(key) == {"metadata": {"album": {"id": 1}, "tracks": []}, "failed": {"error": "Error caching artwork: HTTP 404"}}
+    assert not journal.is_done(key)
+    journal.record(key, "done", {"out_file_path": "out/poster.svg"})
+    assert journal.is_done(key) and "failed" not in journal.state(key)
+    journal.close()
+    # The checkpoint recorded after the torn line survives reopening
+    journal = batch.BatchJournal("journal.jsonl")
+    assert journal.is_done(key)
+    journal.close()
+    with open("journal.jsonl", "r", encoding="utf-8") as f:
+        assert [json.loads(line)['stage'] for line in f] == ["metadata", "failed", "done"]
+
+def test_batch_records_every_stage(monkeypatch, stubs, tmp_path):
+    (tmp_path / "batch.txt").write_text("1\n2\n")
+    run_batch(monkeypatch, "batch.txt")
+    entries = read_journal()
+    for key in ("us:1", "us:2"):
+        assert [entry['stage'] for entry in entries if entry['item'] == key] == ["metadata", "palette", "done"]
+    assert sorted(name for name in os.listdir("out") if not name.startswith(".")) == ["artist-album-1.svg", "artist-album-2.svg"]
+
+def test_batch_resume_skips_done_items_and_reuses_checkpoints(monkeypatch, stubs, tmp_path):
+    (tmp_path / "batch.txt").write_text("1\n2\n3\n")
+    stubs.failing = {"2": "metadata", "3": "write"}
+    run_batch(monkeypatch, "batch.txt")
+    failed = {entry['item']: entry['data']['error'] for entry in read_journal() if entry['stage'] == "failed"}
+    assert failed == {"us:2": "Error in metadata stage: album 2", "us:3": "Error in write stage: album 3"}
+    assert sorted(stubs.calls['metadata']) == ["1", "2", "3"] and len(stubs.calls['palette']) == 2
+    # Rerun: item 1 is skipped, item 2 starts over and item 3 reuses its metadata and palette checkpoints
+    run_batch(monkeypatch, "batch.txt")
+    assert sorted(stubs.calls['metadata']) == ["1", "2", "2", "3"]
+    assert sorted(stubs.calls['palette']) == ["artwork-1.png", "artwork-2.png", "artwork-3.png"]
+    assert sorted(stubs.calls['write']) == ["1", "2", "3"]
+    journal = batch.BatchJournal("journal.jsonl")
+    assert all(journal.is_done(batch.BatchJournal.item_key(album_id, "us")) for album_id in ("1", "2", "3"))
+    journal.close()
+    # Nothing is left to do
+    run_batch(monkeypatch, "batch.txt")
+    assert sorted(stubs.calls['metadata']) == ["1", "2", "2", "3"]
+
+def test_interrupted_batch_stops_workers_before_closing_the_journal(monkeypatch, stubs, tmp_path):
+    (tmp_path / "batch.txt").write_text("".join(f"{album_id}\n" for album_id in range(1, 21)))
+    get_album_colors = stubs.get_album_colors
+    monkeypatch.setattr(main, "get_album_colors", lambda *args: time.sleep(0.02) or get_album_colors(*args))
+    def interrupt(self, success, message = ""):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(progress.ProgressReporter, "item_finished", interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        run_batch(monkeypatch, "batch.txt")
+    stage_names = tuple(f"{stage}-" for stage in config.PIPELINE_STAGE_WORKERS)
+    assert not any(thread.name.startswith(stage_names) for thread in threading.enumerate())
+    # Items finished while stopping are journaled, the rest is left for the next run
+    done = [entry['item'] for entry in read_journal() if entry['stage'] == "done"]
+    assert 1 <= len(done) < 20 and len(stubs.calls['write']) == len(done)
@@ -0,0 +1,158 @@
+## -- STD LIB IMPORTS --
+import os
+import glob
+import threading
+## -- EXT LIB IMPORTS --
+import numpy as np
+import pytest
+## -- LOCAL IMPORTS --
+import catalogue
+import config
+import main
+import providers
+
+ALBUM = {"id": 7, "artist_id": 70, "artist": "Artist", "name": "Album", "artwork_url": "https://example.com/{w}x{h}bb.jpg", "track_count": 2, "copyright": "(c) Label", "release_date": "2020-01-01T00:00:00Z"}
+TRACKS = [
+    {"id": 71, "name": "One", "number": 1, "time_millis": 61000},
+    {"id": 72, "name": "Two", "number": 2, "time_millis": 122000},
+]
+DIGEST = "ab" * 32
+
+class FailingProvider(providers.MetadataProvider):
+    def search_albums(self, user_search, country_code, limit=config.ALBUM_RESULT_LIMIT):
+        raise AssertionError("provider must not be asked")
+
+    def lookup_album(self, album_id, country_code):
+        raise AssertionError("provider must not be asked")
+
+    def fetch_artwork(self, album, size, file_path):
+        raise AssertionError("provider must not be asked")
+
+@pytest.fixture(autouse=True)
+def reset_shared_catalogue():
+    main.close_shared_catalogue()
+    yield
+    main.close_shared_catalogue()
+
+def chunk_count(catalogue_dir, table):
+    return len(glob.glob(os.path.join(catalogue_dir, f"{table}-*.npz")))
+
+def write_album(catalogue_dir, country_code="us", method="srgb", artwork_size=config.ARTWORK_SIZE):
+    writer = catalogue.CatalogueWriter(catalogue_dir)
+    writer.add_albums([ALBUM], country_code)
+    writer.add_tracks(ALBUM["id"], country_code, TRACKS)
+    writer.add_palette(ALBUM["id"], DIGEST, artwork_size, ["#ffffff", "#000000"], method)
+    writer.flush()
+
+def test_writer_buffers_until_row_threshold(tmp_path):
+    writer = catalogue.CatalogueWriter(str(tmp_path), flush_rows=5, flush_seconds=3600)
+    writer.add_tracks(1, "us", TRACKS)
+    writer.add_tracks(2, "us", TRACKS)
+    assert chunk_count(tmp_path, "tracks") == 0
+    writer.add_tracks(3, "us", TRACKS)
+    assert chunk_count(tmp_path, "tracks") == 1
+    writer.flush()
+    assert chunk_count(tmp_path, "tracks") == 2
+    rows, strings = catalogue.load_table(str(tmp_path), "tracks")
+    assert len(rows) == 6 and strings["name"] == ["One", "Two"] * 3
+
+def test_writer_flushes_buffers_older_than_flush_seconds(tmp_path):
+    writer = catalogue.CatalogueWriter(str(tmp_path), flush_rows=1000, flush_seconds=0)
+    writer.add_albums([ALBUM], "us")
+    assert chunk_count(tmp_path, "albums") == 1
+
+def test_failed_flush_keeps_rows_buffered(tmp_path, monkeypatch):
+    writer = catalogue.CatalogueWriter(str(tmp_path), flush_rows=2, flush_seconds=3600)
+    write_chunk = catalogue.write_chunk
+    monkeypatch.setattr(catalogue, "write_chunk", lambda *args: (_ for _ in ()).throw(OSError("disk full")))
+    writer.add_tracks(1, "us", TRACKS)
+    assert chunk_count(tmp_path, "tracks") == 0
+    monkeypatch.setattr(catalogue, "write_chunk", write_chunk)
+    writer.flush()
+    rows, strings = catalogue.load_table(str(tmp_path), "tracks")
+    assert rows["album_id"].tolist() == [1, 1] and strings["name"] == ["One", "Two"]
+
+def test_load_render_inputs_all_storefronts_and_palette_method(tmp_path):
+    write_album(str(tmp_path), "us", "srgb")
+    write_album(str(tmp_path), "gb", "oklab")
+    render_inputs = catalogue.load_render_inputs(str(tmp_path), None, config.ARTWORK_SIZE, "oklab")
+    assert sorted(render_input["country"] for render_input in render_inputs) == ["gb", "us"]
+    assert all(render_input["album"]["name"] == "Album" and len(render_input["tracks"]) == 2 for render_input in render_inputs)
+    assert [render_input["colors"] for render_input in render_inputs] == [["#ffffff", "#000000"]] * 2
+    assert catalogue.load_render_inputs(str(tmp_path), "us", config.ARTWORK_SIZE, "mediancut")[0]["colors"] is None
+
+def test_chunks_of_older_layouts_load_without_palette_method(tmp_path):
+    old_dtype = [column for column in catalogue.TABLES["palettes"]["fixed"] if column[0] != "method"]
+    rows = np.zeros(1, dtype=old_dtype)
+    rows["album_id"], rows["artwork_size"], rows["color_count"] = ALBUM["id"], config.ARTWORK_SIZE, 1
+    np.savez_compressed(os.path.join(tmp_path, "palettes-0-old.npz"), rows=rows)
+    write_album(str(tmp_path), "us", "srgb")
+    palette_rows, _ = catalogue.load_table(str(tmp_path), "palettes")
+    assert palette_rows["method"].tolist() == [b"", b"srgb"]
+    assert catalogue.load_render_inputs(str(tmp_path), "us", config.ARTWORK_SIZE, "oklab")[0]["colors"] is None
+
+def test_loads_never_see_chunks_mid_compaction(tmp_path, monkeypatch):
+    write_album(str(tmp_path))
+    write_album(str(tmp_path))
+    merged, resume = threading.Event(), threading.Event()
+    write_chunk = catalogue.write_chunk
+    def pause_after_write(*args):
+        # Pause compaction between writing the merged chunk and removing the merged chunks
+        chunk_path = write_chunk(*args)
+        merged.set()
+        resume.wait(1)
+        return chunk_path
+    monkeypatch.setattr(catalogue, "write_chunk", pause_after_write)
+    compaction = threading.Thread(target=catalogue.compact, args=(str(tmp_path),))
+    compaction.start()
+    assert merged.wait(1)
+    loads = []
+    load = threading.Thread(target=lambda: loads.append(catalogue.load_table(str(tmp_path), "tracks")))
+    load.start()
+    load.join(0.1)
+    assert load.is_alive()
+    resume.set()
+    compaction.join()
+    load.join(1)
+    assert loads[0][1]["name"] == ["One", "Two"] * 2 and chunk_count(tmp_path, "tracks") == 1
+
+def test_loads_list_chunks_again_if_chunks_vanish(tmp_path, monkeypatch):
+    write_album(str(tmp_path))
+    read_chunks = catalogue._read_chunks
+    attempts = []
+    def vanish_once(chunk_paths, table):
+        attempts.append(chunk_paths)
+        if len(attempts) == 1:
+            raise FileNotFoundError(chunk_paths[0])
+        return read_chunks(chunk_paths, table)
+    monkeypatch.setattr(catalogue, "_read_chunks", vanish_once)
+    assert len(catalogue.load_table(str(tmp_path), "tracks")[0]) == 2 and len(attempts) == 2
+
+def test_renders_are_driven_from_catalogue_without_provider():
+    write_album(config.CATALOGUE_DIR_PATH, "us", main.get_palette_method(False, "srgb", False))
+    writer = main.get_shared_catalogue_writer()
+    album, tracks, cached_palette = main.get_album_tracks_and_palette(FailingProvider(), None, writer, "7", "us", False, "srgb", False, [])
+    assert album["name"] == "Album" and [track["name"] for track in tracks] == ["One", "Two"]
+    assert cached_palette == {"artwork_hash": DIGEST, "colors": ["#ffffff", "#000000"]}
+    # Records are shared by later renders and never modified
+    album["colors"] = []
+    assert "colors" not in main.get_album_tracks_and_palette(FailingProvider(), None, writer, "7", "us", False, "srgb", False, [])[0]
+
+def test_reused_palettes_are_not_recorded_again():
+    writer = main.get_shared_catalogue_writer()
+    album = dict(ALBUM, artwork_hash=DIGEST, artwork_size=config.ARTWORK_SIZE, colors=["#ffffff"], palette_method="srgb")
+    main.record_album_palette(writer, album, {"artwork_hash": DIGEST, "colors": ["#ffffff"]})
+    assert writer.buffers["palettes"][0] == []
+    main.record_album_palette(writer, album, {"artwork_hash": "cd" * 32, "colors": ["#ffffff"]})
+    main.record_album_palette(writer, album, None)
+    assert len(writer.buffers["palettes"][0]) == 2
+
+def test_shared_writer_is_flushed_once_on_close():
+    writer = main.get_shared_catalogue_writer()
+    assert main.get_shared_catalogue_writer() is writer
+    for album_id in range(3):
+        writer.add_tracks(album_id, "us", TRACKS)
+    assert chunk_count(config.CATALOGUE_DIR_PATH, "tracks") == 0
+    main.close_shared_catalogue()
+    assert chunk_count(config.CATALOGUE_DIR_PATH, "tracks") == 1
+    assert main.get_shared_catalogue_writer() is not writer
@@ -0,0 +1,55 @@
+## -- STD LIB IMPORTS --
+import os
+import base64
+import io
+## -- EXT LIB IMPORTS --
+import pytest
+## -- LOCAL IMPORTS --
+import config
+import main
+import utils
+
+SVG = '<svg width="10">\n<text font-family="Inter" font-weight="700">A&amp;B</text>\n<text font-family="Inter" font-weight="200">C</text>\n<text font-family="Inter" font-weight="700">BA</text>\n</svg>'
+
+@pytest.fixture(autouse=True)
+def clear_font_caches():
+    main.get_font_file_hash.cache_clear()
+    main.get_font_face_rule.cache_clear()
+    yield
+    main.get_font_file_hash.cache_clear()
+    main.get_font_face_rule.cache_clear()
+
+def read_cmap(font_data: bytes) -> set:
+    ttFont = pytest.importorskip("fontTools.ttLib")
+    return set(map(chr, ttFont.TTFont(io.BytesIO(font_data)).getBestCmap()))
+
+def test_text_glyphs_are_grouped_by_family_and_weight():
+    assert utils.get_text_glyphs(SVG) == {("Inter", "700"): "&AB", ("Inter", "200"): "C"}
+
+def test_subset_keeps_only_used_glyphs(font_path):
+    pytest.importorskip("brotli")
+    font_data = utils.subset_font(font_path, "AB")
+    assert font_data[:4] == b"wOF2"
+    assert read_cmap(font_data) == {"A", "B"}
+
+def test_embedded_subsets_are_cached_on_disk(font_path, monkeypatch):
+    pytest.importorskip("brotli")
+    template = {"calc_values": {"font_weight_mapping": {"700": font_path}}}
+    subsets = []
+    subset_font = utils.subset_font
+    monkeypatch.setattr(utils, "subset_font", lambda *args: subsets.append(args) or subset_font(*args))
+    content = main.embed_font_subsets(SVG, template)
+    # Only weights the template measures with are embedded, right after the root element
+    assert content.startswith('<svg width="10">\n<style>@font-face{font-family:"Inter";font-weight:700;src:url(data:font/woff2;base64,')
+    assert content.count("@font-face") == 1 and content.endswith(SVG[len('<svg width="10">'):])
+    font_data = base64.b64decode(content.split("base64,")[1].split(")")[0])
+    assert read_cmap(font_data) == {"&", "A", "B"}
+    assert len(os.listdir(config.FONT_SUBSET_CACHE_DIR_PATH)) == 1
+    # Later runs reuse the cached subset
+    main.get_font_face_rule.cache_clear()
+    assert main.embed_font_subsets(SVG, template) == content
+    assert subsets == [(font_path, "&AB")]
+
+def test_content_without_measured_fonts_is_unchanged():
+    template = {"calc_values": {"font_weight_mapping": {"900": "missing.ttf"}}}
+    assert main.embed_font_subsets(SVG, template) == SVG
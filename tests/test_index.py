@@ -0,0 +1,74 @@
+## -- STD LIB IMPORTS --
+import os
+## -- EXT LIB IMPORTS --
+import pytest
+## -- LOCAL IMPORTS --
+import index
+import main
+import catalogue
+import providers
+
+def make_album(album_id: int, artist: str, name: str) -> dict:
+    return {"artist": artist, "artist_id": 1, "id": album_id, "name": name, "artwork_url": "https://example.com/1500x1500bb.jpg", "track_count": 1, "copyright": "", "release_date": "2020-01-01T00:00:00Z"}
+
+class SearchProvider(providers.MetadataProvider):
+    """Provider serving fixed search results and counting searches."""
+    label = "test provider"
+
+    def __init__(self, albums: list, error: Exception | None = None):
+        self.albums = albums
+        self.error = error
+        self.searches = []
+
+    def search_albums(self, user_search, country_code, limit = 25):
+        self.searches.append(user_search)
+        if self.error is not None:
+            raise self.error
+        return self.albums
+
+    def lookup_album(self, album_id, country_code):
+        return None, []
+
+    def fetch_artwork(self, album, size, file_path):
+        raise providers.ProviderError("No artwork")
+
+@pytest.fixture
+def index_conn():
+    conn = index.open_index(os.path.join(".", "index.sqlite3"))
+    index.add_albums(conn, [make_album(1, "Taylor Swift", "Folklore"), make_album(2, "The Beatles", "Revolver")], "us")
+    yield conn
+    conn.close()
+
+def test_search_matches_token_prefixes_only(index_conn):
+    assert [album['id'] for album in index.search(index_conn, "taylor folk", "us")] == [1]
+    assert index.search(index_conn, "taylor swift 1989", "us") == []
+    assert index.search(index_conn, "the beatles abbey road", "us") == []
+
+def test_search_similar_tolerates_typos(index_conn):
+    assert [album['id'] for album in index.search_similar(index_conn, "tayler swfit folklore", "us")] == [1]
+
+def test_similar_index_matches_do_not_skip_provider(index_conn):
+    provider = SearchProvider([make_album(3, "Taylor Swift", "1989")])
+    albums = main.find_albums(provider, index_conn, catalogue.CatalogueWriter("catalogue"), "taylor swift 1989", "us")
+    assert provider.searches == ["taylor swift 1989"]
+    assert [album['id'] for album in albums] == [3]
+    # Provider results are indexed, so the next search is an exact index hit
+    assert [album['id'] for album in index.search(index_conn, "taylor swift 1989", "us")] == [3]
+
+def test_exact_index_matches_skip_provider(index_conn):
+    provider = SearchProvider([])
+    albums = main.find_albums(provider, index_conn, catalogue.CatalogueWriter("catalogue"), "beatles revolver", "us")
+    assert provider.searches == []
+    assert [album['id'] for album in albums] == [2]
+
+@pytest.mark.parametrize("error", [None, providers.ProviderError("unavailable"), ConnectionError("offline")])
+def test_similar_index_matches_are_suggested_when_provider_finds_nothing(index_conn, error):
+    provider = SearchProvider([], error)
+    albums = main.find_albums(provider, index_conn, catalogue.CatalogueWriter("catalogue"), "tayler swift folklore", "us")
+    assert provider.searches == ["tayler swift folklore"]
+    assert [album['id'] for album in albums] == [1]
+
+def test_provider_failure_without_similar_matches_raises(index_conn):
+    provider = SearchProvider([], ConnectionError("offline"))
+    with pytest.raises(main.RenderError):
+        main.find_albums(provider, index_conn, catalogue.CatalogueWriter("catalogue"), "no such record", "us")
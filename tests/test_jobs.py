@@ -0,0 +1,164 @@
+## -- STD LIB IMPORTS --
+import os
+import json
+import time
+import threading
+## -- EXT LIB IMPORTS --
+import pytest
+## -- LOCAL IMPORTS --
+import jobs
+import main
+import providers
+
+@pytest.fixture(params=["sqlite", "spool"])
+def queue_factory(request, tmp_path):
+    def open_test_queue(**kwargs):
+        if request.param == "sqlite":
+            return jobs.SqliteJobQueue(str(tmp_path / "jobs.sqlite3"), **kwargs)
+        return jobs.SpoolJobQueue(str(tmp_path / "spool"), **kwargs)
+    return open_test_queue
+
+def read_spool_job(queue: jobs.SpoolJobQueue, status: str, job_id: str) -> dict:
+    with open(queue._path(status, job_id), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def test_interfaces_are_abstract():
+    with pytest.raises(TypeError):
+        jobs.JobQueue()
+    with pytest.raises(TypeError):
+        providers.MetadataProvider()
+
+def test_render_error_includes_cause():
+    assert str(main.RenderError("Error caching artwork", ValueError("HTTP 404"))) == "Error caching artwork: HTTP 404"
+    assert str(main.RenderError("", ValueError("HTTP 404"))) == "HTTP 404"
+    assert str(main.RenderError("Artwork is not available")) == "Artwork is not available"
+    with pytest.raises(main.RenderError, match="Error caching artwork: HTTP 404"):
+        main.raise_render_error(ValueError("HTTP 404"), "Error caching artwork")
+
+def test_claim_and_complete(queue_factory):
+    queue = queue_factory()
+    job_id = queue.submit({"album_id": "1"})
+    job = queue.claim("worker-a", 60)
+    assert job == {"id": job_id, "payload": {"album_id": "1"}, "attempts": 1}
+    assert queue.claim("worker-b", 60) is None
+    assert queue.counts() == {"queued": 0, "running": 1, "done": 0, "failed": 0}
+    assert not queue.complete(job_id, "worker-b", "stolen.svg")
+    assert queue.heartbeat(job_id, "worker-a", 60)
+    assert queue.complete(job_id, "worker-a", "poster.svg")
+    assert queue.counts() == {"queued": 0, "running": 0, "done": 1, "failed": 0}
+    assert not queue.heartbeat(job_id, "worker-a", 60)
+
+def test_failed_jobs_are_retried_with_backoff_until_attempts_run_out(queue_factory):
+    queue = queue_factory(max_attempts=2, backoff_seconds=60)
+    job_id = queue.submit({"album_id": "1"})
+    queue.claim("worker-a", 60)
+    assert queue.fail(job_id, "worker-a", "Error caching artwork: HTTP 404") == 60
+    # Not due before the retry delay
+    assert queue.claim("worker-a", 60) is None
+    assert queue.counts()['queued'] == 1
+    queue = queue_factory(max_attempts=2, backoff_seconds=0)
+    job_id = queue.submit({"album_id": "2"})
+    queue.claim("worker-a", 60)
+    assert queue.fail(job_id, "worker-a", "first") == 0
+    assert queue.claim("worker-b", 60)['attempts'] == 2
+    assert queue.fail(job_id, "worker-a", "not the lease owner") is None
+    assert queue.fail(job_id, "worker-b", "second") is None
+    assert queue.counts()['failed'] == 1
+
+def test_expired_leases_are_requeued_then_failed(queue_factory):
+    queue = queue_factory(max_attempts=2)
+    job_id = queue.submit({"album_id": "1"})
+    queue.claim("worker-a", -1)
+    # The expired job goes to the next worker, the previous owner lost its lease
+    job = queue.claim("worker-b", -1)
+    assert job['id'] == job_id and job['attempts'] == 2
+    assert not queue.complete(job_id, "worker-a", "late.svg")
+    assert queue.claim("worker-c", 60) is None
+    assert queue.counts() == {"queued": 0, "running": 0, "done": 0, "failed": 1}
+
+def test_unexpired_leases_are_kept(queue_factory):
+    queue = queue_factory()
+    queue.submit({"album_id": "1"})
+    job = queue.claim("worker-a", 60)
+    assert queue.claim("worker-b", 60) is None
+    assert queue.complete(job['id'], "worker-a", "poster.svg")
+
+def test_spool_requeue_and_retry_clear_the_lease(tmp_path):
+    queue = jobs.SpoolJobQueue(str(tmp_path / "spool"), backoff_seconds=60)
+    job_id = queue.submit({"album_id": "1"})
+    queue.claim("worker-a", -1)
+    queue._requeue_expired()
+    job = read_spool_job(queue, "queued", job_id)
+    assert job['lease_owner'] is None and job['lease_expires'] is None
+    queue.claim("worker-b", 60)
+    queue.fail(job_id, "worker-b", "Error caching artwork: HTTP 404")
+    job = read_spool_job(queue, "queued", job_id)
+    assert job['lease_owner'] is None and job['lease_expires'] is None
+    assert job['error'] == "Error caching artwork: HTTP 404"
+
+def test_spool_running_jobs_always_hold_a_lease(tmp_path, monkeypatch):
+    queue = jobs.SpoolJobQueue(str(tmp_path / "spool"))
+    job_id = queue.submit({"album_id": "1"})
+    queue.claim("worker-0", -1)
+    queue._requeue_expired()
+    # Requeue running jobs as soon as they become visible, between the claim's rename and its return
+    rename = os.rename
+    def rename_then_requeue(source, destination):
+        rename(source, destination)
+        if destination == queue._path("running", job_id):
+            queue._requeue_expired()
+    monkeypatch.setattr(jobs.os, "rename", rename_then_requeue)
+    job = queue.claim("worker-a", 60)
+    monkeypatch.setattr(jobs.os, "rename", rename)
+    assert job['attempts'] == 2
+    assert queue.counts() == {"queued": 0, "running": 1, "done": 0, "failed": 0}
+    assert read_spool_job(queue, "running", job_id)['lease_owner'] == "worker-a"
+
+def test_spool_abandoned_claims_are_requeued(tmp_path):
+    queue = jobs.SpoolJobQueue(str(tmp_path / "spool"))
+    job_id = queue.submit({"album_id": "1"})
+    # A worker crashed after taking the job, before writing its lease
+    assert queue._take(queue._path("queued", job_id), job_id, time.time() + 60) is not None
+    assert queue.counts()['running'] == 1
+    assert queue.claim("worker-b", 60) is None
+    claim_path, _, _ = queue._list_claims()[0]
+    os.rename(claim_path, claim_path.replace(claim_path.split(".")[-3], "0"))
+    job = queue.claim("worker-b", 60)
+    assert job['id'] == job_id
+    assert queue.counts() == {"queued": 0, "running": 1, "done": 0, "failed": 0}
+
+def test_concurrent_claims_hand_out_each_job_once(queue_factory):
+    queue_factory().submit({"album_id": "0"})
+    for album_id in range(1, 40):
+        queue_factory().submit({"album_id": str(album_id)})
+    claimed, errors, lock = [], [], threading.Lock()
+    def claim_all(worker_id):
+        queue = queue_factory()
+        try:
+            while (job := queue.claim(worker_id, 60)) is not None:
+                with lock:
+                    claimed.append(job['payload']['album_id'])
+                assert queue.complete(job['id'], worker_id, "poster.svg")
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=claim_all, args=(f"worker-{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert sorted(claimed, key=int) == [str(album_id) for album_id in range(40)]
+
+def test_worker_records_render_errors_with_cause_and_calls_on_exit(tmp_path, monkeypatch):
+    queue = jobs.SpoolJobQueue(str(tmp_path / "spool"), max_attempts=2, backoff_seconds=0)
+    monkeypatch.setattr(jobs, "open_queue", lambda queue_url: jobs.SpoolJobQueue(str(tmp_path / "spool"), max_attempts=2, backoff_seconds=0))
+    failing_id, done_id = queue.submit({"fail": True}), queue.submit({"fail": False})
+    def render_job(payload):
+        if payload['fail']:
+            raise main.RenderError("Error caching artwork", ValueError("HTTP 404"))
+        return "poster.svg"
+    exits = []
+    jobs.run_worker("spool://unused", render_job, poll_interval=0.01, exit_when_empty=True, on_exit=lambda: exits.append(True))
+    assert exits == [True]
+    assert read_spool_job(queue, "failed", failing_id)['error'] == "Error caching artwork: HTTP 404"
+    assert read_spool_job(queue, "done", done_id)['result'] == "poster.svg"
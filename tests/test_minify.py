@@ -0,0 +1,40 @@
+## -- STD LIB IMPORTS --
+import gzip
+## -- LOCAL IMPORTS --
+import main
+import utils
+
+SVG = """<svg width="10" height="10">
+  <text font-family="Inter" font-size="12" fill="#fff" x="1">A  B</text>
+  <text font-family="Inter" font-size="12" fill="#fff" x="2">C</text>
+  <rect fill="#000" width="1" />
+</svg>
+"""
+
+def test_shared_attributes_are_hoisted_into_element_rules():
+    assert utils.minify_svg(SVG) == (
+        '<svg width="10" height="10"><style>text{fill:#fff;font-family:Inter;font-size:12px}</style>'
+        '<text x="1">A  B</text><text x="2">C</text><rect fill="#000" width="1"/></svg>'
+    )
+
+def test_repeated_combinations_are_hoisted_into_classes():
+    content = '<svg>' + "".join(f'<text fill="#fff" font-family="Inter" x="{i}">{i}</text>' for i in range(3)) + '<text fill="#000">x</text></svg>'
+    minified = utils.minify_svg(content)
+    assert minified.startswith('<svg><style>.s0{fill:#fff;font-family:Inter}</style><text class="s0" x="0">0</text>')
+    assert minified.endswith('<text fill="#000">x</text></svg>')
+
+def test_element_rules_never_match_classed_elements():
+    content = SVG.replace('<rect', '<text class="title" fill="#000">D</text><rect')
+    minified = utils.minify_svg(content)
+    assert "text{" not in minified
+    assert '<text class="title" fill="#000">D</text>' in minified
+    assert '<text class="s0" x="1">A  B</text>' in minified
+
+def test_unhoistable_content_is_kept():
+    content = '<?xml version="1.0"?>\n<svg>\n  <!-- note -->\n  <text x="1"\n        y="2">Hi</text>\n</svg>'
+    assert utils.minify_svg(content) == '<?xml version="1.0"?><svg><!-- note --><text x="1" y="2">Hi</text></svg>'
+
+def test_write_minified_and_compressed_svg():
+    main.write_to_svg_file("poster.svgz", SVG, minify=True, compress=True)
+    with gzip.open("poster.svgz", "rt", encoding="utf-8") as f:
+        assert f.read() == utils.minify_svg(SVG)
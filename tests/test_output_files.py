@@ -0,0 +1,74 @@
+## -- STD LIB IMPORTS --
+import os
+import stat
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+## -- EXT LIB IMPORTS --
+import pytest
+## -- LOCAL IMPORTS --
+import utils
+import main
+
+def file_mode(file_path: str) -> int:
+    return stat.S_IMODE(os.stat(file_path).st_mode)
+
+def test_atomic_write_creates_files_with_umask_mode(tmp_path):
+    utils.atomic_write(str(tmp_path / "poster.svg"), "<svg/>")
+    assert file_mode(tmp_path / "poster.svg") == 0o666 & ~utils.get_umask()
+    assert (tmp_path / "poster.svg").read_text() == "<svg/>"
+
+def test_umask_is_read_without_setting_it(monkeypatch):
+    umask = os.umask(0o027)
+    os.umask(umask)
+    monkeypatch.setattr(os, "umask", lambda mask: pytest.fail("the umask is set for all threads"))
+    utils.get_umask.cache_clear()
+    try:
+        assert utils.get_umask() == umask
+    finally:
+        utils.get_umask.cache_clear()
+
+def test_atomic_write_keeps_mode_of_replaced_file(tmp_path):
+    target = tmp_path / "poster.svg"
+    target.write_text("old")
+    os.chmod(target, 0o640)
+    utils.atomic_write(str(target), b"new")
+    assert file_mode(target) == 0o640
+    assert target.read_bytes() == b"new"
+
+def test_atomic_open_leaves_target_untouched_on_failure(tmp_path):
+    target = tmp_path / "poster.svg"
+    target.write_text("old")
+    with pytest.raises(RuntimeError):
+        with utils.atomic_open(str(target)) as f:
+            f.write("partial")
+            raise RuntimeError("interrupted")
+    assert target.read_text() == "old"
+    assert os.listdir(tmp_path) == ["poster.svg"]
+
+def test_claim_file_first_owner_wins(tmp_path):
+    marker = str(tmp_path / "slug")
+    assert utils.claim_file(marker, "1") == "1"
+    assert utils.claim_file(marker, "2") == "1"
+    assert utils.claim_file(marker, "1") == "1"
+    assert os.listdir(tmp_path) == ["slug"]
+
+def test_claim_file_concurrent_claims_agree(tmp_path):
+    marker = str(tmp_path / "slug")
+    with ThreadPoolExecutor(8) as executor:
+        owners = list(executor.map(lambda owner: utils.claim_file(marker, owner), [str(idx) for idx in range(32)]))
+    assert len(set(owners)) == 1
+
+def test_output_file_path_disambiguates_colliding_slugs(tmp_path):
+    out_dir = str(tmp_path / "out")
+    assert main.get_output_file_path(out_dir, "artist-album", "100", "svg") == os.path.join(out_dir, "artist-album.svg")
+    assert main.get_output_file_path(out_dir, "artist-album", "200", "svg") == os.path.join(out_dir, "artist-album-200.svg")
+    assert main.get_output_file_path(out_dir, "other-album", "200", "svgz") == os.path.join(out_dir, "other-album.svgz")
+    assert file_mode(os.path.join(out_dir, ".slugs", "artist-album")) == 0o666 & ~utils.get_umask()
+
+def test_output_file_path_follows_claims_on_disk(tmp_path):
+    out_dir = str(tmp_path / "out")
+    assert main.get_output_file_path(out_dir, "artist-album", "100", "svg") == os.path.join(out_dir, "artist-album.svg")
+    # Long-lived processes see output folders cleared meanwhile
+    shutil.rmtree(out_dir)
+    assert main.get_output_file_path(out_dir, "artist-album", "200", "svg") == os.path.join(out_dir, "artist-album.svg")
+    assert main.get_output_file_path(out_dir, "artist-album", "100", "svg") == os.path.join(out_dir, "artist-album-100.svg")
@@ -0,0 +1,42 @@
+## -- EXT LIB IMPORTS --
+import numpy as np
+from PIL import Image
+## -- LOCAL IMPORTS --
+import config
+import utils
+
+COLORS = [(230, 40, 40), (30, 60, 200), (250, 230, 60)]
+
+def write_striped_image(path):
+    image = Image.new("RGB", (300, 300))
+    for i, color in enumerate(COLORS):
+        image.paste(color, (0, i * 100, 300, (i + 1) * 100))
+    image.save(path)
+    return path
+
+def test_oklab_palette_finds_distinct_colors():
+    path = write_striped_image("stripes.png")
+    colors = utils.extract_colors_oklab(path, 3)
+    palette = utils.srgb_to_oklab(np.array(colors, dtype=float))
+    expected = utils.srgb_to_oklab(np.array(COLORS, dtype=float))
+    assert np.linalg.norm(expected[:, None] - palette[None], axis=2).min(axis=1).max() < 0.02
+
+def test_oklab_clusters_a_fixed_pixel_sample(monkeypatch):
+    fitted = []
+    fit_predict = utils.KMeans.fit_predict
+
+    def record_fit_predict(self, pixels, sample_weight=None):
+        fitted.append((pixels.copy(), sample_weight.copy()))
+        return fit_predict(self, pixels, sample_weight=sample_weight)
+
+    monkeypatch.setattr(utils.KMeans, "fit_predict", record_fit_predict)
+    path = write_striped_image("stripes.png")
+    utils.extract_colors_oklab(path, 3, saliency=True)
+    utils.extract_colors_oklab(path, 3, saliency=True)
+    assert [len(pixels) for pixels, _ in fitted] == [config.PALETTE_SAMPLE_PIXELS] * 2
+    assert np.array_equal(fitted[0][0], fitted[1][0]) and np.array_equal(fitted[0][1], fitted[1][1])
+    utils.extract_colors_oklab(path, 3, sample_pixels=10**6)
+    assert len(fitted[2][0]) == 256 * 256
+
+def test_sort_colors_by_luminance():
+    assert utils.sort_colors_by_luminance([[0, 0, 0], [255, 255, 255], [255, 0, 0]]) == [[255, 255, 255], [255, 0, 0], [0, 0, 0]]
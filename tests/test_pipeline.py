@@ -0,0 +1,95 @@
+## -- STD LIB IMPORTS --
+import time
+import threading
+## -- EXT LIB IMPORTS --
+import pytest
+## -- LOCAL IMPORTS --
+import pipeline
+
+def test_budget_blocks_until_released():
+    budget = pipeline.ResourceBudget("slots", 2)
+    budget.acquire(2)
+    acquired = threading.Event()
+    thread = threading.Thread(target=lambda: (budget.acquire(1), acquired.set()))
+    thread.start()
+    assert not acquired.wait(0.1)
+    budget.release(1)
+    assert acquired.wait(1)
+    thread.join()
+    assert budget.used == 2 and budget.peak == 2
+
+def test_oversized_requests_run_alone():
+    budget = pipeline.ResourceBudget("bytes", 10)
+    with budget.reserve(25):
+        assert budget.used == 25
+    with budget.reserve(4):
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: (budget.acquire(25), acquired.set()))
+        thread.start()
+        assert not acquired.wait(0.1)
+    assert acquired.wait(1)
+    thread.join()
+
+def test_cancelled_budget_fails_waiting_acquisitions():
+    budget = pipeline.ResourceBudget("slots", 1)
+    budget.acquire(1)
+    errors = []
+    def acquire():
+        try:
+            budget.acquire(1)
+        except pipeline.PipelineStopped as e:
+            errors.append(e)
+    thread = threading.Thread(target=acquire)
+    thread.start()
+    time.sleep(0.05)
+    budget.cancel()
+    thread.join(1)
+    assert not thread.is_alive() and len(errors) == 1
+    with pytest.raises(pipeline.PipelineStopped):
+        budget.acquire(1)
+
+def test_failed_items_skip_remaining_stages():
+    calls = []
+    def parse(item):
+        if item == "x":
+            raise ValueError("not a number")
+        return int(item)
+    def double(item):
+        calls.append(item)
+        return item * 2
+    results = list(pipeline.Pipeline([("parse", parse, 2), ("double", double, 2)], 2).run(["1", "x", "3"]))
+    assert sorted(item for item, error in results if error is None) == [2, 6]
+    assert [(item, str(error)) for item, error in results if error is not None] == [("x", "not a number")]
+    assert sorted(calls) == [1, 3]
+
+def test_slow_stages_hold_back_the_feed():
+    fed, lock = [0], threading.Lock()
+    def items():
+        for item in range(50):
+            with lock:
+                fed[0] += 1
+            yield item
+    def slow(item):
+        time.sleep(0.005)
+        return item
+    consumed, ahead = 0, 0
+    for item, error in pipeline.Pipeline([("fast", lambda item: item, 1), ("slow", slow, 1)], 1).run(items()):
+        consumed += 1
+        with lock:
+            ahead = max(ahead, fed[0] - consumed)
+    assert consumed == 50
+    # At most one item per queue and per worker is between the feed and the consumer
+    assert ahead <= 6
+
+def test_stopped_pipeline_joins_all_threads():
+    budget = pipeline.ResourceBudget("slots", 1)
+    def hold(item):
+        # Only the first item gets a slot, the next waits until the pipeline stops
+        budget.acquire(1)
+        return item
+    batch_pipeline = pipeline.Pipeline([("hold", hold, 2), ("pass", lambda item: item, 1)], 1, [budget])
+    results = batch_pipeline.run(range(10))
+    assert next(results) == (0, None)
+    results.close()
+    assert len(batch_pipeline.threads) == 4 and not any(thread.is_alive() for thread in batch_pipeline.threads)
+    batch_pipeline.stop()
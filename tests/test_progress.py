@@ -0,0 +1,80 @@
+## -- STD LIB IMPORTS --
+import io
+import queue
+## -- EXT LIB IMPORTS --
+import pytest
+## -- LOCAL IMPORTS --
+import config
+import progress
+
+def open_reporter(interactive=False):
+    stream = io.StringIO()
+    return progress.ProgressReporter(stream, interactive), stream
+
+def test_failed_tasks_are_reported_as_failures():
+    reporter, stream = open_reporter()
+    task = reporter.start_task("metadata", "Fetching", "Fetched", "Fetching failed")
+    task.finish(False)
+    task.finish(True)
+    assert stream.getvalue() == f"{config.ANSI_FORMATS['FONT_RED']}✗{config.ANSI_FORMATS['END']} Fetching failed\n"
+    assert list(reporter.latencies["metadata"]) and reporter.errors["metadata"] == 1
+    reporter.close()
+
+def test_summary_aggregates_throughput_latencies_and_errors():
+    reporter, stream = open_reporter()
+    reporter.set_total(4)
+    for seconds in (0.01, 0.02, 0.03):
+        reporter.record("palette", seconds)
+    with pytest.raises(ValueError):
+        with reporter.stage("write"):
+            raise ValueError("disk full")
+    reporter.item_finished(True, "one")
+    reporter.item_finished(False, "two")
+    summary = reporter._summary()
+    assert summary.startswith("[2/4] ") and "ETA " in summary
+    assert "palette p50 20ms p95 30ms" in summary
+    assert summary.endswith("1 failed (write: 1)")
+    reporter.close()
+    # Plain lines only, without status line redraws
+    lines = stream.getvalue().splitlines()
+    assert lines[:2] == ["one", "two"] and lines[2].startswith("  [2/4] ") and "\r" not in stream.getvalue()
+
+def test_close_resets_counters_for_the_next_run():
+    reporter, stream = open_reporter()
+    reporter.set_total(2)
+    reporter.item_finished(True)
+    reporter.item_finished(False)
+    reporter.record("write", 0.01, False)
+    reporter.close()
+    reporter.set_total(1)
+    reporter.item_finished(True)
+    assert reporter._summary().startswith("[1/1] ") and "failed" not in reporter._summary()
+    assert reporter.thread is not None and reporter.thread.is_alive()
+    reporter.close()
+    assert stream.getvalue().splitlines()[-1].startswith("  [1/1] ")
+
+def test_terminal_status_line_shows_running_tasks():
+    reporter, stream = open_reporter(interactive=True)
+    reporter.stop_event.set()
+    task = reporter.start_task("artwork", "Downloading artwork", "Downloaded", "Failed")
+    reporter._write_status(1)
+    assert stream.getvalue() == "\r  Downloading artwork.../\r"
+    task.finish(True)
+    assert stream.getvalue().endswith(f"\r{' ' * 25}\r{config.ANSI_FORMATS['FONT_GREEN']}✔{config.ANSI_FORMATS['END']} Downloaded\n")
+    assert reporter.tasks == {}
+    reporter.close()
+
+def test_forwarded_events_are_aggregated_by_the_consumer():
+    reporter, stream = open_reporter()
+    event_queue = queue.Queue()
+    forwarder = progress.ProgressReporter(event_queue = event_queue)
+    assert not forwarder.interactive
+    forwarder.item_finished(True, "done")
+    forwarder.record("write", 0.01)
+    forwarder.log("worker finished")
+    assert forwarder.done == 0 and forwarder.thread is None
+    event_queue.put(None)
+    reporter.consume(event_queue).join()
+    assert reporter.done == 1 and list(reporter.latencies["write"]) == [0.01]
+    assert stream.getvalue().splitlines()[:2] == ["done", "worker finished"]
+    reporter.close()
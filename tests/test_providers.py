@@ -0,0 +1,98 @@
+## -- STD LIB IMPORTS --
+import json
+## -- EXT LIB IMPORTS --
+import pytest
+from PIL import Image
+## -- LOCAL IMPORTS --
+import config
+import providers
+
+def album_record(album_id, name, artist="Artist"):
+    return {
+        "wrapperType": "collection", "collectionType": "Album", "collectionId": album_id, "collectionName": name,
+        "artistId": 1, "artistName": artist, "artworkUrl100": "https://example.com/100x100bb.jpg",
+        "trackCount": 2, "copyright": "(c) Label", "releaseDate": "2020-01-01T00:00:00Z",
+    }
+
+def track_record(album_id, track_id, name, disc_number, track_number):
+    return {"wrapperType": "track", "collectionId": album_id, "trackId": track_id, "trackName": name, "discNumber": disc_number, "trackNumber": track_number, "trackTimeMillis": 61000}
+
+@pytest.fixture
+def fixtures_dir(tmp_path):
+    root = tmp_path / "fixtures"
+    (root / "de").mkdir(parents=True)
+    (root / "artwork").mkdir()
+    (root / "albums.json").write_text(json.dumps({"results": [
+        album_record(1, "Blue Train", "John Coltrane"),
+        track_record(1, 12, "Moment's Notice", 1, 2),
+        track_record(1, 21, "Lazy Bird", 2, 1),
+        track_record(1, 11, "Blue Train", 1, 1),
+        album_record(2, "Kind of Blue", "Miles Davis"),
+    ]}))
+    (root / "de" / "albums.jsonl").write_text(json.dumps(album_record(1, "Blue Train (DE)", "John Coltrane")) + "\n")
+    Image.new("RGB", (64, 32), (10, 20, 30)).save(root / "artwork" / "1.png")
+    return str(root)
+
+def test_fixture_lookup_orders_tracks_by_disc_and_number(fixtures_dir):
+    provider = providers.FixtureProvider(fixtures_dir)
+    album, tracks = provider.lookup_album("1", "us")
+    assert album["name"] == "Blue Train" and "search_tokens" not in album
+    assert [track["id"] for track in tracks] == [11, 12, 21]
+    assert provider.lookup_album("3", "us") == (None, [])
+
+def test_fixture_storefront_records_take_precedence(fixtures_dir):
+    provider = providers.FixtureProvider(fixtures_dir)
+    album, tracks = provider.lookup_album("1", "de")
+    assert album["name"] == "Blue Train (DE)"
+    # The storefront overrides the album record only, tracks come from the shared records
+    assert [track["id"] for track in tracks] == [11, 12, 21]
+    # Albums missing from a storefront are served from the shared records
+    assert provider.lookup_album("2", "de")[0]["name"] == "Kind of Blue"
+
+def test_fixture_search_prefix_matches_every_token(fixtures_dir):
+    provider = providers.FixtureProvider(fixtures_dir)
+    assert [album["id"] for album in provider.search_albums("blu", "us")] == [1, 2]
+    assert [album["id"] for album in provider.search_albums("coltr blue", "us")] == [1]
+    assert [album["name"] for album in provider.search_albums("coltrane", "de")] == ["Blue Train (DE)"]
+    assert provider.search_albums("blue", "us", limit=1)[0]["id"] == 1
+    assert provider.search_albums("", "us") == []
+
+def test_fixture_artwork_is_downscaled_to_jpeg(fixtures_dir, tmp_path):
+    provider = providers.FixtureProvider(fixtures_dir)
+    provider.fetch_artwork({"id": 1}, 16, str(tmp_path / "artwork.jpg"))
+    with Image.open(tmp_path / "artwork.jpg") as image:
+        assert image.format == "JPEG" and image.size == (16, 8)
+    with pytest.raises(providers.ProviderError):
+        provider.fetch_artwork({"id": 2}, 16, str(tmp_path / "missing.jpg"))
+
+def test_open_provider(fixtures_dir):
+    provider = providers.open_provider(f"fixture://{fixtures_dir}")
+    assert isinstance(provider, providers.FixtureProvider) and providers.open_provider(f"fixture://{fixtures_dir}") is provider
+    assert isinstance(providers.open_provider("itunes://"), providers.ITunesProvider)
+    with pytest.raises(providers.ProviderError):
+        providers.open_provider(f"fixture://{fixtures_dir}/missing")
+    with pytest.raises(ValueError):
+        providers.open_provider("ftp://example.com")
+
+def test_itunes_errors_raise_provider_errors(monkeypatch):
+    class Response:
+        status_code = 503
+    monkeypatch.setattr(providers.requests, "get", lambda *args, **kwargs: Response())
+    provider = providers.ITunesProvider()
+    with pytest.raises(providers.ProviderError, match="status 503"):
+        provider.lookup_album("1", "us")
+    with pytest.raises(providers.ProviderError, match="status 503"):
+        provider.search_albums("blue", "us")
+
+def test_itunes_requests_time_out_as_provider_errors(monkeypatch):
+    timeouts = []
+    def get(url, timeout=None, **kwargs):
+        timeouts.append(timeout)
+        raise providers.requests.Timeout("read timed out")
+    monkeypatch.setattr(providers.requests, "get", get)
+    provider = providers.ITunesProvider()
+    with pytest.raises(providers.ProviderError, match="read timed out"):
+        provider.lookup_album("1", "us")
+    with pytest.raises(providers.ProviderError):
+        provider.fetch_artwork({"id": 1, "artwork_url": "https://example.com/100x100bb.jpg"}, 16, "artwork.jpg")
+    assert timeouts == [config.ITUNES_REQUEST_TIMEOUT_SECONDS] * 2
@@ -0,0 +1,121 @@
+## -- STD LIB IMPORTS --
+import os
+import json
+import threading
+## -- EXT LIB IMPORTS --
+import pytest
+## -- LOCAL IMPORTS --
+import config
+import providers
+import storefronts
+
+CACHE_PATH = "storefronts.json"
+
+class StorefrontProvider(providers.MetadataProvider):
+    """Serves albums by storefront from a mapping of country codes to (track count, number of tracks) tuples."""
+    def __init__(self, storefronts):
+        self.storefronts = storefronts
+        self.lookups = []
+        self.threads = set()
+        self.lock = threading.Lock()
+
+    def search_albums(self, user_search, country_code, limit=config.ALBUM_RESULT_LIMIT):
+        return []
+
+    def lookup_album(self, album_id, country_code):
+        with self.lock:
+            self.lookups.append(country_code)
+            self.threads.add(threading.current_thread())
+        if country_code not in self.storefronts:
+            raise providers.ProviderError("HTTP 404")
+        track_count, found = self.storefronts[country_code]
+        return {"id": int(album_id), "track_count": track_count}, [{"id": idx} for idx in range(found)]
+
+    def fetch_artwork(self, album, size, file_path):
+        raise NotImplementedError
+
+@pytest.fixture(autouse=True)
+def reset_availability(monkeypatch):
+    monkeypatch.setattr(storefronts, "_availability", {})
+
+def resolve(provider, fallback_country_codes=("us", "gb", "de")):
+    return storefronts.resolve_album(provider, "1", "us", list(fallback_country_codes), CACHE_PATH)
+
+def read_cache():
+    with open(CACHE_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def test_album_track_counts_tolerate_missing_booklets():
+    provider = StorefrontProvider({"us": (13, 12), "gb": (13, 13)})
+    store_country_code, _, tracks = resolve(provider)
+    assert store_country_code == "us" and len(tracks) == 12
+    assert provider.lookups == ["us"]
+    storefronts.flush_availability(CACHE_PATH)
+    assert not os.path.exists(CACHE_PATH)
+
+def test_fallback_storefronts_are_cached_for_later_runs():
+    provider = StorefrontProvider({"gb": (10, 10)})
+    assert resolve(provider)[0] == "gb"
+    assert provider.lookups[0] == "us" and "gb" in provider.lookups
+    storefronts.flush_availability(CACHE_PATH)
+    assert read_cache() == {"us:1": {"country_code": "gb", "track_count": 10}}
+    provider.lookups.clear()
+    assert resolve(provider)[0] == "gb" and provider.lookups == ["gb"]
+
+def test_albums_incomplete_everywhere_are_looked_up_everywhere_once():
+    provider = StorefrontProvider({"us": (15, 12), "gb": (15, 12), "de": (15, 11)})
+    assert resolve(provider)[0] == "us"
+    assert sorted(provider.lookups) == ["de", "gb", "us"]
+    provider.lookups.clear()
+    store_country_code, _, tracks = resolve(provider)
+    assert store_country_code == "us" and len(tracks) == 12 and provider.lookups == ["us"]
+
+def test_complete_lookups_win_over_equally_long_partial_ones():
+    provider = StorefrontProvider({"us": (14, 12), "gb": (12, 12)})
+    store_country_code, album, tracks = resolve(provider, ["gb"])
+    assert store_country_code == "gb" and album["track_count"] == 12 and len(tracks) == 12
+
+def test_fallback_lookups_share_one_thread_pool():
+    provider = StorefrontProvider({"de": (10, 10)})
+    for album_id in range(6):
+        storefronts.resolve_album(provider, str(album_id), "us", ["gb", "de"], CACHE_PATH)
+    # Fallback lookups run on the pool's threads only, the first lookup on the calling thread
+    assert len(provider.threads - {threading.current_thread()}) <= config.STOREFRONT_LOOKUP_WORKERS
+
+def test_unavailable_albums_are_not_cached():
+    provider = StorefrontProvider({})
+    assert resolve(provider) == ("us", None, [])
+    assert storefronts.get_cached_entry("1", "us", CACHE_PATH) is None
+
+def test_cache_file_is_read_once_and_merged_on_flush(monkeypatch):
+    with open(CACHE_PATH, "w", encoding="utf-8") as f:
+        json.dump({"us:2": "de"}, f)
+    reads = []
+    read_availability = storefronts.read_availability
+    monkeypatch.setattr(storefronts, "read_availability", lambda cache_path: reads.append(cache_path) or read_availability(cache_path))
+    provider = StorefrontProvider({"gb": (10, 10)})
+    for _ in range(3):
+        resolve(provider)
+    # Old entries hold the country code only
+    assert storefronts.get_cached_entry("2", "us", CACHE_PATH) == {"country_code": "de", "track_count": None}
+    assert len(reads) == 1
+    # Another run recorded an album meanwhile
+    with open(CACHE_PATH, "w", encoding="utf-8") as f:
+        json.dump({"us:2": "de", "us:3": {"country_code": "ca", "track_count": 9}}, f)
+    storefronts.flush_availability(CACHE_PATH)
+    assert read_cache() == {"us:1": {"country_code": "gb", "track_count": 10}, "us:2": {"country_code": "de", "track_count": None}, "us:3": {"country_code": "ca", "track_count": 9}}
+
+def test_records_are_kept_when_flushing_fails(monkeypatch):
+    storefronts.record_availability("1", "us", "gb", 10, CACHE_PATH)
+    atomic_write = storefronts.utils.atomic_write
+    monkeypatch.setattr(storefronts.utils, "atomic_write", lambda *args: (_ for _ in ()).throw(OSError("disk full")))
+    with pytest.raises(OSError):
+        storefronts.flush_availability(CACHE_PATH)
+    monkeypatch.setattr(storefronts.utils, "atomic_write", atomic_write)
+    storefronts.flush_availability(CACHE_PATH)
+    assert read_cache() == {"us:1": {"country_code": "gb", "track_count": 10}}
+
+def test_records_are_flushed_after_flush_interval(monkeypatch):
+    monkeypatch.setattr(config, "STOREFRONT_CACHE_FLUSH_SECONDS", 0)
+    storefronts.record_availability("1", "us", "gb", 10, CACHE_PATH)
+    assert read_cache() == {"us:1": {"country_code": "gb", "track_count": 10}}
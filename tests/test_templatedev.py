@@ -0,0 +1,80 @@
+## -- STD LIB IMPORTS --
+import os
+import sys
+import json
+import threading
+## -- LOCAL IMPORTS --
+import config
+import main
+import templatedev
+
+def make_template(background):
+    template = {"svg_placeholders": {element_name: f"<{element_name}/>" for element_name in config.TEMPLATE_ELEMENTS}}
+    template["svg_placeholders"]["background"] = background
+    template.update({"calc_values": {}, "overflow_compensation": "", "tracklist_item_coordinates": [], "color_blob_item_coordinates": [], "limits": {}})
+    return template
+
+def read_template(template_path):
+    with open(template_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def write_template(background):
+    with open("template.json", "w", encoding="utf-8") as f:
+        json.dump(make_template(background), f)
+
+def test_watch_file_yields_on_changes_and_waits_for_missing_files():
+    write_template("a")
+    changes = templatedev.watch_file("template.json", poll_seconds=0.01)
+    next(changes)
+    write_template("ab")
+    next(changes)
+    os.remove("template.json")
+    threading.Timer(0.05, write_template, args=("abc",)).start()
+    next(changes)
+    assert read_template("template.json")["svg_placeholders"]["background"] == "abc"
+
+def test_element_signatures_change_with_their_settings_only():
+    template = make_template("<rect/>")
+    signatures = templatedev.get_element_signatures(template)
+    template["limits"] = {"tracklist_item_max": 3}
+    changed = templatedev.get_element_signatures(template)
+    assert sorted(element_name for element_name in signatures if signatures[element_name] != changed[element_name]) == ["color_blob_item", "tracklist_item"]
+
+def test_diff_documents_shortens_long_lines():
+    diff_lines = templatedev.diff_documents("poster", "<a/>\n<b/>", "<a/>\n<c " + "x" * 30 + "/>", max_line_length=24)
+    assert diff_lines == ["--- poster (previous)", "+++ poster (current)", "@@ -2 +2 @@", "-<b/>", "+<c " + "x" * 20 + "... (36 characters)"]
+
+def test_comparison_page_escapes_file_names(tmp_path):
+    page_path = templatedev.write_comparison_page(str(tmp_path), [("a&b.previous.svg", "a&b.svg")], 3)
+    with open(page_path, "r", encoding="utf-8") as f:
+        page = f.read()
+    assert '<img src="a&amp;b.previous.svg?r=3">' in page and "Template revision 3: 1 changed" in page
+
+def test_template_dev_keeps_watching_when_renders_are_deleted(monkeypatch):
+    out_folder = os.path.join("out", "dev")
+    file_path = os.path.join(out_folder, "artist-album-1.svg")
+    previous_file_path = os.path.join(out_folder, "artist-album-1.previous.svg")
+    def watch_file(template_path):
+        write_template("<one/>")
+        yield
+        # The developer deletes the first render before saving the next revision
+        os.remove(os.path.join(out_folder, "artist-album-1.svg"))
+        write_template("<two/>")
+        yield
+        write_template("<three/>")
+        yield
+    monkeypatch.setattr(templatedev, "watch_file", watch_file)
+    monkeypatch.setattr(main, "open_metadata_provider", lambda provider_url: None)
+    monkeypatch.setattr(main, "load_template_dev_albums", lambda *args: {("1", "us"): ({"id": 1, "artist": "Artist", "name": "Album"}, [])})
+    monkeypatch.setattr(main, "read_template_from_path", read_template)
+    monkeypatch.setattr(main, "populate_template_elements", lambda template, album, tracks, element_names: {element_name: template["svg_placeholders"][element_name] for element_name in element_names})
+    with open("albums.txt", "w", encoding="utf-8") as f:
+        f.write("1\n")
+    monkeypatch.setattr(sys, "argv", ["main.py", "--watch-template", "albums.txt", "--template-file", "template.json"])
+    main.run_template_dev(main.parse_args())
+    with open(file_path, "r", encoding="utf-8") as f:
+        assert "<three/>" in f.read()
+    with open(previous_file_path, "r", encoding="utf-8") as f:
+        assert "<two/>" in f.read()
+    with open(os.path.join(out_folder, "changes.diff"), "r", encoding="utf-8") as f:
+        assert f.read().splitlines()[-2:] == ["-<two/>", "+<three/>"]
@@ -0,0 +1,39 @@
+## -- LOCAL IMPORTS --
+import main
+import utils
+
+ELEMENT = '<text font-size="10" font-weight="700">{album_title}</text>'
+
+def get_calc_values(font_path):
+    # 20px of text fit, the test font advances 5px per character at size 10
+    return {"font_weight_mapping": {"700": font_path}, "weight_kerning_factors": {"700": 1}, "dims": {"doc_width": 40, "x_padding": 10}}
+
+def test_prepare_text_normalizes_upper_cases_and_escapes():
+    assert utils.prepare_text("Café & <Friends>", True) == ("CAFÉ & <FRIENDS>", "CAFÉ &amp; &lt;FRIENDS&gt;")
+    assert utils.prepare_text("Rock 'n' Roll", False) == ("Rock 'n' Roll", "Rock &#x27;n&#x27; Roll")
+
+def test_prepared_text_is_cached():
+    utils.prepare_text.cache_clear()
+    for _ in range(3):
+        utils.prepare_text("Various Artists", True)
+    assert utils.prepare_text.cache_info().hits == 2
+
+def test_overflow_is_measured_on_plain_text(font_path):
+    calc_values = get_calc_values(font_path)
+    plain, escaped = utils.prepare_text("a&b", True)
+    assert utils.measure_text(plain, font_path, 10) == 15
+    assert not utils.check_overflow(plain, ELEMENT, calc_values)
+    assert utils.check_overflow(escaped, ELEMENT, calc_values)
+    assert utils.check_overflow("AB&AB", ELEMENT, calc_values)
+
+def test_template_writes_escaped_text_and_compensates_measured_overflow(font_path):
+    template = {
+        "svg_placeholders": {"album_title": '<text font-size="10" font-weight="700"{overflow}>{album_title}</text>', "tracklist_item": '<text x="{tracklist_item_x}" y="{tracklist_item_y}" text-anchor="{tracklist_item_text_anchor}">{track_title}</text>'},
+        "overflow_compensation": ' textLength="20"', "calc_values": get_calc_values(font_path),
+        "tracklist_item_coordinates": [{"x": 1, "y": 2, "text_anchor": "start"}], "limits": {"tracklist_item_max": 1},
+    }
+    album = {"name": "a&b"}
+    elements = main.populate_template_elements(template, album, [{"name": "x<y"}, {"name": "Cut"}], ("album_title", "tracklist_item"))
+    assert elements == {"album_title": '<text font-size="10" font-weight="700">A&amp;B</text>', "tracklist_item": '<text x="1" y="2" text-anchor="start">x&lt;y</text>'}
+    album["name"] = "ab&ab"
+    assert main.populate_template_elements(template, album, [], ("album_title",))["album_title"] == '<text font-size="10" font-weight="700" textLength="20">AB&amp;AB</text>'
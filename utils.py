@@ -1,12 +1,38 @@
 ## -- STD LIB IMPORTS --
 import re
+import os
+import io
+import html
+import stat
+import time
+import hashlib
+import shutil
+import tempfile
+import functools
 import unicodedata
+from contextlib import contextmanager
+try:
+    import fcntl    # POSIX file locking
+except ImportError:
+    fcntl = None
+    import msvcrt   # Windows file locking
 ## -- EXT LIB IMPORTS --
 from PIL import Image, ImageFont
 import numpy as np
 from sklearn.cluster import KMeans
+try:
+    from fontTools import subset as font_subset    # Optional, required for font embedding only
+except ImportError:
+    font_subset = None
 ## -- LOCAL IMPORTS --
-from config import LUMINANCE_WEIGHTS
+from config import LUMINANCE_WEIGHTS, LOCK_FILE_SUFFIX, OKLAB_M1, OKLAB_M2, PALETTE_MIN_DISTANCE, PALETTE_OVERSAMPLING, PALETTE_SAMPLE_PIXELS, SVG_HOISTABLE_ATTRIBUTES, TEXT_CACHE_SIZE
+
+## -- CONSTANTS --
+# SVG tag and attribute patterns, text content is escaped so tags never contain '>' inside attribute values
+SVG_TAG_PATTERN = re.compile(r"(<[^>]*>)")
+SVG_ATTRIBUTE_PATTERN = re.compile(r'\s([a-zA-Z:-]+)="([^"]*)"')
+SVG_TAG_NAME_PATTERN = re.compile(r"<([^\s/>]+)")
+SVG_TEXT_PATTERN = re.compile(r"<text(\s[^>]*)?>([^<]*)</text>")
 
 ## -- FUNCTIONS --
 def format_search_string(user_search: str) -> str:
@@ -40,6 +66,73 @@ def slug(raw: str) -> str:
     slug = re.sub(r"-{2,}", "-", raw_normalized_compacted_validated)                                # Deduplicate hyphenation
     return slug
 
+def is_itunes_album(record: dict) -> bool:
+    """
+    Checks whether a raw iTunes API result record is an album collection.
+
+    Args:
+    record (dict): Raw iTunes API result record.
+
+    Returns:
+    is_album (bool): True if record is an album collection.
+    """
+    is_album = record.get('wrapperType') == 'collection' and record.get('collectionType') == 'Album'
+    return is_album
+
+def is_itunes_track(record: dict) -> bool:
+    """
+    Checks whether a raw iTunes API result record is a track.
+
+    Args:
+    record (dict): Raw iTunes API result record.
+
+    Returns:
+    is_track (bool): True if record is a track.
+    """
+    is_track = record.get('wrapperType') == 'track'
+    return is_track
+
+def parse_itunes_album(record: dict) -> dict:
+    """
+    Reduces a raw iTunes API album record to the properties required for rendering.
+
+    Args:
+    record (dict): Raw iTunes API album record.
+
+    Returns:
+    album (dict): Album dictionary.
+    """
+    album = {
+        "artist": record['artistName'],
+        "artist_id": record['artistId'],
+        "id": record['collectionId'],
+        "name": record['collectionName'],
+        "artwork_url": record['artworkUrl100'].replace("100x100bb", "1500x1500bb"),
+        "track_count": record['trackCount'],
+        "copyright": record['copyright'],
+        "release_date": record['releaseDate'],
+    }
+    return album
+
+def parse_itunes_track(record: dict) -> dict:
+    """
+    Reduces a raw iTunes API track record to the properties required for rendering.
+
+    Args:
+    record (dict): Raw iTunes API track record.
+
+    Returns:
+    track (dict): Track dictionary.
+    """
+    track = {
+        "id": record['trackId'],
+        "name": record['trackName'],
+        "number": record['trackNumber'],
+        "time_millis": record['trackTimeMillis'],
+        "time_parts": millis_to_minutes_and_seconds(record['trackTimeMillis'])
+    }
+    return track
+
 def millis_to_minutes_and_seconds(millis: int) -> list[int,int]:
     """
     Converts integer milliseconds to a list of minute and second time parts.
@@ -70,6 +163,20 @@ def pad(num: int, size: int) -> str:
     padded_num = f"{num:0{size}}"
     return padded_num
 
+def get_decoded_image_bytes(image_path: str) -> int:
+    """
+    Computes the memory an image occupies once decoded, reading the image header only.
+
+    Args:
+    image_path (str): Path to the image file.
+
+    Returns:
+    decoded_bytes (int): Decoded pixel bytes.
+    """
+    with Image.open(image_path) as image:
+        decoded_bytes = image.width * image.height * len(image.getbands())
+    return decoded_bytes
+
 def extract_colors_kmeans(image_path: str, num_colors: int, resize = False) -> list:
     """
     Extracts a color palette from an image using KMeans clustering.
@@ -94,19 +201,149 @@ def extract_colors_kmeans(image_path: str, num_colors: int, resize = False) -> l
     palette = colors.tolist()                                                                       # Convert the colors to a list                 
     return palette
 
-def compute_luminance(color: list) -> float:
+def extract_colors_median_cut(image_path: str, num_colors: int, sample_size: int) -> list:
+    """
+    Approximates a color palette from an image using median cut quantization of a small thumbnail.
+    Considerably cheaper than KMeans clustering, intended for preview renders.
+
+    Args:
+    image_path (str): Path to the image file.
+    num_colors (int): Number of colors to extract.
+    sample_size (int): Edge length of the sampled thumbnail in pixels.
+
+    Returns:
+    colors (list): List of distinct RGB color values ordered by pixel count, fewer than requested if the image has fewer colors.
+    """
+    image = Image.open(image_path).convert("RGB").resize((sample_size, sample_size))               # Open the image file and reduce to thumbnail
+    quantized = image.quantize(colors=num_colors, method=Image.Quantize.MEDIANCUT)                  # Quantize thumbnail to palette
+    palette = quantized.getpalette()                                                                # Get the RGB color values of the palette entries
+    colors = []
+    # Only keep palette entries used by pixels, unused entries are padded with black
+    for _, palette_index in sorted(quantized.getcolors(maxcolors=256), reverse=True):
+        color = palette[palette_index * 3:palette_index * 3 + 3]
+        if color not in colors:
+            colors.append(color)
+    return colors
+
+def srgb_to_oklab(rgb: np.ndarray) -> np.ndarray:
+    """
+    Converts sRGB colors to the perceptually uniform OKLab color space.
+
+    Args:
+    rgb (np.ndarray): Array of shape (..., 3) with sRGB channel values in [0, 255].
+
+    Returns:
+    oklab (np.ndarray): Array of shape (..., 3) with OKLab L, a and b values.
     """
-    Computes the luminance of an RGB color using the weighted sum of the color channels.
+    srgb = np.asarray(rgb, dtype=np.float64) / 255                                                  # Scale to [0, 1]
+    linear = np.where(srgb <= 0.04045, srgb / 12.92, ((srgb + 0.055) / 1.055) ** 2.4)               # Remove sRGB gamma
+    lms = np.cbrt(linear @ np.asarray(OKLAB_M1).T)                                                  # Linear sRGB to non-linear LMS
+    oklab = lms @ np.asarray(OKLAB_M2).T                                                            # LMS to OKLab
+    return oklab
+
+def oklab_to_srgb(oklab: np.ndarray) -> np.ndarray:
+    """
+    Converts OKLab colors to sRGB, clipping out of gamut colors.
 
     Args:
-    color (list): RGB color list.
+    oklab (np.ndarray): Array of shape (..., 3) with OKLab L, a and b values.
 
     Returns:
-    luminance (float): Luminance value.
+    rgb (np.ndarray): Array of shape (..., 3) with uint8 sRGB channel values.
     """
-    luminance = sum(LUMINANCE_WEIGHTS[i] * color[i] for i in range(len(color))) / 255
-    return luminance                                                                                  
+    lms = (np.asarray(oklab, dtype=np.float64) @ np.linalg.inv(OKLAB_M2).T) ** 3                    # OKLab to linear LMS
+    linear = np.clip(lms @ np.linalg.inv(OKLAB_M1).T, 0, 1)                                         # LMS to linear sRGB
+    srgb = np.where(linear <= 0.0031308, linear * 12.92, 1.055 * linear ** (1 / 2.4) - 0.055)       # Apply sRGB gamma
+    rgb = np.rint(srgb * 255).astype(np.uint8)
+    return rgb
 
+def compute_saliency_weights(oklab_image: np.ndarray) -> np.ndarray:
+    """
+    Computes per-pixel saliency weights as the perceptual distance of each pixel from the mean image color,
+    so distinctive accents weigh more than large uniform backgrounds.
+    Reference: Achanta et al., Frequency-tuned Salient Region Detection (2009).
+
+    Args:
+    oklab_image (np.ndarray): Array of shape (H, W, 3) with OKLab values.
+
+    Returns:
+    weights (np.ndarray): Array of shape (H * W,) with positive pixel weights.
+    """
+    pixels = oklab_image.reshape(-1, 3)
+    distances = np.linalg.norm(pixels - pixels.mean(axis=0), axis=1)                                # Distance from mean color
+    weights = distances / (distances.max() + 1e-9) + 0.05                                           # Normalize, keep every pixel represented
+    return weights
+
+def dedupe_colors(colors: np.ndarray, counts: np.ndarray, num_colors: int, min_distance: float) -> np.ndarray:
+    """
+    Selects up to num_colors colors by descending weight, skipping colors closer than min_distance to an already selected one.
+    If too few distinct colors exist, the heaviest skipped colors fill the remaining slots.
+
+    Args:
+    colors (np.ndarray): Array of shape (K, 3) with OKLab cluster centers.
+    counts (np.ndarray): Array of shape (K,) with cluster weights.
+    num_colors (int): Number of colors to select.
+    min_distance (float): Minimum OKLab distance between selected colors.
+
+    Returns:
+    selected (np.ndarray): Array of shape (num_colors, 3) with selected OKLab colors.
+    """
+    order = np.argsort(-counts, kind="stable")
+    distances = np.linalg.norm(colors[:, None, :] - colors[None, :, :], axis=2)                     # Pairwise perceptual distances
+    selected_idx, skipped_idx = [], []
+    for idx in order.tolist():
+        if len(selected_idx) == 0 or distances[idx, selected_idx].min() >= min_distance:
+            selected_idx.append(idx)
+        else:
+            skipped_idx.append(idx)
+    selected = colors[(selected_idx + skipped_idx)[:num_colors]]
+    return selected
+
+def extract_colors_oklab(image_path: str, num_colors: int, saliency = False, min_distance = PALETTE_MIN_DISTANCE, oversampling = PALETTE_OVERSAMPLING, sample_pixels = PALETTE_SAMPLE_PIXELS) -> list:
+    """
+    Extracts a color palette from an image using KMeans clustering in the OKLab color space.
+    Clusters are oversampled and near-identical colors deduplicated, so the palette holds visually distinct colors.
+    Clusters are fitted to a fixed random sample of the pixels, which keeps the palette stable at a fraction of the cost.
+
+    Args:
+    image_path (str): Path to the image file.
+    num_colors (int): Number of colors to extract.
+    saliency (bool): Weight pixels by visual saliency.
+    min_distance (float): Minimum OKLab distance between palette colors.
+    oversampling (int): Number of clusters fitted per palette color.
+    sample_pixels (int): Number of pixels sampled for clustering.
+
+    Returns:
+    colors (list): List of RGB color values.
+    """
+    image = Image.open(image_path).convert("RGB").resize((256, 256))                                # Open the image file and resize
+    oklab_image = srgb_to_oklab(np.asarray(image))                                                  # Convert all pixels at once
+    pixels = oklab_image.reshape(-1, 3)
+    weights = compute_saliency_weights(oklab_image) if saliency else np.ones(len(pixels))           # Saliency needs the full image
+    if len(pixels) > sample_pixels:
+        sample = np.random.default_rng(0).choice(len(pixels), sample_pixels, replace=False)         # Same sample for every run
+        pixels, weights = pixels[sample], weights[sample]
+    kmeans = KMeans(n_clusters=num_colors * oversampling)                                           # Fit the KMeans model to the weighted pixel data
+    labels = kmeans.fit_predict(pixels, sample_weight=weights)
+    counts = np.bincount(labels, weights=weights, minlength=kmeans.n_clusters)                      # Cluster weights
+    selected = dedupe_colors(kmeans.cluster_centers_, counts, num_colors, min_distance)
+    colors = oklab_to_srgb(selected).tolist()                                                       # Convert back to sRGB
+    return colors
+
+def sort_colors_by_luminance(colors: list) -> list:
+    """
+    Sorts RGB colors from light to dark by their weighted luminance.
+
+    Args:
+    colors (list): List of RGB color values.
+
+    Returns:
+    sorted_colors (list): List of RGB color values, brightest first.
+    """
+    rgb = np.asarray(colors, dtype=np.float64).reshape(-1, 3)
+    luminance = rgb @ np.asarray(LUMINANCE_WEIGHTS) / 255                                           # Luminance of all colors at once
+    sorted_colors = rgb[np.argsort(-luminance, kind="stable")].astype(np.uint8).tolist()
+    return sorted_colors
 
 def rgb_to_hex(rgb: list | np.ndarray) -> str:
     """
@@ -121,6 +358,62 @@ def rgb_to_hex(rgb: list | np.ndarray) -> str:
     hex_color = '#%02x%02x%02x' % tuple(rgb)
     return hex_color
 
+def artwork_url_for_size(artwork_url: str, size: int) -> str:
+    """
+    Rewrites an iTunes CDN artwork URL to request a square rendition of the given edge length.
+
+    Args:
+    artwork_url (str): iTunes CDN artwork URL.
+    size (int): Edge length in pixels.
+
+    Returns:
+    sized_artwork_url (str): Artwork URL for the requested size.
+    """
+    sized_artwork_url = re.sub(r"[0-9]+x[0-9]+bb", f"{size}x{size}bb", artwork_url)
+    return sized_artwork_url
+
+def scale_svg_dimensions(element: str, factor: float) -> str:
+    """
+    Scales the width and height attributes of an SVG root element, leaving the view box untouched.
+    Renderers rasterize the document at the scaled size while all element coordinates stay valid.
+
+    Args:
+    element (str): SVG root element opening tag.
+    factor (float): Scale factor.
+
+    Returns:
+    scaled_element (str): Scaled SVG root element opening tag.
+    """
+    scaled_element = re.sub(r"\b(width|height)=\"([0-9.]+)\"", lambda m: f"{m.group(1)}=\"{round(float(m.group(2)) * factor)}\"", element)
+    return scaled_element
+
+def hex_to_rgb(hex_color: str) -> list:
+    """
+    Converts a hex color string to an RGB color list.
+
+    Args:
+    hex_color (str): Hex color string.
+
+    Returns:
+    rgb (list): RGB color list.
+    """
+    rgb = [int(hex_color.lstrip("#")[i:i + 2], 16) for i in (0, 2, 4)]
+    return rgb
+
+def file_sha256(file_path: str) -> str:
+    """
+    Computes the SHA-256 digest of a file's content.
+
+    Args:
+    file_path (str): Path to the file.
+
+    Returns:
+    digest (str): Hex encoded SHA-256 digest.
+    """
+    with open(file_path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    return digest
+
 def get_font_size(element: str) -> int:
     """
     Extracts font size from an XML element.
@@ -147,12 +440,62 @@ def get_font_weight(element):
     font_weight = int(re.search(r"font-weight=\"([0-9]+)\"", element).group(1))
     return font_weight
 
+@functools.lru_cache(maxsize=TEXT_CACHE_SIZE)
+def prepare_text(raw: str, upper: bool) -> tuple[str, str]:
+    """
+    Prepares text for a template once, caching the result across posters.
+    Text is Unicode normalized and optionally upper-cased; the plain form is meant for measuring, the escaped form for the SVG.
+
+    Args:
+    raw (str): Raw text.
+    upper (bool): Upper-case the text.
+
+    Returns:
+    prepared (tuple[str, str]): Plain and XML escaped text.
+    """
+    text = unicodedata.normalize("NFC", raw)
+    if upper:
+        text = text.upper()
+    prepared = (text, html.escape(text))
+    return prepared
+
+@functools.lru_cache(maxsize=None)
+def get_font(font_name: str, font_size: int) -> ImageFont.FreeTypeFont:
+    """
+    Loads a font at a size once per run.
+
+    Args:
+    font_name (str): Font file name or path, extension optional.
+    font_size (int): Font size.
+
+    Returns:
+    font (ImageFont.FreeTypeFont): Loaded font.
+    """
+    font = ImageFont.truetype(font_name, font_size)
+    return font
+
+@functools.lru_cache(maxsize=TEXT_CACHE_SIZE)
+def measure_text(text: str, font_name: str, font_size: int) -> float:
+    """
+    Measures the advance width of plain text, caching the result across posters.
+
+    Args:
+    text (str): Plain, unescaped text.
+    font_name (str): Font file name or path, extension optional.
+    font_size (int): Font size.
+
+    Returns:
+    text_length_px (float): Text width in pixels.
+    """
+    text_length_px = get_font(font_name, font_size).getlength(text)
+    return text_length_px
+
 def check_overflow(text, element, calc_values):
     """
     Evaluates whether text overflows the document width and returns the element or a replacement element.
 
     Args:
-    text (str): Text to evaluate.
+    text (str): Plain, unescaped text to evaluate.
     element (str): XML element.
     calc_values (dict): Boundary values for calculation.
     overflow_replacement (str): Replacement element.
@@ -164,11 +507,390 @@ def check_overflow(text, element, calc_values):
     font_weight = get_font_weight(element)
     font_name = calc_values['font_weight_mapping'][str(font_weight)]
     kerning_factor = calc_values['weight_kerning_factors'][str(font_weight)]
-    font = ImageFont.truetype(font_name, font_size)
-    text_length_px = font.getlength(text)  * kerning_factor
+    text_length_px = measure_text(text, font_name, font_size) * kerning_factor
     overflows = bool((calc_values['dims']['doc_width'] - 2 * calc_values['dims']['x_padding']) - (round(text_length_px, None)) < 0)
     return overflows
 
+def get_font_path(font_name: str) -> str:
+    """
+    Resolves the file path of a font the same way text measurement does, including system font directories.
+
+    Args:
+    font_name (str): Font file name or path, extension optional.
+
+    Returns:
+    font_path (str): Font file path.
+    """
+    font_path = ImageFont.truetype(font_name, 1).path
+    return font_path
+
+def get_text_glyphs(content: str) -> dict:
+    """
+    Collects the characters used by the text elements of SVG content, grouped by font family and weight.
+
+    Args:
+    content (str): SVG file content with inline font attributes.
+
+    Returns:
+    glyphs (dict): Mapping of (font family, font weight) tuples to strings of sorted unique characters.
+    """
+    characters = {}
+    for attributes, text in SVG_TEXT_PATTERN.findall(content):
+        attributes = dict(SVG_ATTRIBUTE_PATTERN.findall(attributes))
+        key = (attributes.get("font-family", ""), attributes.get("font-weight", "400"))
+        characters.setdefault(key, set()).update(html.unescape(text))
+    glyphs = {key: "".join(sorted(chars)) for key, chars in characters.items()}
+    return glyphs
+
+def subset_font(font_path: str, text: str) -> bytes:
+    """
+    Subsets a font to the glyphs of a text and encodes it as WOFF2.
+
+    Args:
+    font_path (str): Font file path.
+    text (str): Characters to keep.
+
+    Returns:
+    font_data (bytes): WOFF2 font data.
+    """
+    if font_subset is None:
+        raise ImportError("Font embedding requires the fonttools and brotli packages")
+    options = font_subset.Options()
+    options.flavor = "woff2"
+    options.notdef_outline = True
+    options.drop_tables += ["FFTM"]                                                                 # Font editor timestamps cannot be subset
+    font = font_subset.load_font(font_path, options)
+    subsetter = font_subset.Subsetter(options)
+    subsetter.populate(text=text)
+    subsetter.subset(font)
+    buffer = io.BytesIO()
+    font_subset.save_font(font, buffer, options)
+    font_data = buffer.getvalue()
+    return font_data
+
+@contextmanager
+def file_lock(file_path: str, shared: bool = False):
+    """
+    Acquires an exclusive inter-process lock for a shared file, blocking until it is available.
+    The lock is held on a sibling lock file, so the guarded file itself can be replaced atomically.
+
+    Args:
+    file_path (str): Path to the shared file to guard.
+    shared (bool): Acquire a shared lock instead, held by any number of readers but never together with an exclusive lock (exclusive on Windows).
+
+    Yields:
+    lock_path (str): Path to the held lock file.
+    """
+    lock_path = file_path + LOCK_FILE_SUFFIX
+    while True:
+        lock_file = open(lock_path, "a+b")
+        try:
+            if fcntl is not None:                                                                   # Block until lock is granted
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            # Lock files removed while waiting (see remove_locked_file) no longer guard the file, lock the new one instead
+            if fcntl is None or os.path.exists(lock_path) and os.path.samestat(os.stat(lock_path), os.fstat(lock_file.fileno())):
+                break
+        except BaseException:
+            lock_file.close()
+            raise
+        lock_file.close()
+    try:
+        yield lock_path
+    finally:
+        if fcntl is not None:                                                                       # Release lock
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        lock_file.close()
+
+def remove_locked_file(file_path: str) -> None:
+    """
+    Removes a shared file together with its lock file, while holding the lock so no writer is interrupted.
+
+    Args:
+    file_path (str): Path to the shared file.
+
+    Returns:
+    None
+    """
+    with file_lock(file_path) as lock_path:
+        for path in (file_path, lock_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+def evict_cache(dir_path: str, max_bytes: int, max_age_seconds: float, now: float | None = None) -> int:
+    """
+    Evicts least recently used files from a cache directory, until it holds at most max_bytes
+    and no file was last used longer than max_age_seconds ago. Lock files left without cache file are removed too.
+    Cache files are marked as used by updating their modification time, see touch_file.
+
+    Args:
+    dir_path (str): Cache directory path.
+    max_bytes (int): Maximum total size of cache files in bytes.
+    max_age_seconds (float): Maximum time since last use in seconds.
+    now (float | None): Current time as UNIX timestamp, None for the system clock.
+
+    Returns:
+    evicted (int): Number of evicted cache files.
+    """
+    now = time.time() if now is None else now
+    try:
+        entries = list(os.scandir(dir_path))
+    except FileNotFoundError:
+        return 0
+    file_names = {entry.name for entry in entries}
+    cache_files = []
+    for entry in entries:
+        try:
+            if entry.name.endswith(LOCK_FILE_SUFFIX):
+                # Remove lock files of failed or evicted downloads
+                if entry.name[:-len(LOCK_FILE_SUFFIX)] not in file_names and now - entry.stat().st_mtime > max_age_seconds:
+                    remove_locked_file(entry.path[:-len(LOCK_FILE_SUFFIX)])
+            elif entry.is_file():
+                cache_files.append((entry.stat().st_mtime, entry.stat().st_size, entry.path))
+        except FileNotFoundError:
+            pass
+    # Keep most recently used files within the size budget
+    evicted = 0
+    total_bytes = 0
+    for mtime, size, path in sorted(cache_files, reverse=True):
+        total_bytes += size
+        if total_bytes > max_bytes or now - mtime > max_age_seconds:
+            remove_locked_file(path)
+            evicted += 1
+    return evicted
+
+def touch_file(file_path: str) -> None:
+    """
+    Marks a cache file as recently used by updating its modification time, access times are unreliable on most mounts.
+
+    Args:
+    file_path (str): Cache file path.
+
+    Returns:
+    None
+    """
+    try:
+        os.utime(file_path)
+    except OSError:
+        pass
+
+@functools.lru_cache(maxsize=None)
+def get_umask() -> int:
+    """
+    Gets the process file mode creation mask once per process, without setting it:
+    os.umask can only read the mask by changing it for all threads, racing with files created meanwhile.
+
+    Returns:
+    umask (int): File mode creation mask.
+    """
+    try:
+        # Linux exposes the mask directly
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            umask = next(int(line.split()[1], 8) for line in f if line.startswith("Umask:"))
+    except (OSError, StopIteration, ValueError, IndexError):
+        # Elsewhere, derive it from the mode of a newly created file
+        probe_dir_path = tempfile.mkdtemp(prefix=".umask-")
+        try:
+            probe_path = os.path.join(probe_dir_path, "probe")
+            os.close(os.open(probe_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o777))
+            umask = 0o777 & ~stat.S_IMODE(os.stat(probe_path).st_mode)
+        finally:
+            shutil.rmtree(probe_dir_path, ignore_errors=True)
+    return umask
+
+def get_new_file_mode(file_path: str) -> int:
+    """
+    Gets the permission bits a file written in place of another should have: those of the existing file,
+    or those of a file newly created under the process umask.
+
+    Args:
+    file_path (str): Path to the target file.
+
+    Returns:
+    mode (int): Permission bits.
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~get_umask()
+    return mode
+
+def claim_file(file_path: str, owner: str) -> str:
+    """
+    Claims a marker file for an owner unless another owner claimed it first. Claims are atomic across processes
+    and hosts sharing a volume: the marker is written completely before it is linked into place, and linking fails if it exists.
+
+    Args:
+    file_path (str): Path to the marker file.
+    owner (str): Owner identifier stored in the marker.
+
+    Returns:
+    claimed_owner (str): Owner holding the claim, equal to the given owner if the claim succeeded.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file_path)), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(owner)
+        os.chmod(tmp_path, 0o666 & ~get_umask())
+        try:
+            os.link(tmp_path, file_path)
+            claimed_owner = owner
+        except FileExistsError:
+            with open(file_path, "r", encoding="utf-8") as f:
+                claimed_owner = f.read()
+    finally:
+        os.remove(tmp_path)
+    return claimed_owner
+
+@contextmanager
+def atomic_open(file_path: str, mode: str = "w"):
+    """
+    Opens a temporary sibling file for writing and renames it over the target file once the block completes.
+    Readers and concurrent writers never observe a partially written file, a failed block leaves the target untouched.
+
+    Args:
+    file_path (str): Path to the target file.
+    mode (str): Write mode, "w" for text or "wb" for binary content.
+
+    Yields:
+    f (file object): Open temporary file.
+    """
+    dir_path = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=dir_path, prefix=".tmp-", suffix=os.path.basename(file_path))  # Temporary file on the same filesystem
+    encoding = None if "b" in mode else "utf-8"
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, get_new_file_mode(file_path))                                            # Temporary files are private, targets are not
+        os.replace(tmp_path, file_path)                                                             # Atomic rename over target
+    except BaseException:
+        if os.path.exists(tmp_path):                                                                # Never leave temporary files behind
+            os.remove(tmp_path)
+        raise
+
+def atomic_write(file_path: str, content: str | bytes) -> None:
+    """
+    Writes content to a file atomically by writing a temporary sibling file and renaming it into place.
+
+    Args:
+    file_path (str): Path to the target file.
+    content (str | bytes): File content.
+
+    Returns:
+    None
+    """
+    with atomic_open(file_path, "wb" if isinstance(content, bytes) else "w") as f:
+        f.write(content)
+
+def _hoist_style(attributes: tuple) -> str:
+    """
+    Converts hoisted SVG presentation attributes to CSS declarations.
+
+    Args:
+    attributes (tuple): Tuple of (name, value) attribute pairs.
+
+    Returns:
+    declarations (str): CSS declarations.
+    """
+    # Unitless font sizes are user units, which CSS expresses as px
+    declarations = ";".join(f"{name}:{value}px" if name == "font-size" and re.fullmatch(r"[0-9.]+", value) else f"{name}:{value}" for name, value in attributes)
+    return declarations
+
+def iter_minified_svg(content: str, hoistable_attributes: list = SVG_HOISTABLE_ATTRIBUTES):
+    """
+    Minifies SVG content, yielding the result chunk by chunk so callers can write it without joining it first.
+    Hoisting needs every tag of the document, so the content is tokenized in full before the first chunk is yielded.
+    Presentation attributes shared by all elements of a kind are hoisted into one element rule, remaining combinations
+    repeated across elements into one CSS class each. Elements with a class attribute keep their attributes, and
+    element rules are only declared for kinds without such elements, as CSS rules override presentation attributes.
+    Whitespace between and inside tags is collapsed, text content and all other attributes are kept verbatim.
+
+    Args:
+    content (str): SVG file content.
+    hoistable_attributes (list): Presentation attribute names eligible for hoisting.
+
+    Yields:
+    chunk (str): Minified SVG content chunk.
+    """
+    # Split into alternating text and tag tokens
+    tokens = SVG_TAG_PATTERN.split(content)
+    # Collect hoistable attributes per opening tag
+    elements = {}
+    classed_tag_names = set()
+    for idx in range(1, len(tokens), 2):
+        if tokens[idx].startswith(("</", "<?", "<!")):
+            continue
+        tag_name = SVG_TAG_NAME_PATTERN.match(tokens[idx]).group(1)
+        attributes = dict(SVG_ATTRIBUTE_PATTERN.findall(tokens[idx]))
+        if "class" in attributes:
+            classed_tag_names.add(tag_name)
+        else:
+            elements[idx] = (tag_name, {(name, attributes[name]) for name in hoistable_attributes if name in attributes})
+    # Hoist attributes every element of a kind shares into an element rule, unless an element rule would also match classed elements
+    shared = {}
+    for tag_name, attributes in elements.values():
+        shared[tag_name] = shared[tag_name] & attributes if tag_name in shared else set(attributes)
+    counts = {}
+    for tag_name, attributes in elements.values():
+        counts[tag_name] = counts.get(tag_name, 0) + 1
+    rules = {tag_name: tuple(sorted(attributes)) for tag_name, attributes in shared.items() if counts[tag_name] > 1 and len(attributes) > 0 and tag_name not in classed_tag_names}
+    # Hoist remaining combinations whose class rule costs less than the repeated attributes
+    combinations = {idx: tuple(sorted(attributes - set(rules.get(tag_name, ())))) for idx, (tag_name, attributes) in elements.items()}
+    counts = {}
+    for combination in combinations.values():
+        if len(combination) > 0:
+            counts[combination] = counts.get(combination, 0) + 1
+    class_names = {}
+    for combination, count in sorted(counts.items(), key=lambda item: -item[1]):
+        class_name = f"s{len(class_names)}"
+        inline_length = sum(len(f' {name}="{value}"') for name, value in combination)
+        if count * inline_length > count * len(f' class="{class_name}"') + len(f".{class_name}{{{_hoist_style(combination)}}}"):
+            class_names[combination] = class_name
+    selectors = [(tag_name, attributes) for tag_name, attributes in rules.items()] + [(f".{class_name}", combination) for combination, class_name in class_names.items()]
+    style = "<style>" + "".join(f"{selector}{{{_hoist_style(attributes)}}}" for selector, attributes in selectors) + "</style>" if len(selectors) > 0 else ""
+    for idx, token in enumerate(tokens):
+        if idx % 2 == 0:
+            # Drop whitespace between tags
+            if token.strip() != "":
+                yield token
+            continue
+        if idx in elements:
+            # Remove hoisted attributes, replacing class combinations with their class
+            tag_name = elements[idx][0]
+            for name, value in rules.get(tag_name, ()) + (combinations[idx] if combinations[idx] in class_names else ()):
+                token = token.replace(f' {name}="{value}"', "", 1)
+            if combinations[idx] in class_names:
+                token = f'<{tag_name} class="{class_names[combinations[idx]]}"' + token[len(tag_name) + 1:]
+        # Collapse whitespace inside tag
+        token = " ".join(token.split()).replace(" />", "/>").replace(" >", ">")
+        yield token
+        if style != "" and token.startswith("<svg"):
+            # Declare rules once, right after the root element
+            yield style
+            style = ""
+
+def minify_svg(content: str) -> str:
+    """
+    Minifies SVG content, see iter_minified_svg.
+
+    Args:
+    content (str): SVG file content.
+
+    Returns:
+    minified_content (str): Minified SVG file content.
+    """
+    minified_content = "".join(iter_minified_svg(content))
+    return minified_content
+
 # def check_collision(element1, text1, element2, text2):
 #   font_size = get_font_size(element)
 #   font_weight = get_font_weight(element)